@@ -151,7 +151,7 @@ CONFIGURACOES_EXPORTACAO = {
 
 # Configurações de migração legacy
 CONFIGURACOES_MIGRACAO = {
-    'tipos_arquivo_suportados': ['.xlsx', '.xls', '.json', '.csv'],
+    'tipos_arquivo_suportados': ['.xlsx', '.json', '.csv'],
     'diretorio_backup': 'backups',
     'validar_antes_migrar': True,
     'criar_backup_automatico': True,
@@ -0,0 +1,154 @@
+# usina_01/dados/armazem_dados.py
+
+"""
+Armazém de dados do processo
+Cada arquivo é lido e interpretado uma única vez enquanto não for alterado por
+fora (mtime/tamanho); quem vai alterar o documento recebe uma cópia
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from nucleo.excecoes import ErroCarregamentoDados, ErroSalvamentoDados, ErroCorrupcaoDados
+
+# (mtime em ns, tamanho) de cada arquivo; None quando não existe
+Assinatura = Tuple[Optional[Tuple[int, int]], ...]
+
+
+@dataclass
+class _Entrada:
+    assinatura: Assinatura
+    valor: Any
+
+
+class ArmazemDados:
+    """
+    Cache compartilhado de documentos JSON e modelos derivados deles
+
+    As entradas são identificadas pelo caminho absoluto e por um tipo ('json'
+    para o documento lido, ou outro nome para objetos montados a partir dele,
+    como o SistemaEnergia). Uma entrada só é usada se a assinatura atual dos
+    arquivos for igual à registrada; gravações feitas pelo próprio armazém
+    atualizam a assinatura sem reler o arquivo.
+
+    Os valores guardados são compartilhados e não devem ser alterados no lugar:
+    ler_json(copiar=True) devolve uma cópia própria para edição.
+    """
+
+    def __init__(self):
+        self._trava = threading.RLock()
+        self._entradas: Dict[Tuple[str, str], _Entrada] = {}
+
+    @staticmethod
+    def assinatura(*caminhos: str) -> Assinatura:
+        """Estado atual (mtime, tamanho) dos arquivos informados"""
+        estado = []
+        for caminho in caminhos:
+            try:
+                info = os.stat(caminho)
+                estado.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                estado.append(None)
+        return tuple(estado)
+
+    # Documentos JSON
+
+    def ler_json(self, caminho: str, padrao: Optional[Callable[[], Any]] = None, copiar: bool = False) -> Any:
+        """
+        Documento JSON compartilhado; relido apenas se o arquivo mudou.
+        Com copiar=True retorna uma cópia que pode ser alterada livremente.
+        Sem o arquivo, retorna padrao() (sem guardar em cache) ou None.
+        """
+        assinatura = self.assinatura(caminho)
+        if assinatura[0] is None:
+            return padrao() if padrao is not None else None
+
+        documento = self.obter(caminho, 'json', assinatura)
+        if documento is None:
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    documento = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ErroCorrupcaoDados(f"Arquivo '{caminho}' corrompido na linha {e.lineno}, coluna {e.colno}: {e}")
+            except Exception as e:
+                raise ErroCarregamentoDados(f"Erro ao ler '{caminho}': {e}")
+            self.guardar(caminho, 'json', assinatura, documento)
+
+        return copy.deepcopy(documento) if copiar else documento
+
+    def gravar_json(self, caminho: str, documento: Any, indent: Optional[int] = 2):
+        """Grava o documento (atomicamente) e guarda uma cópia como valor compartilhado do arquivo"""
+        try:
+            conteudo = json.dumps(documento, indent=indent, ensure_ascii=False)
+            with self._trava:
+                escrever_atomico(caminho, conteudo)
+                # Cópia: alterações posteriores do chamador não podem vazar para os demais leitores
+                self.guardar(caminho, 'json', self.assinatura(caminho), copy.deepcopy(documento))
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao gravar '{caminho}': {e}")
+
+    # Entradas genéricas
+
+    def obter(self, caminho: str, tipo: str, assinatura: Assinatura) -> Any:
+        """Valor guardado, se ainda corresponder à assinatura informada"""
+        with self._trava:
+            entrada = self._entradas.get((os.path.abspath(caminho), tipo))
+            if entrada is not None and entrada.assinatura == assinatura:
+                return entrada.valor
+        return None
+
+    def guardar(self, caminho: str, tipo: str, assinatura: Assinatura, valor: Any):
+        """Guarda o valor para a assinatura atual dos arquivos"""
+        with self._trava:
+            self._entradas[(os.path.abspath(caminho), tipo)] = _Entrada(assinatura, valor)
+
+    def renovar(self, caminho: str, tipo: str, anterior: Assinatura, atual: Assinatura):
+        """Mantém o valor após uma regravação de mesmo conteúdo (ex.: compactação)"""
+        with self._trava:
+            entrada = self._entradas.get((os.path.abspath(caminho), tipo))
+            if entrada is not None and entrada.assinatura == anterior:
+                entrada.assinatura = atual
+
+    def invalidar(self, caminho: Optional[str] = None, tipo: Optional[str] = None):
+        """Descarta as entradas do caminho (e tipo) informados, ou todas"""
+        with self._trava:
+            if caminho is None:
+                self._entradas.clear()
+                return
+            caminho = os.path.abspath(caminho)
+            for chave in [c for c in self._entradas if c[0] == caminho and tipo in (None, c[1])]:
+                del self._entradas[chave]
+
+
+def escrever_atomico(destino: str, conteudo: str):
+    """Grava em arquivo temporário no mesmo diretório e substitui o destino com os.replace"""
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=diretorio)
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, destino)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+# Instância única do processo
+_armazem: Optional[ArmazemDados] = None
+
+
+def obter_armazem() -> ArmazemDados:
+    """Armazém compartilhado do processo"""
+    global _armazem
+    if _armazem is None:
+        _armazem = ArmazemDados()
+    return _armazem
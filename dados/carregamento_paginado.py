@@ -0,0 +1,357 @@
+# usina_01/dados/carregamento_paginado.py
+
+"""
+Carregamento sob demanda de unidades
+Na abertura lê apenas um índice leve (id, nome, tipo, ativa) e um bloco de
+resumo pré-calculado; registros completos são hidratados por página ou por id
+"""
+
+import json
+import os
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, ConfiguracaoRelatorio, UnidadeConsumidora, HistoricoCreditos,
+    TipoLigacao
+)
+from nucleo.excecoes import ErroCarregamentoDados, ErroSalvamentoDados
+from dados.repositorio import RepositorioDados
+from configuracao.definicoes import ARQUIVO_DADOS
+
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_CACHE_PADRAO = 1024
+
+# Campos de SistemaEnergia guardados como metadados (sem as unidades)
+CAMPOS_METADADOS = ('versao_sistema', 'data_criacao', 'data_ultima_atualizacao',
+                    'dados_importacao', 'configuracoes_avancadas')
+
+
+@dataclass
+class EntradaIndiceUnidade:
+    """Dados mínimos de uma unidade para listas e seleção"""
+    id: str
+    nome: str
+    tipo_ligacao: TipoLigacao
+    ativa: bool
+
+
+@dataclass
+class ResumoSistema:
+    """Agregados das unidades gravados junto com os dados"""
+    quantidade_unidades: int = 0
+    quantidade_ativas: int = 0
+    consumo_mensal_kwh: List[float] = field(default_factory=lambda: [0.0] * 12)
+    taxa_disponibilidade_total: float = 0.0
+    contagem_por_ligacao: Dict[TipoLigacao, int] = field(default_factory=dict)
+
+    @property
+    def consumo_anual_kwh(self) -> float:
+        """Consumo anual das unidades ativas"""
+        return sum(self.consumo_mensal_kwh)
+
+    @property
+    def consumo_medio_mensal_kwh(self) -> float:
+        """Consumo médio mensal das unidades ativas"""
+        return self.consumo_anual_kwh / 12
+
+    def como_dict(self) -> Dict:
+        return {
+            'quantidade_unidades': self.quantidade_unidades,
+            'quantidade_ativas': self.quantidade_ativas,
+            'consumo_mensal_kwh': list(self.consumo_mensal_kwh),
+            'taxa_disponibilidade_total': self.taxa_disponibilidade_total,
+            'contagem_por_ligacao': {tipo.value: quantidade
+                                     for tipo, quantidade in self.contagem_por_ligacao.items()}
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'ResumoSistema':
+        resumo = cls(**{chave: dados[chave] for chave in cls().como_dict() if chave in dados})
+        resumo.contagem_por_ligacao = {TipoLigacao(tipo): quantidade
+                                       for tipo, quantidade in resumo.contagem_por_ligacao.items()}
+        return resumo
+
+
+def calcular_resumo(unidades: Iterable[UnidadeConsumidora]) -> ResumoSistema:
+    """Calcula o bloco de resumo a partir das unidades completas"""
+    resumo = ResumoSistema()
+    for unidade in unidades:
+        resumo.quantidade_unidades += 1
+        if not unidade.ativa:
+            continue
+        resumo.quantidade_ativas += 1
+        for i, valor in enumerate(unidade.consumo_mensal_kwh):
+            resumo.consumo_mensal_kwh[i] += float(valor)
+        resumo.taxa_disponibilidade_total += unidade.get_taxa_disponibilidade()
+        tipo = unidade.tipo_ligacao
+        resumo.contagem_por_ligacao[tipo] = resumo.contagem_por_ligacao.get(tipo, 0) + 1
+    return resumo
+
+
+class UnidadesSobDemanda:
+    """
+    Coleção de unidades hidratadas sob demanda
+
+    O índice fica sempre em memória; unidades completas são carregadas em lote
+    pela função carregar(ids) e mantidas em um cache LRU de tamanho limitado.
+    """
+
+    def __init__(self, indice: List[EntradaIndiceUnidade],
+                 carregar: Callable[[Sequence[str]], List[UnidadeConsumidora]],
+                 tamanho_cache: int = TAMANHO_CACHE_PADRAO):
+        self.indice = indice
+        self._carregar = carregar
+        self._tamanho_cache = tamanho_cache
+        self._cache: 'OrderedDict[str, UnidadeConsumidora]' = OrderedDict()
+        self._posicoes = {entrada.id: i for i, entrada in enumerate(indice)}
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def __contains__(self, id_unidade: str) -> bool:
+        return id_unidade in self._posicoes
+
+    @property
+    def hidratadas(self) -> int:
+        """Quantidade de unidades completas em cache"""
+        return len(self._cache)
+
+    def entradas(self, apenas_ativas: bool = False) -> List[EntradaIndiceUnidade]:
+        """Entradas do índice (sem hidratar)"""
+        return [e for e in self.indice if e.ativa] if apenas_ativas else list(self.indice)
+
+    def obter(self, id_unidade: str) -> Optional[UnidadeConsumidora]:
+        """Unidade completa pelo id (None se não existir)"""
+        if id_unidade not in self._posicoes:
+            return None
+        return self.obter_varias([id_unidade])[0]
+
+    def obter_varias(self, ids: Sequence[str]) -> List[UnidadeConsumidora]:
+        """Unidades completas, carregando em um único lote as que não estão em cache"""
+        faltantes = [i for i in ids if i not in self._cache and i in self._posicoes]
+        if faltantes:
+            for unidade in self._carregar(faltantes):
+                self._guardar(unidade)
+
+        unidades = []
+        for id_unidade in ids:
+            unidade = self._cache.get(id_unidade)
+            if unidade is not None:
+                self._cache.move_to_end(id_unidade)
+                unidades.append(unidade)
+        return unidades
+
+    def quantidade_paginas(self, tamanho: int = TAMANHO_PAGINA_PADRAO, apenas_ativas: bool = False) -> int:
+        """Número de páginas do índice"""
+        total = len(self.entradas(apenas_ativas)) if apenas_ativas else len(self.indice)
+        return (total + tamanho - 1) // tamanho
+
+    def pagina(self, numero: int, tamanho: int = TAMANHO_PAGINA_PADRAO,
+               apenas_ativas: bool = False) -> List[UnidadeConsumidora]:
+        """Unidades completas da página (numerada a partir de 0)"""
+        entradas = self.entradas(apenas_ativas) if apenas_ativas else self.indice
+        inicio = numero * tamanho
+        return self.obter_varias([e.id for e in entradas[inicio:inicio + tamanho]])
+
+    def materializar(self, apenas_ativas: bool = False) -> List[UnidadeConsumidora]:
+        """Todas as unidades completas (fora do cache, para não descartá-lo)"""
+        ids = [e.id for e in self.entradas(apenas_ativas)]
+        em_cache = {i: self._cache[i] for i in ids if i in self._cache}
+        carregadas = {u.id: u for u in self._carregar([i for i in ids if i not in em_cache])}
+        return [em_cache.get(i) or carregadas[i] for i in ids if i in em_cache or i in carregadas]
+
+    # Métodos auxiliares privados
+
+    def _guardar(self, unidade: UnidadeConsumidora):
+        self._cache[unidade.id] = unidade
+        self._cache.move_to_end(unidade.id)
+        while len(self._cache) > self._tamanho_cache:
+            self._cache.popitem(last=False)
+
+
+@dataclass
+class SistemaPaginado:
+    """Sistema aberto em modo sob demanda"""
+    configuracao: ConfiguracaoSistema
+    unidades: UnidadesSobDemanda
+    resumo: ResumoSistema
+    historico_creditos: List[HistoricoCreditos] = field(default_factory=list)
+    configuracao_relatorio: ConfiguracaoRelatorio = field(default_factory=ConfiguracaoRelatorio)
+    metadados: Dict[str, Any] = field(default_factory=dict)
+
+    def materializar(self) -> SistemaEnergia:
+        """SistemaEnergia completo (carrega todas as unidades)"""
+        return SistemaEnergia(
+            configuracao=self.configuracao,
+            unidades=self.unidades.materializar(),
+            historico_creditos=list(self.historico_creditos),
+            configuracao_relatorio=self.configuracao_relatorio,
+            **{campo: self.metadados[campo] for campo in CAMPOS_METADADOS if campo in self.metadados}
+        )
+
+
+class RepositorioPaginado(RepositorioDados):
+    """
+    Layout paginado do armazenamento JSON
+
+    '<arquivo>.indice.json' guarda configuração, créditos, resumo e o índice das
+    unidades com a posição (bytes) de cada registro em '<arquivo>.unidades.<n>.jsonl'.
+    Um novo arquivo de unidades é gravado a cada salvamento e o índice é trocado
+    atomicamente, de modo que uma queda nunca deixa índice e registros divergentes.
+    Arquivos de gerações anteriores só são removidos quando nenhum sistema aberto
+    por este repositório ainda os lê.
+
+    Layout opcional, mantido em sincronia com o JSON: salvar_sistema deste
+    repositório também regrava o layout paginado, e o índice guarda a assinatura
+    do snapshot/journal JSON de quando foi gravado. Se o JSON mudou depois disso
+    (journal, compactação ou salvamento por um RepositorioDados comum),
+    abrir_paginado regenera o layout a partir de carregar_sistema.
+    """
+
+    def __init__(self, arquivo_dados: str = ARQUIVO_DADOS, tamanho_cache: int = TAMANHO_CACHE_PADRAO):
+        super().__init__(arquivo_dados)
+        self.arquivo_indice = f"{arquivo_dados}.indice.json"
+        self.tamanho_cache = tamanho_cache
+        # Coleções abertas por abrir_paginado -> arquivo de unidades que elas leem
+        self._abertos: 'weakref.WeakKeyDictionary[UnidadesSobDemanda, str]' = weakref.WeakKeyDictionary()
+
+    def existe_paginado(self) -> bool:
+        """Indica se o layout paginado já foi gravado"""
+        return os.path.exists(self.arquivo_indice)
+
+    def salvar_sistema(self, sistema: SistemaEnergia, caminho_destino: Optional[str] = None):
+        """Salva o snapshot JSON e, sem caminho_destino, regrava também o layout paginado"""
+        with self._trava:
+            super().salvar_sistema(sistema, caminho_destino)
+            if caminho_destino is None:
+                self.salvar_paginado(sistema)
+
+    def salvar_paginado(self, sistema: SistemaEnergia):
+        """Grava o sistema no layout paginado"""
+        try:
+            indice_anterior = self._ler_indice() if self.existe_paginado() else {}
+            geracao = indice_anterior.get('geracao', 0) + 1
+            arquivo_unidades = f"{self.arquivo_dados}.unidades.{geracao}.jsonl"
+
+            entradas, linhas, posicao = [], [], 0
+            for unidade in sistema.unidades:
+                linha = (json.dumps(self._converter_para_json_compativel(unidade), ensure_ascii=False) + "\n")
+                tamanho = len(linha.encode('utf-8'))
+                entradas.append([unidade.id, unidade.nome, unidade.tipo_ligacao.value, unidade.ativa,
+                                 posicao, tamanho])
+                linhas.append(linha)
+                posicao += tamanho
+
+            self._escrever_atomico("".join(linhas), arquivo_unidades)
+
+            indice = {
+                'geracao': geracao,
+                'assinatura_json': self._assinatura_json(),
+                'arquivo_unidades': os.path.basename(arquivo_unidades),
+                'configuracao': self._converter_para_json_compativel(sistema.configuracao),
+                'historico_creditos': self._converter_para_json_compativel(sistema.historico_creditos),
+                'configuracao_relatorio': self._converter_para_json_compativel(sistema.configuracao_relatorio),
+                'metadados': {campo: self._converter_para_json_compativel(getattr(sistema, campo))
+                              for campo in CAMPOS_METADADOS},
+                'resumo': calcular_resumo(sistema.unidades).como_dict(),
+                'unidades': entradas
+            }
+            self._escrever_atomico(json.dumps(indice, ensure_ascii=False), self.arquivo_indice)
+            self._remover_geracoes_sem_uso(arquivo_unidades)
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar dados paginados de '{self.arquivo_dados}': {e}")
+
+    def abrir_paginado(self) -> SistemaPaginado:
+        """
+        Abre o sistema lendo apenas índice, configuração e resumo.
+        Regenera o layout antes, se o JSON mudou depois da última gravação paginada.
+        """
+        if not self.existe_paginado() and not os.path.exists(self.arquivo_dados):
+            raise ErroCarregamentoDados(f"Layout paginado não encontrado: '{self.arquivo_indice}'")
+
+        try:
+            indice = self._ler_indice_sincronizado()
+            arquivo_unidades = os.path.join(self._diretorio(), indice['arquivo_unidades'])
+            posicoes = {}
+            entradas = []
+            for id_unidade, nome, tipo, ativa, inicio, tamanho in indice['unidades']:
+                entradas.append(EntradaIndiceUnidade(id_unidade, nome, TipoLigacao(tipo), ativa))
+                posicoes[id_unidade] = (inicio, tamanho)
+
+            def carregar(ids: Sequence[str]) -> List[UnidadeConsumidora]:
+                return self._ler_unidades(arquivo_unidades, [(i, posicoes[i]) for i in ids if i in posicoes])
+
+            unidades = UnidadesSobDemanda(entradas, carregar, self.tamanho_cache)
+            self._abertos[unidades] = os.path.abspath(arquivo_unidades)
+
+            metadados = indice.get('metadados', {})
+            return SistemaPaginado(
+                configuracao=self._montar_dataclass(ConfiguracaoSistema, indice.get('configuracao', {})),
+                unidades=unidades,
+                resumo=ResumoSistema.de_dict(indice.get('resumo', {})),
+                historico_creditos=[self._montar_dataclass(HistoricoCreditos, c)
+                                    for c in indice.get('historico_creditos', [])],
+                configuracao_relatorio=self._montar_dataclass(ConfiguracaoRelatorio,
+                                                              indice.get('configuracao_relatorio', {})),
+                metadados={campo: metadados[campo] for campo in CAMPOS_METADADOS if campo in metadados}
+            )
+        except Exception as e:
+            raise ErroCarregamentoDados(f"Erro ao abrir dados paginados de '{self.arquivo_dados}': {e}")
+
+    # Métodos auxiliares privados
+
+    def _assinatura_json(self) -> List:
+        """Assinatura do snapshot/journal JSON no formato gravado no índice"""
+        return [list(estado) if estado is not None else None for estado in self._assinatura_arquivos()]
+
+    def _diretorio(self) -> str:
+        return os.path.dirname(os.path.abspath(self.arquivo_dados))
+
+    def _remover_geracoes_sem_uso(self, arquivo_atual: str):
+        """Remove arquivos de unidades de gerações anteriores que nenhum sistema aberto lê"""
+        prefixo = f"{os.path.basename(self.arquivo_dados)}.unidades."
+        em_uso = set(self._abertos.values())
+        em_uso.add(os.path.abspath(arquivo_atual))
+        for nome in os.listdir(self._diretorio()):
+            if not (nome.startswith(prefixo) and nome.endswith('.jsonl')):
+                continue
+            caminho = os.path.join(self._diretorio(), nome)
+            if caminho not in em_uso:
+                os.remove(caminho)
+
+    def _ler_indice_sincronizado(self) -> Dict:
+        """Índice paginado, regravado antes a partir do JSON se este mudou desde a última gravação"""
+        with self._trava:
+            indice = self._ler_indice() if self.existe_paginado() else None
+            if os.path.exists(self.arquivo_dados) and \
+                    (indice is None or indice.get('assinatura_json') != self._assinatura_json()):
+                self.salvar_paginado(self.carregar_sistema())
+                indice = self._ler_indice()
+            return indice
+
+    def _ler_indice(self) -> Dict:
+        with open(self.arquivo_indice, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _ler_unidades(self, arquivo: str, posicoes) -> List[UnidadeConsumidora]:
+        """Lê os registros pedidos, em ordem de posição no arquivo"""
+        registros = {}
+        if not os.path.exists(arquivo):
+            # Removido por outro processo depois de um salvamento mais novo
+            raise ErroCarregamentoDados(
+                f"Arquivo de unidades '{arquivo}' foi substituído por um salvamento mais novo; "
+                f"reabra o sistema com abrir_paginado")
+        with open(arquivo, 'rb') as f:
+            for id_unidade, (inicio, tamanho) in sorted(posicoes, key=lambda item: item[1][0]):
+                f.seek(inicio)
+                registros[id_unidade] = json.loads(f.read(tamanho).decode('utf-8'))
+
+        unidades = []
+        for id_unidade, _ in posicoes:
+            dados = registros[id_unidade]
+            dados['tipo_ligacao'] = TipoLigacao(dados['tipo_ligacao'])
+            unidades.append(self._montar_dataclass(UnidadeConsumidora, dados))
+        return unidades
@@ -0,0 +1,171 @@
+"""
+Exportador de planilhas Excel
+Grava as abas em modo somente escrita do openpyxl: as linhas são geradas sob
+demanda e enviadas direto ao arquivo, sem montar a pasta de trabalho na memória
+"""
+
+import math
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+from openpyxl import Workbook
+
+from nucleo.modelos import SistemaEnergia
+from nucleo.excecoes import ErroExportacaoArquivo
+from nucleo.unidades_compactas import obter_matriz_compacta
+from negocio.calculadora_creditos import CalculadoraCreditos
+from negocio.contexto_calculo import ContextoCalculo
+from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+
+ABA_CONSUMO = 'Consumo Mensal'
+ABA_CREDITOS = 'Créditos'
+ABA_CREDITOS_MENSAIS = 'Créditos Mensais'
+ABA_FINANCEIRO = 'Financeiro Anual'
+
+MESES_ABREVIADOS = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+                    'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+# Unidades lidas por vez ao montar a matriz de consumo
+TAMANHO_BLOCO_PADRAO = 2000
+
+
+class ExportadorExcel:
+    """
+    Exporta consumos, distribuição de créditos e resultados financeiros
+
+    Cada aba é escrita a partir de um gerador de linhas; o arquivo é montado
+    em um temporário no mesmo diretório e só substitui o destino no final.
+    """
+
+    def __init__(self, sistema: SistemaEnergia, contexto: ContextoCalculo = None,
+                 tamanho_bloco: int = TAMANHO_BLOCO_PADRAO):
+        self.sistema = sistema
+        self.contexto = contexto
+        self.tamanho_bloco = tamanho_bloco
+
+    def exportar(self, caminho_arquivo: str, ano: int = None, metodo: str = 'proporcional') -> str:
+        """Grava a planilha completa; retorna o caminho do arquivo"""
+        if ano is None:
+            ano = datetime.now().year
+
+        temporario = None
+        try:
+            pasta = Workbook(write_only=True)
+            self._escrever_aba(pasta, ABA_CONSUMO, self.linhas_consumo())
+
+            # Relatório de créditos usado pelas duas abas de créditos
+            relatorio = CalculadoraCreditos(self.sistema).obter_relatorio_creditos_completo(ano, metodo)
+            self._escrever_aba(pasta, ABA_CREDITOS, self.linhas_creditos(relatorio))
+            self._escrever_aba(pasta, ABA_CREDITOS_MENSAIS, self.linhas_creditos_mensais(relatorio))
+            del relatorio
+
+            self._escrever_aba(pasta, ABA_FINANCEIRO, self.linhas_financeiro(ano))
+
+            diretorio = os.path.dirname(os.path.abspath(caminho_arquivo))
+            os.makedirs(diretorio, exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(prefix='.tmp_', suffix='.xlsx', dir=diretorio)
+            os.close(descritor)
+            pasta.save(temporario)
+            os.replace(temporario, caminho_arquivo)
+            return caminho_arquivo
+
+        except Exception as e:
+            if temporario is not None and os.path.exists(temporario):
+                os.remove(temporario)
+            raise ErroExportacaoArquivo(f"Erro ao exportar Excel '{caminho_arquivo}': {e}")
+
+    # Linhas das abas (cabeçalho primeiro)
+
+    def linhas_consumo(self) -> Iterator[List[Any]]:
+        """Uma linha por unidade com o consumo de cada mês e o total"""
+        yield ['ID', 'Nome', 'Tipo Ligação', 'Ativa'] + MESES_ABREVIADOS + ['Total (kWh)']
+
+        unidades = self.sistema.unidades
+        for inicio in range(0, len(unidades), self.tamanho_bloco):
+            bloco = unidades[inicio:inicio + self.tamanho_bloco]
+            matriz = obter_matriz_compacta(bloco)
+            if matriz is None:
+                matriz = np.array([u.consumo_mensal_kwh[:12] for u in bloco], dtype=float).reshape(-1, 12)
+            totais = matriz.sum(axis=1).tolist()
+
+            for unidade, consumos, total in zip(bloco, matriz.tolist(), totais):
+                yield [unidade.id, unidade.nome, unidade.tipo_ligacao.value, unidade.ativa] + consumos + [total]
+
+    @staticmethod
+    def linhas_creditos(relatorio: dict) -> Iterator[List[Any]]:
+        """Créditos recebidos por unidade em cada mês e o resumo anual"""
+        yield (['ID', 'Nome', 'Tipo Ligação', 'Consumo Anual (kWh)'] + MESES_ABREVIADOS
+               + ['Créditos Anuais (kWh)', 'Valor Final Anual (kWh)', 'Consumo (%)'])
+
+        distribuicoes = [detalhe['distribuicao'] for detalhe in relatorio['detalhes_mensais']]
+        for unidade in relatorio['unidades']:
+            creditos = [distribuicao[unidade['id']]['creditos_recebidos'] for distribuicao in distribuicoes]
+            yield ([unidade['id'], unidade['nome'], unidade['tipo_ligacao'], unidade['consumo_anual']]
+                   + creditos
+                   + [unidade['creditos_anuais'], unidade['valor_final_anual'], unidade['percentual_consumo']])
+
+    @staticmethod
+    def linhas_creditos_mensais(relatorio: dict) -> Iterator[List[Any]]:
+        """Balanço de créditos de cada mês e o total do ano"""
+        yield ['Mês', 'Geração Real (kWh)', 'Consumo Total (kWh)', 'Tarifas Mínimas (kWh)',
+               'Créditos Disponíveis (kWh)', 'Créditos Utilizados (kWh)', 'Créditos Restantes (kWh)', 'Status']
+
+        chaves = ('geracao_real', 'consumo_total', 'tarifas_minimas',
+                  'creditos_disponiveis', 'creditos_utilizados', 'creditos_restantes')
+        totais = [0.0] * len(chaves)
+        for detalhe in relatorio['detalhes_mensais']:
+            resumo = detalhe['resumo']
+            valores = [resumo[chave] for chave in chaves]
+            totais = [t + v for t, v in zip(totais, valores)]
+            yield [MESES_ABREVIADOS[resumo['mes'] - 1]] + valores + [resumo['status']]
+
+        yield ['Total'] + totais + [relatorio['resumo_anual']['status']]
+
+    def linhas_financeiro(self, ano: int) -> Iterator[List[Any]]:
+        """Resultados financeiros mensais, totais e indicadores do ano"""
+        resultado = GerenciadorDistribuicao(self.sistema, self.contexto).calcular_resultado_financeiro_anual(ano)
+
+        yield ['Mês', 'Custo sem Solar (R$)', 'Custo com Solar (R$)', 'Economia (R$)',
+               'Valor Energia Injetada (R$)', 'Valor Créditos Utilizados (R$)',
+               'Bandeira', 'Valor Bandeira (R$)', 'Impostos (R$)']
+
+        for mensal in resultado.resultados_mensais:
+            yield [MESES_ABREVIADOS[mensal.mes - 1], mensal.custo_sem_solar, mensal.custo_com_solar,
+                   mensal.economia_mensal, mensal.valor_energia_injetada, mensal.valor_creditos_utilizados,
+                   mensal.bandeira_aplicada.value, mensal.valor_bandeira, mensal.impostos]
+
+        mensais = resultado.resultados_mensais
+        yield ['Total', resultado.custo_total_sem_solar, resultado.custo_total_com_solar, resultado.economia_total,
+               sum(m.valor_energia_injetada for m in mensais), sum(m.valor_creditos_utilizados for m in mensais),
+               None, sum(m.valor_bandeira for m in mensais), sum(m.impostos for m in mensais)]
+
+        yield []
+        yield ['Indicador', 'Valor']
+        yield ['Ano', resultado.ano]
+        yield ['Investimento (R$)', resultado.valor_investimento]
+        yield ['Economia Anual (R$)', resultado.economia_total]
+        yield ['Payback Simples (anos)', _numero(resultado.payback_simples_anos)]
+        yield ['ROI 25 anos (%)', _numero(resultado.roi_percentual)]
+        yield ['TIR (%)', _numero(resultado.tir_percentual)]
+
+    # Métodos auxiliares privados
+
+    @staticmethod
+    def _escrever_aba(pasta: Workbook, titulo: str, linhas: Iterator[Sequence[Any]]):
+        aba = pasta.create_sheet(titulo)
+        for linha in linhas:
+            aba.append(linha)
+
+
+def exportar_excel(caminho_arquivo: str, sistema: SistemaEnergia, ano: int = None,
+                   contexto: ContextoCalculo = None) -> str:
+    """Exporta o sistema para uma planilha Excel"""
+    return ExportadorExcel(sistema, contexto).exportar(caminho_arquivo, ano)
+
+
+def _numero(valor: float) -> Optional[float]:
+    """Valor numérico para a célula; infinito/NaN ficam vazios (o Excel não os representa)"""
+    return valor if math.isfinite(valor) else None
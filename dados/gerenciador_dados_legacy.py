@@ -3,10 +3,10 @@ Gerenciador de dados compatível com sistema legacy
 Adaptação das funções originais para a nova estrutura
 """
 
-import json
 import os
 from typing import Dict, List, Tuple, Any
 from nucleo.modelos import SistemaEnergia, UnidadeConsumidora, ConfiguracaoSistema, TipoLigacao, TipoUnidade
+from dados.armazem_dados import obter_armazem
 
 
 class GerenciadorDadosLegacy:
@@ -34,11 +34,11 @@ class GerenciadorDadosLegacy:
         }
 
     def carregar_dados(self) -> Dict:
-        """Carrega dados do arquivo JSON ou cria dados de exemplo"""
+        """Carrega dados do arquivo JSON (cópia do documento do armazém do processo) ou cria dados de exemplo"""
         if os.path.exists(self.arquivo_dados):
             try:
-                with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
-                    dados = json.load(f)
+                # Cópia própria: a migração e o chamador alteram o documento no lugar
+                dados = obter_armazem().ler_json(self.arquivo_dados, copiar=True)
 
                 # Migração automática
                 dados = self.migrar_meses_para_formato_completo(dados)
@@ -84,8 +84,7 @@ class GerenciadorDadosLegacy:
     def salvar_dados(self, dados: Dict) -> bool:
         """Salva dados no arquivo JSON"""
         try:
-            with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, indent=2, ensure_ascii=False)
+            obter_armazem().gravar_json(self.arquivo_dados, dados)
             print("✅ Dados salvos com sucesso")
             return True
         except Exception as e:
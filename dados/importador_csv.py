@@ -0,0 +1,171 @@
+"""
+Importador de consumos em CSV
+Lê o arquivo em fluxo com o módulo csv, localiza as unidades por índice hash e
+aplica os consumos em lotes, coluna a coluna
+"""
+
+import csv
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from nucleo.modelos import SistemaEnergia
+from nucleo.excecoes import ErroMigracaoDados
+from nucleo.unidades_compactas import obter_matriz_compacta
+
+# Colunas aceitas para identificar a unidade (a primeira encontrada é usada)
+COLUNAS_IDENTIFICACAO = ['id', 'ID', 'Id', 'nome', 'Nome', 'unidade', 'Unidade']
+
+MESES_ABREVIADOS = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+                    'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+TAMANHO_LOTE_PADRAO = 50000
+
+# Rejeições guardadas com detalhe; as demais são apenas contadas
+LIMITE_REJEICOES_DETALHADAS = 1000
+
+
+@dataclass
+class LinhaRejeitada:
+    """Linha do CSV não aplicada"""
+    numero: int
+    motivo: str
+    conteudo: List[str]
+
+
+@dataclass
+class ResultadoImportacaoCsv:
+    """Resumo de uma importação de consumos"""
+    linhas_lidas: int = 0
+    linhas_aplicadas: int = 0
+    total_rejeitadas: int = 0
+    rejeitadas: List[LinhaRejeitada] = field(default_factory=list)
+    unidades_atualizadas: int = 0
+
+    def rejeitar(self, numero: int, motivo: str, conteudo: Sequence[str]):
+        self.total_rejeitadas += 1
+        if len(self.rejeitadas) < LIMITE_REJEICOES_DETALHADAS:
+            self.rejeitadas.append(LinhaRejeitada(numero, motivo, list(conteudo)))
+
+
+class ImportadorConsumoCsv:
+    """
+    Aplica consumos mensais de um CSV às unidades do sistema
+
+    A unidade é localizada pelo id ou, se não houver id igual, pelo nome. Cada
+    linha altera apenas os meses preenchidos; linhas repetidas para a mesma
+    unidade valem na ordem do arquivo. Linhas com unidade desconhecida ou valor
+    não numérico são rejeitadas inteiras e a importação continua.
+    """
+
+    def __init__(self, sistema: SistemaEnergia, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        self.sistema = sistema
+        self.tamanho_lote = tamanho_lote
+
+        # Índice hash: id prevalece sobre nome; em nomes repetidos vale a primeira unidade
+        self._posicoes: Dict[str, int] = {}
+        for posicao, unidade in enumerate(sistema.unidades):
+            self._posicoes.setdefault(str(unidade.nome), posicao)
+        for posicao, unidade in enumerate(sistema.unidades):
+            self._posicoes[str(unidade.id)] = posicao
+
+    def importar(self, caminho_arquivo: str, encoding: str = 'utf-8-sig') -> ResultadoImportacaoCsv:
+        """Lê e aplica o arquivo inteiro (utf-8-sig: o BOM gravado pelo Excel não entra no cabeçalho)"""
+        try:
+            with open(caminho_arquivo, 'r', encoding=encoding, newline='') as f:
+                return self.importar_linhas(csv.reader(f))
+        except ErroMigracaoDados:
+            raise
+        except Exception as e:
+            raise ErroMigracaoDados(f"Erro ao importar consumos de '{caminho_arquivo}': {e}")
+
+    def importar_linhas(self, leitor) -> ResultadoImportacaoCsv:
+        """Aplica linhas já separadas em campos (primeira linha = cabeçalho)"""
+        cabecalho = next(leitor, None)
+        if cabecalho is None:
+            raise ErroMigracaoDados("CSV vazio")
+
+        coluna_id = next((cabecalho.index(c) for c in COLUNAS_IDENTIFICACAO if c in cabecalho), None)
+        if coluna_id is None:
+            raise ErroMigracaoDados("Coluna de identificação não encontrada no CSV")
+        colunas_meses = [(i, cabecalho.index(mes)) for i, mes in enumerate(MESES_ABREVIADOS) if mes in cabecalho]
+
+        resultado = ResultadoImportacaoCsv()
+        atualizadas = set()
+        posicoes: List[int] = []
+        valores: List[List[float]] = []
+        vazio = float('nan')
+
+        for numero, linha in enumerate(leitor, start=2):
+            if not linha:
+                continue
+            resultado.linhas_lidas += 1
+
+            identificacao = linha[coluna_id].strip() if coluna_id < len(linha) else ''
+            posicao = self._posicoes.get(identificacao)
+            if posicao is None:
+                motivo = "Identificação vazia" if not identificacao else f"Unidade não encontrada: {identificacao}"
+                resultado.rejeitar(numero, motivo, linha)
+                continue
+
+            consumos = [vazio] * 12
+            try:
+                for mes, coluna in colunas_meses:
+                    if coluna < len(linha) and linha[coluna].strip():
+                        consumos[mes] = float(linha[coluna])
+                        # 'nan' se confundiria com campo vazio; 'inf' não é consumo
+                        if not math.isfinite(consumos[mes]):
+                            raise ValueError(linha[coluna])
+            except ValueError:
+                resultado.rejeitar(numero, f"Valor inválido em {MESES_ABREVIADOS[mes]}: {linha[coluna]!r}", linha)
+                continue
+
+            posicoes.append(posicao)
+            valores.append(consumos)
+            if len(posicoes) >= self.tamanho_lote:
+                atualizadas.update(self._aplicar_lote(posicoes, valores))
+                resultado.linhas_aplicadas += len(posicoes)
+                posicoes, valores = [], []
+
+        if posicoes:
+            atualizadas.update(self._aplicar_lote(posicoes, valores))
+            resultado.linhas_aplicadas += len(posicoes)
+
+        resultado.unidades_atualizadas = len(atualizadas)
+        return resultado
+
+    # Métodos auxiliares privados
+
+    def _aplicar_lote(self, posicoes: List[int], valores: List[List[float]]) -> np.ndarray:
+        """Grava um lote de linhas; retorna as posições das unidades alteradas"""
+        posicoes = np.asarray(posicoes, dtype=np.intp)
+        valores = np.asarray(valores, dtype=float)
+
+        alteradas, linha_de = np.unique(posicoes, return_inverse=True)
+        unidades = [self.sistema.unidades[p] for p in alteradas]
+        matriz = obter_matriz_compacta(unidades)
+        if matriz is None:
+            matriz = np.array([list(u.consumo_mensal_kwh) for u in unidades], dtype=float)
+
+        for mes in range(12):
+            preenchidos = ~np.isnan(valores[:, mes])
+            if not preenchidos.any():
+                continue
+            # Última ocorrência de cada unidade no lote (ordem do arquivo)
+            linhas = linha_de[preenchidos][::-1]
+            linhas_unicas, primeira = np.unique(linhas, return_index=True)
+            matriz[linhas_unicas, mes] = valores[preenchidos, mes][::-1][primeira]
+
+        # Uma atribuição por unidade (uma notificação de rastreamento)
+        for unidade, consumos in zip(unidades, matriz.tolist()):
+            if list(unidade.consumo_mensal_kwh) != consumos:
+                unidade.consumo_mensal_kwh = consumos
+        return alteradas
+
+
+def importar_consumos_csv(caminho_arquivo: str, sistema: SistemaEnergia,
+                          tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> ResultadoImportacaoCsv:
+    """Aplica os consumos de um CSV ao sistema"""
+    return ImportadorConsumoCsv(sistema, tamanho_lote).importar(caminho_arquivo)
@@ -0,0 +1,227 @@
+"""
+Importador de planilhas Excel do sistema legacy
+Lê as abas em modo somente leitura do openpyxl, linha a linha, sem carregar a
+pasta de trabalho inteira na memória
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+
+from nucleo.excecoes import ErroMigracaoDados
+
+# Nomes aceitos para cada aba (o primeiro encontrado é usado)
+ABAS_CONFIGURACAO = ['Configuracao', 'Config', 'Sistema', 'Configurações']
+ABAS_UNIDADES = ['Unidades', 'Consumidores', 'Clientes']
+ABAS_CONSUMOS = ['Consumos', 'Historico', 'Dados']
+
+MESES_ABREVIADOS = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+                    'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+# O openpyxl só lê o formato .xlsx; o binário antigo (.xls) é recusado antes de abrir
+MENSAGEM_XLS_NAO_SUPORTADO = ("Planilhas .xls (Excel 97-2003) não são suportadas; "
+                              "salve o arquivo como .xlsx e importe novamente")
+
+CONFIGURACAO_PADRAO = {
+    'potencia_sistema': 100.0,
+    'eficiencia': 0.85,
+    'tarifa_energia': 0.75,
+    'custo_investimento': 0.0
+}
+
+
+class ImportadorExcel:
+    """
+    Leitura em fluxo das abas de configuração, unidades e consumos
+
+    Produz o mesmo dicionário que MigradorDados espera
+    ({'configuracao', 'unidades', 'consumos'}); células vazias contam como
+    ausentes e linhas totalmente vazias são ignoradas.
+    """
+
+    def __init__(self, caminho_arquivo: str):
+        self.caminho_arquivo = caminho_arquivo
+        self.abas: List[str] = []  # Preenchido por ler()
+        self._posicao: Tuple[str, int] = ("", 0)  # Aba e linha em processamento
+
+    def nomes_abas(self) -> List[str]:
+        """Nomes das abas da planilha"""
+        pasta = self._abrir()
+        try:
+            return list(pasta.sheetnames)
+        finally:
+            pasta.close()
+
+    def ler(self) -> Dict[str, Any]:
+        """
+        Lê as abas reconhecidas da planilha
+
+        Para no primeiro valor inválido, informando aba e linha no erro.
+        """
+        pasta = self._abrir()
+        try:
+            self.abas = list(pasta.sheetnames)
+            dados = {}
+            aba = self._localizar_aba(pasta, ABAS_CONFIGURACAO)
+            if aba is not None:
+                dados['configuracao'] = self.processar_configuracao(self._linhas(aba))
+
+            aba = self._localizar_aba(pasta, ABAS_UNIDADES)
+            if aba is not None:
+                dados['unidades'] = list(self.processar_unidades(self._linhas(aba)))
+
+            aba = self._localizar_aba(pasta, ABAS_CONSUMOS)
+            if aba is not None:
+                dados['consumos'] = self.processar_consumos(self._linhas(aba))
+
+            return dados
+        except ErroMigracaoDados:
+            raise
+        except (ValueError, TypeError) as e:
+            aba, linha = self._posicao
+            raise ErroMigracaoDados(f"Erro ao ler Excel: aba '{aba}', linha {linha}: {e}")
+        except Exception as e:
+            raise ErroMigracaoDados(f"Erro ao ler Excel: {e}")
+        finally:
+            pasta.close()
+
+    # Processamento das abas (cabeçalho + linhas de valores)
+
+    @staticmethod
+    def processar_configuracao(linhas: Tuple[Sequence[Any], Iterator[Sequence[Any]]]) -> Dict[str, Any]:
+        """Aba no formato Parametro/Valor"""
+        cabecalho, valores = linhas
+        config = {}
+
+        colunas = _indices_colunas(cabecalho)
+        if 'Parametro' in colunas and 'Valor' in colunas:
+            i_parametro, i_valor = colunas['Parametro'], colunas['Valor']
+            for linha in valores:
+                parametro = str(_celula(linha, i_parametro)).lower().replace(' ', '_')
+                valor = _celula(linha, i_valor)
+
+                # Mapear parâmetros conhecidos
+                if 'potencia' in parametro:
+                    chave = 'potencia_sistema'
+                elif 'eficiencia' in parametro:
+                    chave = 'eficiencia'
+                elif 'tarifa' in parametro:
+                    chave = 'tarifa_energia'
+                elif 'investimento' in parametro or 'custo' in parametro:
+                    chave = 'custo_investimento'
+                else:
+                    continue
+                config[chave] = float(valor) if valor is not None else CONFIGURACAO_PADRAO[chave]
+
+        for chave, valor in CONFIGURACAO_PADRAO.items():
+            config.setdefault(chave, valor)
+        config.setdefault('geracao_mensal', [8000] * 12)
+        return config
+
+    @staticmethod
+    def processar_unidades(linhas: Tuple[Sequence[Any], Iterator[Sequence[Any]]]) -> Iterator[Dict[str, Any]]:
+        """Uma unidade por linha (Nome, Tipo_Ligacao, Percentual e meses Jan..Dez)"""
+        cabecalho, valores = linhas
+        colunas = _indices_colunas(cabecalho)
+        i_nome = colunas.get('Nome')
+        i_tipo = colunas.get('Tipo_Ligacao')
+        i_percentual = colunas.get('Percentual')
+        i_meses = [colunas.get(mes) for mes in MESES_ABREVIADOS]
+
+        for indice, linha in enumerate(valores):
+            nome = _celula(linha, i_nome)
+            tipo = _celula(linha, i_tipo)
+            percentual = _celula(linha, i_percentual)
+
+            consumo_mensal = [0] * 12
+            for i, coluna in enumerate(i_meses):
+                valor = _celula(linha, coluna)
+                if valor is not None:
+                    consumo_mensal[i] = float(valor)
+
+            yield {
+                'nome': str(nome) if nome is not None else f'Unidade {indice + 1}',
+                'tipo_ligacao': str(tipo if tipo is not None else 'monofasica').lower(),
+                'consumo_mensal': consumo_mensal,
+                'percentual_alocacao': float(percentual) if percentual is not None else 0.0
+            }
+
+    @staticmethod
+    def processar_consumos(linhas: Tuple[Sequence[Any], Iterator[Sequence[Any]]]) -> Dict[str, List[float]]:
+        """Primeira coluna identifica a unidade; as 12 seguintes são os meses"""
+        cabecalho, valores = linhas
+        consumos = {}
+
+        if len(cabecalho) >= 13:  # ID + 12 meses
+            for linha in valores:
+                consumo_mensal = [0.0] * 12
+                for i in range(12):
+                    valor = _celula(linha, i + 1)
+                    if valor is not None:
+                        consumo_mensal[i] = float(valor)
+                consumos[str(_celula(linha, 0))] = consumo_mensal
+
+        return consumos
+
+    # Métodos auxiliares privados
+
+    def _abrir(self):
+        if Path(self.caminho_arquivo).suffix.lower() == '.xls':
+            raise ErroMigracaoDados(MENSAGEM_XLS_NAO_SUPORTADO)
+        try:
+            return load_workbook(self.caminho_arquivo, read_only=True, data_only=True)
+        except Exception as e:
+            raise ErroMigracaoDados(f"Erro ao abrir Excel '{self.caminho_arquivo}': {e}")
+
+    @staticmethod
+    def _localizar_aba(pasta, nomes: List[str]):
+        for nome in nomes:
+            if nome in pasta.sheetnames:
+                return pasta[nome]
+        return None
+
+    def _linhas(self, aba) -> Tuple[Sequence[Any], Iterator[Sequence[Any]]]:
+        """Cabeçalho e iterador das linhas não vazias seguintes"""
+        iterador = aba.iter_rows(values_only=True)
+        self._posicao = (aba.title, 1)
+        cabecalho = _aparar(next(iterador, ()))
+        return cabecalho, self._valores(aba.title, iterador)
+
+    def _valores(self, titulo: str, iterador) -> Iterator[Sequence[Any]]:
+        for numero, linha in enumerate(iterador, start=2):
+            if any(c is not None for c in linha):
+                self._posicao = (titulo, numero)
+                yield linha
+
+
+def ler_excel_legacy(caminho_arquivo: str) -> Dict[str, Any]:
+    """Lê uma planilha legacy em modo fluxo"""
+    return ImportadorExcel(caminho_arquivo).ler()
+
+
+def _indices_colunas(cabecalho: Sequence[Any]) -> Dict[Any, int]:
+    """Nome da coluna -> posição (a primeira ocorrência prevalece)"""
+    colunas = {}
+    for i, nome in enumerate(cabecalho):
+        if nome is not None:
+            colunas.setdefault(nome, i)
+    return colunas
+
+
+def _celula(linha: Sequence[Any], indice: Optional[int]) -> Any:
+    """Valor da célula (None se a coluna não existe, a linha é curta ou a célula é vazia/texto em branco)"""
+    if indice is None or indice >= len(linha):
+        return None
+    valor = linha[indice]
+    if isinstance(valor, str) and not valor.strip():
+        return None
+    return valor
+
+
+def _aparar(cabecalho: Sequence[Any]) -> Tuple[Any, ...]:
+    """Remove células vazias à direita do cabeçalho (dimensão da aba maior que os dados)"""
+    cabecalho = list(cabecalho)
+    while cabecalho and cabecalho[-1] is None:
+        cabecalho.pop()
+    return tuple(cabecalho)
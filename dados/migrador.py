@@ -2,9 +2,11 @@
 Migrador de dados - Versão adaptada para importar dados do sistema legacy
 """
 
+import csv
 import json
-import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 import os
 from pathlib import Path
@@ -16,6 +18,9 @@ from nucleo.modelos import (
 )
 from nucleo.excecoes import ErroMigracaoDados
 from dados.repositorio import RepositorioDados
+from dados.armazem_dados import escrever_atomico
+from dados.importador_excel import ImportadorExcel, MENSAGEM_XLS_NAO_SUPORTADO
+from dados.importador_csv import ImportadorConsumoCsv, ResultadoImportacaoCsv
 
 
 class MigradorDados:
@@ -24,6 +29,7 @@ class MigradorDados:
     def __init__(self):
         self.repositorio = RepositorioDados()
         self.log_migracoes = []
+        self.resultado_csv: Optional[ResultadoImportacaoCsv] = None
 
     def migrar_excel_legacy(self, caminho_arquivo: str) -> SistemaEnergia:
         """
@@ -37,17 +43,7 @@ class MigradorDados:
 
             # Ler arquivo Excel
             dados_excel = self._ler_excel_legacy(caminho_arquivo)
-
-            # Converter para formato novo
-            sistema = self._converter_excel_para_sistema(dados_excel)
-
-            # Validar dados migrados
-            erros = sistema.validar_integridade()
-            if erros:
-                self._log(f"Avisos na validação: {erros}")
-
-            self._log("Migração de Excel concluída com sucesso")
-            return sistema
+            return self._migrar_dados_excel(dados_excel)
 
         except Exception as e:
             raise ErroMigracaoDados(f"Erro na migração de Excel: {e}")
@@ -65,17 +61,7 @@ class MigradorDados:
             # Ler arquivo JSON
             with open(caminho_arquivo, 'r', encoding='utf-8') as f:
                 dados_json = json.load(f)
-
-            # Converter usando função do modelo
-            sistema = converter_dados_legacy(dados_json)
-
-            # Validar dados migrados
-            erros = sistema.validar_integridade()
-            if erros:
-                self._log(f"Avisos na validação: {erros}")
-
-            self._log("Migração de JSON concluída com sucesso")
-            return sistema
+            return self._migrar_dados_json(dados_json)
 
         except Exception as e:
             raise ErroMigracaoDados(f"Erro na migração de JSON: {e}")
@@ -83,6 +69,9 @@ class MigradorDados:
     def migrar_csv_consumos(self, caminho_arquivo: str, sistema: SistemaEnergia) -> SistemaEnergia:
         """
         Migra dados de consumo de arquivo CSV
+
+        Linhas rejeitadas não interrompem a migração: ficam no log e em
+        self.resultado_csv.
         """
         try:
             self._log("Iniciando migração de consumos CSV")
@@ -90,13 +79,17 @@ class MigradorDados:
             if not os.path.exists(caminho_arquivo):
                 raise ErroMigracaoDados(f"Arquivo não encontrado: {caminho_arquivo}")
 
-            # Ler CSV
-            df = pd.read_csv(caminho_arquivo, encoding='utf-8')
+            # Ler CSV em fluxo e aplicar em lotes
+            resultado = ImportadorConsumoCsv(sistema).importar(caminho_arquivo)
+            self.resultado_csv = resultado
 
-            # Processar dados de consumo
-            self._processar_consumos_csv(df, sistema)
+            for rejeitada in resultado.rejeitadas:
+                self._log(f"Linha {rejeitada.numero} rejeitada: {rejeitada.motivo}")
+            if resultado.total_rejeitadas > len(resultado.rejeitadas):
+                self._log(f"... e mais {resultado.total_rejeitadas - len(resultado.rejeitadas)} linhas rejeitadas")
 
-            self._log("Migração de consumos CSV concluída")
+            self._log(f"Migração de consumos CSV concluída: {resultado.linhas_aplicadas} linhas aplicadas, "
+                      f"{resultado.total_rejeitadas} rejeitadas")
             return sistema
 
         except Exception as e:
@@ -160,8 +153,10 @@ class MigradorDados:
                 resultado_validacao['erros'].append("Arquivo não encontrado")
                 return resultado_validacao
 
-            if extensao == '.xlsx' or extensao == '.xls':
+            if extensao == '.xlsx':
                 resultado_validacao.update(self._validar_excel_legacy(caminho_arquivo))
+            elif extensao == '.xls':
+                resultado_validacao['erros'].append(MENSAGEM_XLS_NAO_SUPORTADO)
             elif extensao == '.json':
                 resultado_validacao.update(self._validar_json_legacy(caminho_arquivo))
             elif extensao == '.csv':
@@ -181,6 +176,52 @@ class MigradorDados:
                 'estatisticas': {}
             }
 
+    def migrar_com_validacao(self, caminho_arquivo: str) -> Tuple[Optional[SistemaEnergia], Dict[str, Any]]:
+        """
+        Valida e migra lendo o arquivo uma única vez
+
+        Retorna o sistema migrado (None se o arquivo for inválido ou a migração
+        falhar) e o relatório no mesmo formato de validar_arquivo_legacy. Para no
+        primeiro erro fatal (arquivo ausente, tipo não suportado, arquivo
+        ilegível ou valor inválido) sem processar o restante.
+        """
+        extensao = Path(caminho_arquivo).suffix.lower()
+        resultado_validacao = {
+            'valido': False,
+            'tipo_arquivo': extensao,
+            'erros': [],
+            'avisos': [],
+            'estatisticas': {}
+        }
+        sistema = None
+
+        try:
+            if not os.path.exists(caminho_arquivo):
+                resultado_validacao['erros'].append("Arquivo não encontrado")
+            elif extensao == '.xls':
+                resultado_validacao['erros'].append(MENSAGEM_XLS_NAO_SUPORTADO)
+            elif extensao == '.xlsx':
+                importador = ImportadorExcel(caminho_arquivo)
+                dados_excel = importador.ler()
+                resultado_validacao.update(self._validar_abas_excel(importador.abas))
+                sistema = self._migrar_dados_excel(dados_excel)
+            elif extensao == '.json':
+                with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+                    dados_json = json.load(f)
+                resultado_validacao.update(self._validar_dados_json(dados_json))
+                if not resultado_validacao['erros']:
+                    sistema = self._migrar_dados_json(dados_json)
+            else:
+                resultado_validacao['erros'].append(f"Tipo de arquivo não suportado: {extensao}")
+        except json.JSONDecodeError as e:
+            resultado_validacao['erros'].append(f"JSON inválido: {e}")
+        except Exception as e:
+            resultado_validacao['erros'].append(f"Erro na migração: {e}")
+            sistema = None
+
+        resultado_validacao['valido'] = len(resultado_validacao['erros']) == 0
+        return sistema, resultado_validacao
+
     def obter_log_migracoes(self) -> List[str]:
         """Retorna log das migrações realizadas"""
         return self.log_migracoes.copy()
@@ -192,118 +233,32 @@ class MigradorDados:
     # Métodos privados
 
     def _ler_excel_legacy(self, caminho_arquivo: str) -> Dict[str, Any]:
-        """Lê arquivo Excel do sistema legacy"""
-        try:
-            # Ler diferentes abas do Excel
-            excel_data = pd.ExcelFile(caminho_arquivo)
-            dados = {}
-
-            # Aba de configurações (assumindo nome padrão)
-            abas_config = ['Configuracao', 'Config', 'Sistema', 'Configurações']
-            for aba in abas_config:
-                if aba in excel_data.sheet_names:
-                    df_config = pd.read_excel(caminho_arquivo, sheet_name=aba)
-                    dados['configuracao'] = self._processar_aba_configuracao(df_config)
-                    break
-
-            # Aba de unidades
-            abas_unidades = ['Unidades', 'Consumidores', 'Clientes']
-            for aba in abas_unidades:
-                if aba in excel_data.sheet_names:
-                    df_unidades = pd.read_excel(caminho_arquivo, sheet_name=aba)
-                    dados['unidades'] = self._processar_aba_unidades(df_unidades)
-                    break
-
-            # Aba de consumos
-            abas_consumos = ['Consumos', 'Historico', 'Dados']
-            for aba in abas_consumos:
-                if aba in excel_data.sheet_names:
-                    df_consumos = pd.read_excel(caminho_arquivo, sheet_name=aba)
-                    dados['consumos'] = self._processar_aba_consumos(df_consumos)
-                    break
-
-            return dados
-
-        except Exception as e:
-            raise ErroMigracaoDados(f"Erro ao ler Excel: {e}")
-
-    def _processar_aba_configuracao(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Processa aba de configuração do Excel"""
-        config = {}
-
-        # Tentar diferentes formatos de configuração
-        if 'Parametro' in df.columns and 'Valor' in df.columns:
-            # Formato chave-valor
-            for _, row in df.iterrows():
-                parametro = str(row['Parametro']).lower().replace(' ', '_')
-                valor = row['Valor']
-
-                # Mapear parâmetros conhecidos
-                if 'potencia' in parametro:
-                    config['potencia_sistema'] = float(valor) if pd.notna(valor) else 100.0
-                elif 'eficiencia' in parametro:
-                    config['eficiencia'] = float(valor) if pd.notna(valor) else 0.85
-                elif 'tarifa' in parametro:
-                    config['tarifa_energia'] = float(valor) if pd.notna(valor) else 0.75
-                elif 'investimento' in parametro or 'custo' in parametro:
-                    config['custo_investimento'] = float(valor) if pd.notna(valor) else 0.0
-
-        # Valores padrão se não encontrados
-        config.setdefault('potencia_sistema', 100.0)
-        config.setdefault('eficiencia', 0.85)
-        config.setdefault('tarifa_energia', 0.75)
-        config.setdefault('custo_investimento', 0.0)
-
-        # Geração mensal padrão
-        config.setdefault('geracao_mensal', [8000] * 12)
-
-        return config
-
-    def _processar_aba_unidades(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Processa aba de unidades do Excel"""
-        unidades = []
-
-        for index, row in df.iterrows():
-            unidade = {
-                'nome': str(row.get('Nome', f'Unidade {index + 1}')),
-                'tipo_ligacao': str(row.get('Tipo_Ligacao', 'monofasica')).lower(),
-                'consumo_mensal': [0] * 12,
-                'percentual_alocacao': float(row.get('Percentual', 0.0)) if pd.notna(row.get('Percentual')) else 0.0
-            }
-
-            # Processar consumo mensal se estiver nas colunas
-            meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
-                     'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-
-            for i, mes in enumerate(meses):
-                if mes in row and pd.notna(row[mes]):
-                    unidade['consumo_mensal'][i] = float(row[mes])
-
-            unidades.append(unidade)
-
-        return unidades
+        """Lê arquivo Excel do sistema legacy (modo fluxo, aba por aba)"""
+        return ImportadorExcel(caminho_arquivo).ler()
 
-    def _processar_aba_consumos(self, df: pd.DataFrame) -> Dict[str, List[float]]:
-        """Processa aba de consumos do Excel"""
-        consumos = {}
+    def _migrar_dados_excel(self, dados_excel: Dict[str, Any]) -> SistemaEnergia:
+        """Converte os dados lidos do Excel e registra a validação"""
+        sistema = self._converter_excel_para_sistema(dados_excel)
 
-        # Assumir que primeira coluna é identificador da unidade
-        if len(df.columns) >= 13:  # ID + 12 meses
-            for _, row in df.iterrows():
-                id_unidade = str(row.iloc[0])
-                consumo_mensal = []
+        # Validar dados migrados
+        erros = sistema.validar_integridade()
+        if erros:
+            self._log(f"Avisos na validação: {erros}")
 
-                for i in range(1, min(13, len(row))):
-                    valor = row.iloc[i]
-                    consumo_mensal.append(float(valor) if pd.notna(valor) else 0.0)
+        self._log("Migração de Excel concluída com sucesso")
+        return sistema
 
-                # Completar com zeros se necessário
-                while len(consumo_mensal) < 12:
-                    consumo_mensal.append(0.0)
+    def _migrar_dados_json(self, dados_json: Dict[str, Any]) -> SistemaEnergia:
+        """Converte os dados lidos do JSON e registra a validação"""
+        sistema = converter_dados_legacy(dados_json)
 
-                consumos[id_unidade] = consumo_mensal
+        # Validar dados migrados
+        erros = sistema.validar_integridade()
+        if erros:
+            self._log(f"Avisos na validação: {erros}")
 
-        return consumos
+        self._log("Migração de JSON concluída com sucesso")
+        return sistema
 
     def _converter_excel_para_sistema(self, dados_excel: Dict[str, Any]) -> SistemaEnergia:
         """Converte dados do Excel para objeto SistemaEnergia"""
@@ -360,62 +315,29 @@ class MigradorDados:
 
         return sistema
 
-    def _processar_consumos_csv(self, df: pd.DataFrame, sistema: SistemaEnergia):
-        """Processa consumos de arquivo CSV"""
-
-        # Mapear colunas
-        colunas_id = ['id', 'ID', 'Id', 'nome', 'Nome', 'unidade', 'Unidade']
-        coluna_id = None
-
-        for col in colunas_id:
-            if col in df.columns:
-                coluna_id = col
-                break
-
-        if coluna_id is None:
-            raise ErroMigracaoDados("Coluna de identificação não encontrada no CSV")
-
-        # Processar cada linha
-        for _, row in df.iterrows():
-            id_unidade = str(row[coluna_id])
-
-            # Buscar unidade correspondente
-            unidade = None
-            for u in sistema.unidades:
-                if u.id == id_unidade or u.nome == id_unidade:
-                    unidade = u
-                    break
-
-            if unidade is None:
-                self._log(f"Unidade não encontrada para ID: {id_unidade}")
-                continue
-
-            # Atualizar consumos
-            meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
-                     'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-
-            for i, mes in enumerate(meses):
-                if mes in row and pd.notna(row[mes]):
-                    unidade.consumo_mensal_kwh[i] = float(row[mes])
-
     def _validar_excel_legacy(self, caminho_arquivo: str) -> Dict[str, Any]:
         """Valida arquivo Excel legacy"""
         resultado = {'erros': [], 'avisos': [], 'estatisticas': {}}
 
         try:
-            excel_data = pd.ExcelFile(caminho_arquivo)
-            resultado['estatisticas']['abas_encontradas'] = len(excel_data.sheet_names)
-            resultado['estatisticas']['nomes_abas'] = excel_data.sheet_names
+            resultado = self._validar_abas_excel(ImportadorExcel(caminho_arquivo).nomes_abas())
+        except Exception as e:
+            resultado['erros'].append(f"Erro ao validar Excel: {e}")
 
-            # Verificar abas essenciais
-            abas_essenciais = ['Configuracao', 'Config', 'Unidades', 'Consumidores']
-            abas_encontradas = [aba for aba in abas_essenciais if aba in excel_data.sheet_names]
+        return resultado
 
-            if not abas_encontradas:
-                resultado['avisos'].append("Nenhuma aba padrão encontrada, tentarei processar as disponíveis")
+    def _validar_abas_excel(self, nomes_abas: List[str]) -> Dict[str, Any]:
+        """Valida as abas de uma planilha legacy"""
+        resultado = {'erros': [], 'avisos': [], 'estatisticas': {}}
+        resultado['estatisticas']['abas_encontradas'] = len(nomes_abas)
+        resultado['estatisticas']['nomes_abas'] = nomes_abas
 
-        except Exception as e:
-            resultado['erros'].append(f"Erro ao validar Excel: {e}")
+        # Verificar abas essenciais
+        abas_essenciais = ['Configuracao', 'Config', 'Unidades', 'Consumidores']
+        abas_encontradas = [aba for aba in abas_essenciais if aba in nomes_abas]
+
+        if not abas_encontradas:
+            resultado['avisos'].append("Nenhuma aba padrão encontrada, tentarei processar as disponíveis")
 
         return resultado
 
@@ -426,19 +348,7 @@ class MigradorDados:
         try:
             with open(caminho_arquivo, 'r', encoding='utf-8') as f:
                 dados = json.load(f)
-
-            # Verificar estrutura básica
-            if not isinstance(dados, dict):
-                resultado['erros'].append("JSON deve ser um objeto")
-                return resultado
-
-            resultado['estatisticas']['chaves_principais'] = list(dados.keys())
-
-            # Verificar chaves essenciais
-            chaves_essenciais = ['configuracao', 'unidades']
-            for chave in chaves_essenciais:
-                if chave not in dados:
-                    resultado['avisos'].append(f"Chave '{chave}' não encontrada")
+            resultado = self._validar_dados_json(dados)
 
         except json.JSONDecodeError as e:
             resultado['erros'].append(f"JSON inválido: {e}")
@@ -447,19 +357,40 @@ class MigradorDados:
 
         return resultado
 
+    def _validar_dados_json(self, dados: Any) -> Dict[str, Any]:
+        """Valida a estrutura de um JSON legacy já lido"""
+        resultado = {'erros': [], 'avisos': [], 'estatisticas': {}}
+
+        # Verificar estrutura básica
+        if not isinstance(dados, dict):
+            resultado['erros'].append("JSON deve ser um objeto")
+            return resultado
+
+        resultado['estatisticas']['chaves_principais'] = list(dados.keys())
+
+        # Verificar chaves essenciais
+        chaves_essenciais = ['configuracao', 'unidades']
+        for chave in chaves_essenciais:
+            if chave not in dados:
+                resultado['avisos'].append(f"Chave '{chave}' não encontrada")
+
+        return resultado
+
     def _validar_csv_legacy(self, caminho_arquivo: str) -> Dict[str, Any]:
         """Valida arquivo CSV legacy"""
         resultado = {'erros': [], 'avisos': [], 'estatisticas': {}}
 
         try:
-            df = pd.read_csv(caminho_arquivo, encoding='utf-8')
-            resultado['estatisticas']['linhas'] = len(df)
-            resultado['estatisticas']['colunas'] = len(df.columns)
-            resultado['estatisticas']['nomes_colunas'] = list(df.columns)
+            with open(caminho_arquivo, 'r', encoding='utf-8-sig', newline='') as f:
+                leitor = csv.reader(f)
+                colunas = next(leitor, [])
+                resultado['estatisticas']['linhas'] = sum(1 for linha in leitor if linha)
+            resultado['estatisticas']['colunas'] = len(colunas)
+            resultado['estatisticas']['nomes_colunas'] = colunas
 
             # Verificar se tem pelo menos uma coluna de ID
             colunas_id = ['id', 'ID', 'nome', 'Nome']
-            tem_id = any(col in df.columns for col in colunas_id)
+            tem_id = any(col in colunas for col in colunas_id)
 
             if not tem_id:
                 resultado['erros'].append("Nenhuma coluna de identificação encontrada")
@@ -476,70 +407,144 @@ class MigradorDados:
 
 
 # Classe auxiliar para migração em lote
+ARQUIVO_RESUMO_LOTE = "resumo_migracao.json"
+
+
+def _migrar_arquivo_em_processo(caminho_arquivo: str) -> Dict[str, Any]:
+    """Valida e migra um arquivo (executado nos processos do lote)"""
+    inicio = time.perf_counter()
+    migrador = MigradorDados()
+    resultado = {
+        'arquivo': caminho_arquivo,
+        'sucesso': False,
+        'sistema': None,
+        'erros': [],
+        'avisos': [],
+        'log': []
+    }
+
+    try:
+        sistema, validacao = migrador.migrar_com_validacao(caminho_arquivo)
+        resultado['erros'] = validacao['erros']
+        resultado['avisos'] = validacao['avisos']
+        resultado['sistema'] = sistema
+        resultado['sucesso'] = sistema is not None and validacao['valido']
+    except Exception as e:
+        resultado['erros'].append(str(e))
+
+    resultado['log'] = migrador.obter_log_migracoes()
+    resultado['tempo_s'] = time.perf_counter() - inicio
+    return resultado
+
+
 class MigradorLote:
-    """Migrador para processar múltiplos arquivos"""
+    """
+    Migrador para processar múltiplos arquivos
 
-    def __init__(self):
+    Os arquivos são distribuídos entre processos (um por núcleo, por padrão);
+    cada arquivo é lido uma única vez para validação e conversão.
+    """
+
+    def __init__(self, max_processos: Optional[int] = None):
         self.migrador = MigradorDados()
+        self.max_processos = max_processos
         self.resultados = []
 
-    def migrar_diretorio(self, caminho_diretorio: str, padrao_arquivos: str = "*") -> List[Dict[str, Any]]:
+    def migrar_diretorio(self, caminho_diretorio: str, padrao_arquivos: str = "*",
+                         ao_concluir: Optional[Callable[[Dict[str, Any], int, int], None]] = None,
+                         arquivo_resumo: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Migra todos os arquivos de um diretório
+
+        ao_concluir(resultado, concluidos, total) é chamado a cada arquivo
+        terminado. Ao final grava o resumo consolidado em arquivo_resumo
+        (padrão: '<diretório>/resumo_migracao.json').
         """
         try:
+            inicio = time.perf_counter()
             diretorio = Path(caminho_diretorio)
-            if not diretorio.exists():
-                raise ErroMigracaoDados(f"Diretório não encontrado: {caminho_diretorio}")
-
-            arquivos = list(diretorio.glob(padrao_arquivos))
-            self.resultados = []
+            resultados = {}
+            for resultado, concluidos, total in self.migrar_diretorio_em_fluxo(caminho_diretorio, padrao_arquivos):
+                resultados[resultado['arquivo']] = resultado
+                if ao_concluir is not None:
+                    ao_concluir(resultado, concluidos, total)
 
-            for arquivo in arquivos:
-                resultado = self._migrar_arquivo_individual(str(arquivo))
-                self.resultados.append(resultado)
+            # Mesma ordem da listagem do diretório
+            self.resultados = [resultados[arquivo] for arquivo in sorted(resultados)]
 
+            self._gravar_resumo(arquivo_resumo or str(diretorio / ARQUIVO_RESUMO_LOTE),
+                                time.perf_counter() - inicio)
             return self.resultados
 
         except Exception as e:
             raise ErroMigracaoDados(f"Erro na migração em lote: {e}")
 
-    def _migrar_arquivo_individual(self, caminho_arquivo: str) -> Dict[str, Any]:
-        """Migra um arquivo individual"""
-        resultado = {
-            'arquivo': caminho_arquivo,
-            'sucesso': False,
-            'sistema': None,
-            'erros': [],
-            'log': []
+    def migrar_diretorio_em_fluxo(self, caminho_diretorio: str,
+                                  padrao_arquivos: str = "*") -> Iterator[Tuple[Dict[str, Any], int, int]]:
+        """Gera (resultado, concluídos, total) à medida que cada arquivo termina"""
+        diretorio = Path(caminho_diretorio)
+        if not diretorio.exists():
+            raise ErroMigracaoDados(f"Diretório não encontrado: {caminho_diretorio}")
+
+        arquivos = self._listar_arquivos(diretorio, padrao_arquivos)
+        total = len(arquivos)
+        processos = min(self.max_processos or os.cpu_count() or 1, total)
+
+        # Poucos arquivos ou um único processo: evita o custo de iniciar o pool
+        if processos <= 1:
+            for concluidos, arquivo in enumerate(arquivos, start=1):
+                yield _migrar_arquivo_em_processo(arquivo), concluidos, total
+            return
+
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = {executor.submit(_migrar_arquivo_em_processo, arquivo): arquivo for arquivo in arquivos}
+            for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    resultado = {'arquivo': futuros[futuro], 'sucesso': False, 'sistema': None,
+                                 'erros': [f"Falha no processo de migração: {e}"], 'avisos': [], 'log': []}
+                yield resultado, concluidos, total
+
+    def obter_resumo(self, tempo_total_s: float = 0.0) -> Dict[str, Any]:
+        """Resumo consolidado dos últimos resultados"""
+        return {
+            'data': datetime.now().isoformat(),
+            'total_arquivos': len(self.resultados),
+            'sucessos': sum(1 for r in self.resultados if r['sucesso']),
+            'falhas': sum(1 for r in self.resultados if not r['sucesso']),
+            'total_unidades': sum(len(r['sistema'].unidades) for r in self.resultados if r['sistema'] is not None),
+            'tempo_total_s': round(tempo_total_s, 3),
+            'arquivos': [
+                {
+                    'arquivo': r['arquivo'],
+                    'sucesso': r['sucesso'],
+                    'unidades': len(r['sistema'].unidades) if r['sistema'] is not None else 0,
+                    'erros': r['erros'],
+                    'avisos': r.get('avisos', []),
+                    'tempo_s': round(r.get('tempo_s', 0.0), 3)
+                }
+                for r in self.resultados
+            ]
         }
 
-        try:
-            # Validar arquivo
-            validacao = self.migrador.validar_arquivo_legacy(caminho_arquivo)
-            if not validacao['valido']:
-                resultado['erros'] = validacao['erros']
-                return resultado
-
-            # Migrar baseado no tipo
-            extensao = Path(caminho_arquivo).suffix.lower()
+    def _migrar_arquivo_individual(self, caminho_arquivo: str) -> Dict[str, Any]:
+        """Migra um arquivo individual"""
+        return _migrar_arquivo_em_processo(caminho_arquivo)
 
-            if extensao in ['.xlsx', '.xls']:
-                sistema = self.migrador.migrar_excel_legacy(caminho_arquivo)
-            elif extensao == '.json':
-                sistema = self.migrador.migrar_json_legacy(caminho_arquivo)
-            else:
-                resultado['erros'].append(f"Tipo de arquivo não suportado: {extensao}")
-                return resultado
+    # Métodos auxiliares privados
 
-            resultado['sistema'] = sistema
-            resultado['sucesso'] = True
-            resultado['log'] = self.migrador.obter_log_migracoes()
+    @staticmethod
+    def _listar_arquivos(diretorio: Path, padrao_arquivos: str) -> List[str]:
+        """Arquivos do diretório (sem subdiretórios e sem o resumo de lotes anteriores)"""
+        return [str(arquivo) for arquivo in sorted(diretorio.glob(padrao_arquivos))
+                if arquivo.is_file() and arquivo.name != ARQUIVO_RESUMO_LOTE]
 
+    def _gravar_resumo(self, caminho: str, tempo_total_s: float):
+        try:
+            escrever_atomico(caminho, json.dumps(self.obter_resumo(tempo_total_s), indent=2, ensure_ascii=False))
         except Exception as e:
-            resultado['erros'].append(str(e))
-
-        return resultado
+            self.migrador._log(f"Não foi possível gravar o resumo do lote: {e}")
 
 
 # Funções de conveniência
@@ -549,7 +554,9 @@ def migrar_arquivo_legacy(caminho_arquivo: str) -> SistemaEnergia:
 
     extensao = Path(caminho_arquivo).suffix.lower()
 
-    if extensao in ['.xlsx', '.xls']:
+    if extensao == '.xls':
+        raise ErroMigracaoDados(MENSAGEM_XLS_NAO_SUPORTADO)
+    elif extensao == '.xlsx':
         return migrador.migrar_excel_legacy(caminho_arquivo)
     elif extensao == '.json':
         return migrador.migrar_json_legacy(caminho_arquivo)
@@ -557,6 +564,12 @@ def migrar_arquivo_legacy(caminho_arquivo: str) -> SistemaEnergia:
         raise ErroMigracaoDados(f"Tipo de arquivo não suportado: {extensao}")
 
 
+def validar_e_migrar(caminho_arquivo: str) -> Tuple[Optional[SistemaEnergia], Dict[str, Any]]:
+    """Função de conveniência para validar e migrar com uma única leitura"""
+    migrador = MigradorDados()
+    return migrador.migrar_com_validacao(caminho_arquivo)
+
+
 def validar_antes_migrar(caminho_arquivo: str) -> bool:
     """Função de conveniência para validar arquivo antes da migração"""
     migrador = MigradorDados()
@@ -2,29 +2,81 @@
 
 import json
 import os
-from dataclasses import asdict
-from typing import Dict, Any
-
-from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
-from nucleo.excecoes import ErroCarregamentoDados, ErroSalvamentoDados
-from configuracao.definicoes import ARQUIVO_DADOS, CONFIG_EXEMPLO, UNIDADES_EXEMPLO, CONSUMOS_EXEMPLO
+import pickle
+import threading
+from datetime import datetime
+from dataclasses import asdict, fields, is_dataclass
+from enum import Enum
+from typing import Dict, Any, List, Optional
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, HistoricoCreditos, ConfiguracaoRelatorio,
+    TipoLigacao
+)
+from nucleo.excecoes import ErroCarregamentoDados, ErroSalvamentoDados, ErroCorrupcaoDados
+from nucleo.unidades_compactas import UnidadeCompacta
+from configuracao.definicoes import ARQUIVO_DADOS, CONFIG_EXEMPLO, UNIDADES_EXEMPLO
+from utilitarios.constantes import MESES_APENAS
+from dados.armazem_dados import ArmazemDados, obter_armazem, escrever_atomico
+
+# Códigos de ligação do formato legacy
+TIPOS_LIGACAO_LEGACY = {'mono': TipoLigacao.MONOFASICA, 'bi': TipoLigacao.BIFASICA, 'tri': TipoLigacao.TRIFASICA}
+
+# Tamanho do journal que dispara a compactação em segundo plano
+LIMITE_JOURNAL_PADRAO = 1024 * 1024
 
 
 class RepositorioDados:
-    def __init__(self, arquivo_dados: str = ARQUIVO_DADOS):
+    """
+    Persistência do SistemaEnergia em JSON
+
+    salvar_sistema grava um snapshot completo de forma atômica (arquivo temporário
+    + rename). Edições pequenas (registrar_consumo, registrar_campo_unidade,
+    registrar_campo_configuracao) são anexadas como linhas JSON em
+    '<arquivo>.journal' e reaplicadas no carregamento; quando o journal passa de
+    limite_journal_bytes, ele é incorporado a um novo snapshot em segundo plano.
+
+    O sistema carregado fica serializado (pickle) no ArmazemDados do processo:
+    enquanto snapshot e journal não mudarem no disco, carregar_sistema o recria
+    sem reler o JSON. Cada chamada recebe uma instância própria, de modo que
+    edições não salvas de um componente não aparecem nos demais.
+
+    carregar_documento/salvar_documento dão o mesmo tratamento (snapshot + journal)
+    a documentos que não são convertidos para o modelo, como o arquivo legacy de
+    unidades da tela de Unidades.
+    """
+
+    def __init__(self, arquivo_dados: str = ARQUIVO_DADOS, limite_journal_bytes: int = LIMITE_JOURNAL_PADRAO,
+                 compactar_em_segundo_plano: bool = True, armazem: Optional[ArmazemDados] = None):
         self.arquivo_dados = arquivo_dados
+        self.armazem = armazem or obter_armazem()
+        self.arquivo_journal = f"{arquivo_dados}.journal"
+        self.limite_journal_bytes = limite_journal_bytes
+        self.compactar_em_segundo_plano = compactar_em_segundo_plano
+
+        # O journal em compactação é renomeado; se o processo cair, é reaplicado no próximo carregamento
+        self._arquivo_journal_compactando = f"{arquivo_dados}.journal.compactando"
+        self._trava = threading.RLock()
+        self._geracao_snapshot = 0
+        self._thread_compactacao: Optional[threading.Thread] = None
 
     def _converter_para_json_compativel(self, obj: Any) -> Any:
         """
         Converte objetos complexos (como Enums e dataclasses) para tipos compatíveis com JSON.
         """
-        if isinstance(obj, TipoLigacao):
+        if isinstance(obj, Enum):
             return obj.value  # Converte Enum para seu valor de string
         if isinstance(obj, dict):
             return {k: self._converter_para_json_compativel(v) for k, v in obj.items()}
         if isinstance(obj, list):
             return [self._converter_para_json_compativel(elem) for elem in obj]
-        if isinstance(obj, (ConfiguracaoSistema, UnidadeConsumidora, SistemaEnergia)):
+        if isinstance(obj, UnidadeCompacta):
+            obj = obj.para_unidade()
+        if isinstance(obj, SistemaEnergia):
+            # Campo a campo: asdict copiaria em profundidade as unidades compactas (e sua tabela)
+            return {campo.name: self._converter_para_json_compativel(getattr(obj, campo.name))
+                    for campo in fields(obj)}
+        if is_dataclass(obj) and not isinstance(obj, type):
             # asdict converte a dataclass em um dicionário, e então recursivamente processamos seus valores
             return {k: self._converter_para_json_compativel(v) for k, v in asdict(obj).items()}
         return obj
@@ -35,32 +87,45 @@ class RepositorioDados:
         Usa uma abordagem direta e específica para este projeto.
         """
         # 1. Converte a configuração
-        config_data = data.get('configuracao', {})
-        configuracao = ConfiguracaoSistema(**config_data)
+        configuracao = self._montar_dataclass(ConfiguracaoSistema, data.get('configuracao', {}))
 
-        # 2. Converte as unidades
-        unidades_data = data.get('unidades', [])
+        # 2. Converte as unidades (consumos no formato legacy, por nome do mês, são incorporados)
+        consumos = data.get('consumos', {})
         unidades = []
-        for unidade_dict in unidades_data:
-            # Converte o tipo_ligacao de string de volta para Enum
-            tipo_ligacao_str = unidade_dict.get('tipo_ligacao', 'mono')
+        for unidade_dict in data.get('unidades', []):
             unidade_dict_copy = unidade_dict.copy()
-            unidade_dict_copy['tipo_ligacao'] = TipoLigacao(tipo_ligacao_str)
-            unidades.append(UnidadeConsumidora(**unidade_dict_copy))
+            if 'id' not in unidade_dict_copy and 'codigo' in unidade_dict_copy:
+                unidade_dict_copy['id'] = unidade_dict_copy['codigo']
+            tipo_ligacao = unidade_dict_copy.get('tipo_ligacao', 'mono')
+            unidade_dict_copy['tipo_ligacao'] = TIPOS_LIGACAO_LEGACY.get(tipo_ligacao, tipo_ligacao)
 
-        # 3. Converte os consumos (já são dicionários simples, não precisam de conversão especial)
-        consumos = data.get('consumos', {})
+            consumo_legacy = consumos.get(unidade_dict_copy['id'])
+            if consumo_legacy is not None and 'consumo_mensal_kwh' not in unidade_dict_copy:
+                if isinstance(consumo_legacy, dict):
+                    consumo_legacy = [consumo_legacy.get(mes, 0.0) for mes in MESES_APENAS]
+                unidade_dict_copy['consumo_mensal_kwh'] = list(consumo_legacy)
+
+            unidades.append(self._montar_dataclass(UnidadeConsumidora, unidade_dict_copy))
+
+        # 3. Demais campos do sistema
+        extras = {campo.name: data[campo.name] for campo in fields(SistemaEnergia)
+                  if campo.name in data and campo.name not in
+                  ('configuracao', 'unidades', 'historico_creditos', 'configuracao_relatorio')}
 
         return SistemaEnergia(
             configuracao=configuracao,
             unidades=unidades,
-            consumos=consumos
+            historico_creditos=[self._montar_dataclass(HistoricoCreditos, c)
+                                for c in data.get('historico_creditos', [])],
+            configuracao_relatorio=self._montar_dataclass(ConfiguracaoRelatorio,
+                                                          data.get('configuracao_relatorio', {})),
+            **extras
         )
 
     def carregar_sistema(self) -> SistemaEnergia:
         """
-        Carrega os dados do sistema de um arquivo JSON.
-        Se o arquivo não existir ou estiver corrompido, inicializa com dados de exemplo.
+        Carrega os dados do sistema de um arquivo JSON, reaplicando o journal.
+        Se o arquivo não existir, inicializa com dados de exemplo.
         """
         if not os.path.exists(self.arquivo_dados):
             print(f"Arquivo '{self.arquivo_dados}' não encontrado. Inicializando com dados de exemplo.")
@@ -69,55 +134,328 @@ class RepositorioDados:
             return sistema
 
         try:
-            with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            with self._trava:
+                assinatura = self._assinatura_arquivos()
+                serializado = self.armazem.obter(self.arquivo_dados, 'sistema', assinatura)
+                if serializado is not None:
+                    return pickle.loads(serializado)
+                raw_data = self._ler_snapshot()
+                operacoes = self._ler_journal(self._arquivo_journal_compactando) + self._ler_journal(self.arquivo_journal)
+
+            for operacao in operacoes:
+                self._aplicar_operacao(raw_data, operacao)
 
             # Converte o dicionário carregado de volta para a estrutura de dataclasses
             sistema = self._converter_de_json_para_modelo(raw_data)
+            self.armazem.guardar(self.arquivo_dados, 'sistema', assinatura, self._serializar(sistema))
             return sistema
 
-        except json.JSONDecodeError as e:
-            print(f"❌ Erro ao carregar dados: {e}")
-            print(f"🔧 Arquivo JSON corrompido na linha {e.lineno}, coluna {e.colno}")
-            print("📝 Criando backup e inicializando com dados de exemplo...")
-
-            # Fazer backup do arquivo corrompido
-            backup_path = f"{self.arquivo_dados}.backup"
-            os.rename(self.arquivo_dados, backup_path)
-            print(f"💾 Backup salvo em: {backup_path}")
-
-            # Criar novo sistema
-            sistema = self._inicializar_com_dados_exemplo()
-            self.salvar_sistema(sistema)
-            return sistema
+        except ErroCorrupcaoDados:
+            # Com gravação atômica o snapshot nunca fica pela metade: erro aqui é corrupção externa
+            raise
 
         except Exception as e:
-            print(f"❌ Erro inesperado: {e}")
-            print("📝 Inicializando com dados de exemplo...")
-            sistema = self._inicializar_com_dados_exemplo()
-            return sistema
+            raise ErroCarregamentoDados(f"Erro ao carregar dados de '{self.arquivo_dados}': {e}")
 
-    def salvar_sistema(self, sistema: SistemaEnergia):
+    def salvar_sistema(self, sistema: SistemaEnergia, caminho_destino: Optional[str] = None):
         """
-        Salva os dados do sistema em um arquivo JSON.
+        Salva os dados do sistema em um arquivo JSON (snapshot atômico; descarta o journal).
+        Com caminho_destino, grava uma cópia avulsa (ex.: backup) sem tocar no arquivo de dados.
         """
         try:
             # Converte a dataclass SistemaEnergia e suas aninhadas para um dicionário compatível com JSON
             data_to_save = self._converter_para_json_compativel(sistema)
+            conteudo = json.dumps(data_to_save, indent=4, ensure_ascii=False)
+
+            if caminho_destino is not None:
+                self._escrever_atomico(conteudo, caminho_destino)
+                return
+
+            with self._trava:
+                self._gravar_snapshot(conteudo)
+                self.armazem.guardar(self.arquivo_dados, 'sistema', self._assinatura_arquivos(),
+                                     self._serializar(sistema))
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar dados no arquivo '{caminho_destino or self.arquivo_dados}': {e}")
+
+    # Documento JSON sem conversão para o modelo (ex.: arquivos no formato legacy)
+
+    def carregar_documento(self) -> Optional[Dict[str, Any]]:
+        """
+        Documento do arquivo de dados com o journal reaplicado, como dicionário.
+        Retorna uma cópia própria, ou None se o arquivo não existir.
+        """
+        try:
+            with self._trava:
+                if not os.path.exists(self.arquivo_dados):
+                    return None
+                documento = self._ler_snapshot()
+                operacoes = self._ler_journal(self._arquivo_journal_compactando) + self._ler_journal(self.arquivo_journal)
+
+            for operacao in operacoes:
+                self._aplicar_operacao(documento, operacao)
+            return documento
+
+        except ErroCorrupcaoDados:
+            raise
 
-            with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            raise ErroCarregamentoDados(f"Erro ao carregar dados de '{self.arquivo_dados}': {e}")
+
+    def salvar_documento(self, documento: Dict[str, Any]):
+        """Grava o documento como novo snapshot (atômico; descarta o journal)"""
+        try:
+            conteudo = json.dumps(documento, indent=4, ensure_ascii=False)
+            with self._trava:
+                self._gravar_snapshot(conteudo)
+                self.armazem.invalidar(self.arquivo_dados, 'sistema')
         except Exception as e:
             raise ErroSalvamentoDados(f"Erro ao salvar dados no arquivo '{self.arquivo_dados}': {e}")
 
+    # Journal de alterações
+
+    def registrar_consumo(self, id_unidade: str, mes: int, valor: float):
+        """Registra no journal o consumo de um mês (1-12) de uma unidade"""
+        # Inteiros são mantidos: o formato legacy guarda kWh inteiros
+        valor = valor if isinstance(valor, int) else float(valor)
+        self._registrar({'op': 'consumo', 'id': id_unidade, 'mes': int(mes), 'valor': valor})
+
+    def registrar_campo_unidade(self, id_unidade: str, campo: str, valor: Any):
+        """Registra no journal a alteração de um campo de uma unidade"""
+        self._registrar({'op': 'unidade', 'id': id_unidade, 'campo': campo,
+                         'valor': self._converter_para_json_compativel(valor)})
+
+    def registrar_campo_configuracao(self, campo: str, valor: Any):
+        """Registra no journal a alteração de um campo da configuração"""
+        self._registrar({'op': 'configuracao', 'campo': campo,
+                         'valor': self._converter_para_json_compativel(valor)})
+
+    def isolar_arquivos_corrompidos(self) -> List[str]:
+        """
+        Renomeia snapshot e journals para '<arquivo>.corrompido-<data>', preservando-os
+        para análise antes que um novo salvamento os substitua. Retorna os novos caminhos.
+        """
+        sufixo = datetime.now().strftime('%Y%m%d-%H%M%S')
+        movidos = []
+        try:
+            with self._trava:
+                for arquivo in (self.arquivo_dados, self._arquivo_journal_compactando, self.arquivo_journal):
+                    if os.path.exists(arquivo):
+                        destino = f"{arquivo}.corrompido-{sufixo}"
+                        os.replace(arquivo, destino)
+                        movidos.append(destino)
+                self.armazem.invalidar(self.arquivo_dados, 'sistema')
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao isolar arquivos corrompidos de '{self.arquivo_dados}': {e}")
+        return movidos
+
+    def tamanho_journal(self) -> int:
+        """Tamanho atual do journal em bytes"""
+        try:
+            return os.path.getsize(self.arquivo_journal)
+        except OSError:
+            return 0
+
+    def compactar(self):
+        """Incorpora o journal a um novo snapshot"""
+        try:
+            with self._trava:
+                if not os.path.exists(self.arquivo_journal) or not os.path.exists(self.arquivo_dados):
+                    return
+                geracao = self._geracao_snapshot
+                assinatura_anterior = self._assinatura_arquivos()
+                raw_data = self._ler_snapshot()
+                self._rotacionar_journal()
+
+            # Reaplicação e serialização fora da trava: novas edições seguem para o journal
+            for operacao in self._ler_journal(self._arquivo_journal_compactando):
+                self._aplicar_operacao(raw_data, operacao)
+            conteudo = json.dumps(raw_data, indent=4, ensure_ascii=False)
+
+            with self._trava:
+                # Um salvar_sistema concorrente já gravou um snapshot mais novo
+                if geracao != self._geracao_snapshot:
+                    return
+                self._escrever_atomico(conteudo)
+                os.remove(self._arquivo_journal_compactando)
+                # Mesmo conteúdo em outro arquivo: o sistema já carregado continua válido
+                self.armazem.renovar(self.arquivo_dados, 'sistema', assinatura_anterior, self._assinatura_arquivos())
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao compactar journal de '{self.arquivo_dados}': {e}")
+
+    def aguardar_compactacao(self, timeout: Optional[float] = None):
+        """Espera a compactação em segundo plano (se houver) terminar"""
+        thread = self._thread_compactacao
+        if thread is not None:
+            thread.join(timeout)
+
+    # Métodos auxiliares privados
+
+    def _registrar(self, operacao: Dict[str, Any]):
+        """Anexa uma operação ao journal (fsync) e agenda a compactação se necessário"""
+        try:
+            linha = json.dumps(operacao, ensure_ascii=False) + "\n"
+            with self._trava:
+                self._descartar_linha_incompleta(self.arquivo_journal)
+                with open(self.arquivo_journal, 'a', encoding='utf-8') as f:
+                    f.write(linha)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # O sistema em cache pode não refletir a operação: o próximo carregamento relê
+                self.armazem.invalidar(self.arquivo_dados, 'sistema')
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao registrar alteração em '{self.arquivo_journal}': {e}")
+
+        if self.tamanho_journal() > self.limite_journal_bytes:
+            self._agendar_compactacao()
+
+    def _agendar_compactacao(self):
+        if not self.compactar_em_segundo_plano:
+            self.compactar()
+            return
+        with self._trava:
+            if self._thread_compactacao is not None and self._thread_compactacao.is_alive():
+                return
+            self._thread_compactacao = threading.Thread(target=self._compactar_silencioso, daemon=True)
+            self._thread_compactacao.start()
+
+    def _compactar_silencioso(self):
+        try:
+            self.compactar()
+        except ErroSalvamentoDados as e:
+            # O journal permanece e é reaplicado no carregamento
+            print(f"⚠️ {e}")
+
+    def _rotacionar_journal(self):
+        """Move o journal atual para o arquivo de compactação (anexando, se já existir)"""
+        if os.path.exists(self._arquivo_journal_compactando):
+            self._descartar_linha_incompleta(self._arquivo_journal_compactando)
+            self._descartar_linha_incompleta(self.arquivo_journal)
+            with open(self.arquivo_journal, 'r', encoding='utf-8') as origem, \
+                    open(self._arquivo_journal_compactando, 'a', encoding='utf-8') as destino:
+                destino.write(origem.read())
+            os.remove(self.arquivo_journal)
+        else:
+            os.replace(self.arquivo_journal, self._arquivo_journal_compactando)
+
+    def _gravar_snapshot(self, conteudo: str):
+        """Substitui o snapshot e descarta os journals (chamado com a trava)"""
+        self._escrever_atomico(conteudo)
+        self._geracao_snapshot += 1
+        for arquivo in (self.arquivo_journal, self._arquivo_journal_compactando):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+
+    def _assinatura_arquivos(self):
+        return self.armazem.assinatura(self.arquivo_dados, self._arquivo_journal_compactando,
+                                       self.arquivo_journal)
+
+    def _ler_snapshot(self) -> Dict[str, Any]:
+        """Cópia do snapshot lido pelo armazém (o journal é reaplicado sobre ela)"""
+        dados = self.armazem.ler_json(self.arquivo_dados, copiar=True)
+        if dados is None:
+            raise FileNotFoundError(f"Arquivo '{self.arquivo_dados}' não encontrado")
+        return dados
+
+    @staticmethod
+    def _serializar(sistema: SistemaEnergia) -> bytes:
+        """Estado do sistema para o armazém; recriado com pickle.loads a cada carregamento"""
+        return pickle.dumps(sistema, pickle.HIGHEST_PROTOCOL)
+
+    def _ler_journal(self, arquivo: str) -> List[Dict[str, Any]]:
+        """
+        Operações do journal. Só a última linha pode estar incompleta (queda durante
+        a escrita) e é ignorada; uma linha inválida antes dela é corrupção.
+        """
+        if not os.path.exists(arquivo):
+            return []
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            linhas = f.read().splitlines()
+        operacoes = []
+        for numero, linha in enumerate(linhas, start=1):
+            try:
+                operacoes.append(json.loads(linha))
+            except json.JSONDecodeError as e:
+                if numero == len(linhas):
+                    break
+                raise ErroCorrupcaoDados(f"Journal '{arquivo}' corrompido na linha {numero}: {e}")
+        return operacoes
+
+    @staticmethod
+    def _descartar_linha_incompleta(arquivo: str):
+        """Trunca uma linha final sem quebra (escrita interrompida) antes de anexar novas linhas"""
+        if not os.path.exists(arquivo):
+            return
+        with open(arquivo, 'rb+') as f:
+            tamanho = f.seek(0, os.SEEK_END)
+            if tamanho == 0:
+                return
+            f.seek(tamanho - 1)
+            if f.read(1) == b"\n":
+                return
+            # Procura a última quebra de linha de trás para frente
+            fim = tamanho
+            while fim > 0:
+                inicio = max(0, fim - 4096)
+                f.seek(inicio)
+                posicao = f.read(fim - inicio).rfind(b"\n")
+                if posicao >= 0:
+                    f.truncate(inicio + posicao + 1)
+                    return
+                fim = inicio
+            f.truncate(0)
+
+    def _escrever_atomico(self, conteudo: str, destino: Optional[str] = None):
+        """Gravação atômica (temporário + os.replace) no arquivo de dados ou no destino"""
+        escrever_atomico(destino or self.arquivo_dados, conteudo)
+
+    def _aplicar_operacao(self, dados: Dict[str, Any], operacao: Dict[str, Any]):
+        """Reaplica uma operação do journal sobre o documento JSON"""
+        tipo = operacao.get('op')
+
+        if tipo == 'configuracao':
+            dados.setdefault('configuracao', {})[operacao['campo']] = operacao['valor']
+            return
+
+        unidade = self._localizar_unidade(dados, operacao.get('id'))
+        if tipo == 'unidade' and unidade is not None:
+            unidade[operacao['campo']] = operacao['valor']
+
+        elif tipo == 'consumo':
+            indice = operacao['mes'] - 1
+            if unidade is not None and 'consumo_mensal_kwh' in unidade:
+                unidade['consumo_mensal_kwh'][indice] = operacao['valor']
+            elif 'consumos' in dados:
+                # Formato legacy: consumos por código e nome do mês
+                dados['consumos'].setdefault(operacao['id'], {})[MESES_APENAS[indice]] = operacao['valor']
+
+    @staticmethod
+    def _localizar_unidade(dados: Dict[str, Any], id_unidade: Any) -> Optional[Dict[str, Any]]:
+        for unidade in dados.get('unidades', []):
+            if unidade.get('id', unidade.get('codigo')) == id_unidade:
+                return unidade
+        return None
+
+    @staticmethod
+    def _montar_dataclass(classe, dados: Dict[str, Any]):
+        """Recria a dataclass ignorando chaves desconhecidas e convertendo Enums"""
+        argumentos = {}
+        for campo in fields(classe):
+            if campo.name not in dados:
+                continue
+            valor = dados[campo.name]
+            if isinstance(campo.type, type) and issubclass(campo.type, Enum) and not isinstance(valor, Enum):
+                valor = campo.type(valor)
+            argumentos[campo.name] = valor
+        return classe(**argumentos)
+
     def _inicializar_com_dados_exemplo(self) -> SistemaEnergia:
         """
         Cria uma instância de SistemaEnergia com os dados de exemplo definidos.
         """
         sistema = SistemaEnergia(
             configuracao=CONFIG_EXEMPLO,
-            unidades=UNIDADES_EXEMPLO,
-            consumos=CONSUMOS_EXEMPLO
+            unidades=UNIDADES_EXEMPLO
         )
         return sistema
 
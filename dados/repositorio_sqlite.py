@@ -0,0 +1,449 @@
+# usina_01/dados/repositorio_sqlite.py
+
+"""
+Repositório SQLite do sistema de energia
+Alternativa ao JSON: cada edição grava apenas as linhas afetadas e as telas
+podem carregar só o que exibem
+"""
+
+import json
+import os
+import sqlite3
+from dataclasses import fields
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, ConfiguracaoRelatorio, UnidadeConsumidora,
+    HistoricoCreditos, TipoLigacao, TipoUnidade, TAXAS_DISPONIBILIDADE
+)
+from nucleo.excecoes import ErroCarregamentoDados, ErroSalvamentoDados
+from dados.carregamento_paginado import (
+    EntradaIndiceUnidade, ResumoSistema, SistemaPaginado, UnidadesSobDemanda, TAMANHO_CACHE_PADRAO,
+    CAMPOS_METADADOS
+)
+
+ARQUIVO_SQLITE_PADRAO = "dados_sistema.db"
+
+# Máximo de parâmetros por consulta IN (limite conservador do SQLite)
+LIMITE_PARAMETROS = 900
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS configuracao (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS unidades (
+    id TEXT PRIMARY KEY,
+    ordem INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    tipo_ligacao TEXT NOT NULL,
+    tipo_unidade TEXT NOT NULL,
+    ativa INTEGER NOT NULL,
+    endereco TEXT,
+    cidade TEXT,
+    estado TEXT,
+    cep TEXT,
+    demanda_contratada_kw REAL,
+    grupo_tarifario TEXT,
+    percentual_energia_alocada REAL,
+    prioridade_distribuicao INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS consumo_mensal (
+    id_unidade TEXT NOT NULL REFERENCES unidades(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    mes INTEGER NOT NULL CHECK (mes BETWEEN 1 AND 12),
+    consumo_kwh REAL NOT NULL,
+    PRIMARY KEY (id_unidade, mes)
+);
+
+CREATE TABLE IF NOT EXISTS creditos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mes_geracao INTEGER NOT NULL,
+    ano_geracao INTEGER NOT NULL,
+    creditos_kwh REAL NOT NULL,
+    creditos_utilizados_kwh REAL NOT NULL,
+    creditos_restantes_kwh REAL NOT NULL,
+    mes_vencimento INTEGER NOT NULL,
+    ano_vencimento INTEGER NOT NULL,
+    ativo INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_unidades_ativa ON unidades (ativa, ordem);
+CREATE INDEX IF NOT EXISTS idx_consumo_unidade ON consumo_mensal (id_unidade);
+CREATE INDEX IF NOT EXISTS idx_creditos_geracao ON creditos (ano_geracao, mes_geracao);
+CREATE INDEX IF NOT EXISTS idx_creditos_vencimento ON creditos (ano_vencimento, mes_vencimento);
+"""
+
+# Colunas da tabela unidades (exceto ordem), na ordem do INSERT
+COLUNAS_UNIDADE = (
+    'id', 'nome', 'tipo_ligacao', 'tipo_unidade', 'ativa', 'endereco', 'cidade', 'estado', 'cep',
+    'demanda_contratada_kw', 'grupo_tarifario', 'percentual_energia_alocada', 'prioridade_distribuicao'
+)
+
+COLUNAS_CREDITO = tuple(campo.name for campo in fields(HistoricoCreditos))
+
+
+class RepositorioSQLite:
+    """
+    Persistência do SistemaEnergia em SQLite
+
+    Mesma interface de RepositorioDados (carregar_sistema/salvar_sistema), mais
+    operações por linha: salvar_consumo, salvar_unidade, remover_unidade,
+    salvar_campo_configuracao e consultas parciais para as telas.
+    """
+
+    def __init__(self, arquivo_dados: str = ARQUIVO_SQLITE_PADRAO):
+        self.arquivo_dados = arquivo_dados
+        self._conexao: Optional[sqlite3.Connection] = None
+
+    @property
+    def conexao(self) -> sqlite3.Connection:
+        """Conexão aberta sob demanda, com o esquema criado"""
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.arquivo_dados)
+            self._conexao.execute("PRAGMA foreign_keys = ON")
+            self._conexao.execute("PRAGMA journal_mode = WAL")
+            self._conexao.executescript(ESQUEMA)
+        return self._conexao
+
+    def fechar(self):
+        """Fecha a conexão"""
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def existe(self) -> bool:
+        """Indica se o banco já contém um sistema salvo"""
+        if not os.path.exists(self.arquivo_dados):
+            return False
+        return self.conexao.execute("SELECT 1 FROM configuracao LIMIT 1").fetchone() is not None
+
+    # Sistema completo
+
+    def carregar_sistema(self) -> SistemaEnergia:
+        """Carrega o sistema completo"""
+        if not self.existe():
+            raise ErroCarregamentoDados(f"Nenhum sistema salvo em '{self.arquivo_dados}'")
+
+        try:
+            metadados = self._carregar_chave_valor('metadados')
+            return SistemaEnergia(
+                configuracao=self.carregar_configuracao(),
+                unidades=self.carregar_unidades(),
+                historico_creditos=self.carregar_historico_creditos(),
+                configuracao_relatorio=self._montar_dataclass(
+                    ConfiguracaoRelatorio, metadados.pop('configuracao_relatorio', {})),
+                **{campo: metadados[campo] for campo in CAMPOS_METADADOS if campo in metadados}
+            )
+        except ErroCarregamentoDados:
+            raise
+        except Exception as e:
+            raise ErroCarregamentoDados(f"Erro ao carregar dados de '{self.arquivo_dados}': {e}")
+
+    def salvar_sistema(self, sistema: SistemaEnergia):
+        """Substitui todo o conteúdo salvo pelo sistema informado (uma transação)"""
+        try:
+            with self.conexao as con:
+                con.execute("DELETE FROM consumo_mensal")
+                con.execute("DELETE FROM unidades")
+                con.execute("DELETE FROM creditos")
+                con.execute("DELETE FROM configuracao")
+                con.execute("DELETE FROM metadados")
+
+                self._gravar_configuracao(con, sistema.configuracao)
+                metadados = {campo: getattr(sistema, campo) for campo in CAMPOS_METADADOS}
+                metadados['configuracao_relatorio'] = self._para_dict(sistema.configuracao_relatorio)
+                self._gravar_chave_valor(con, 'metadados', metadados)
+
+                self._gravar_unidades(con, sistema.unidades)
+                con.executemany(
+                    f"INSERT INTO creditos ({', '.join(COLUNAS_CREDITO)}) "
+                    f"VALUES ({', '.join('?' * len(COLUNAS_CREDITO))})",
+                    [self._linha_credito(c) for c in sistema.historico_creditos]
+                )
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar dados em '{self.arquivo_dados}': {e}")
+
+    # Configuração
+
+    def carregar_configuracao(self) -> ConfiguracaoSistema:
+        """Carrega apenas a configuração"""
+        return self._montar_dataclass(ConfiguracaoSistema, self._carregar_chave_valor('configuracao'))
+
+    def salvar_campo_configuracao(self, campo: str, valor: Any):
+        """Grava um único campo da configuração"""
+        if campo not in {c.name for c in fields(ConfiguracaoSistema)}:
+            raise ErroSalvamentoDados(f"Campo de configuração desconhecido: {campo}")
+        try:
+            with self.conexao as con:
+                self._gravar_chave_valor(con, 'configuracao', {campo: valor})
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar configuração '{campo}': {e}")
+
+    # Unidades
+
+    def carregar_resumo_unidades(self, apenas_ativas: bool = False) -> List[Dict[str, Any]]:
+        """Lista leve de unidades (id, nome, tipo_ligacao, ativa) para listas e combos"""
+        sql = "SELECT id, nome, tipo_ligacao, ativa FROM unidades"
+        if apenas_ativas:
+            sql += " WHERE ativa = 1"
+        sql += " ORDER BY ordem"
+        return [
+            {'id': id_unidade, 'nome': nome, 'tipo_ligacao': TipoLigacao(tipo), 'ativa': bool(ativa)}
+            for id_unidade, nome, tipo, ativa in self.conexao.execute(sql)
+        ]
+
+    def carregar_unidades(self, ids: Optional[Sequence[str]] = None,
+                          apenas_ativas: bool = False) -> List[UnidadeConsumidora]:
+        """Carrega unidades completas (todas, as ativas ou apenas os ids informados)"""
+        if ids is not None and len(ids) > LIMITE_PARAMETROS:
+            ids = list(ids)
+            return [u for i in range(0, len(ids), LIMITE_PARAMETROS)
+                    for u in self.carregar_unidades(ids[i:i + LIMITE_PARAMETROS], apenas_ativas)]
+
+        condicoes, parametros = [], []
+        if ids is not None:
+            condicoes.append(f"id IN ({', '.join('?' * len(ids))})")
+            parametros.extend(ids)
+        if apenas_ativas:
+            condicoes.append("ativa = 1")
+        filtro = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        linhas = self.conexao.execute(
+            f"SELECT {', '.join(COLUNAS_UNIDADE)} FROM unidades{filtro} ORDER BY ordem", parametros
+        ).fetchall()
+        consumos = self.carregar_consumos(None if ids is None and not apenas_ativas else [l[0] for l in linhas])
+
+        unidades = []
+        for linha in linhas:
+            dados = dict(zip(COLUNAS_UNIDADE, linha))
+            dados['tipo_ligacao'] = TipoLigacao(dados['tipo_ligacao'])
+            dados['tipo_unidade'] = TipoUnidade(dados['tipo_unidade'])
+            dados['ativa'] = bool(dados['ativa'])
+            dados['consumo_mensal_kwh'] = consumos.get(dados['id'], [0.0] * 12)
+            unidades.append(UnidadeConsumidora(**dados))
+        return unidades
+
+    def carregar_unidade(self, id_unidade: str) -> Optional[UnidadeConsumidora]:
+        """Carrega uma única unidade"""
+        unidades = self.carregar_unidades([id_unidade])
+        return unidades[0] if unidades else None
+
+    def carregar_consumos(self, ids: Optional[Sequence[str]] = None) -> Dict[str, List[float]]:
+        """Consumo mensal (12 valores) por unidade"""
+        sql = "SELECT id_unidade, mes, consumo_kwh FROM consumo_mensal"
+        if ids is None:
+            consultas = [(sql, [])]
+        else:
+            ids = list(ids)
+            consultas = [
+                (f"{sql} WHERE id_unidade IN ({', '.join('?' * len(bloco))})", bloco)
+                for bloco in (ids[i:i + LIMITE_PARAMETROS] for i in range(0, len(ids), LIMITE_PARAMETROS))
+            ]
+
+        consumos: Dict[str, List[float]] = {}
+        for consulta, parametros in consultas:
+            for id_unidade, mes, valor in self.conexao.execute(consulta, parametros):
+                consumos.setdefault(id_unidade, [0.0] * 12)[mes - 1] = valor
+        return consumos
+
+    def salvar_unidade(self, unidade: UnidadeConsumidora):
+        """Inclui ou atualiza uma unidade e seus 12 consumos"""
+        try:
+            with self.conexao as con:
+                self._gravar_unidades(con, [unidade])
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar unidade '{unidade.id}': {e}")
+
+    def salvar_consumo(self, id_unidade: str, mes: int, valor: float):
+        """Grava o consumo de um mês (1-12) de uma unidade (upsert de uma linha)"""
+        try:
+            with self.conexao as con:
+                con.execute(
+                    "INSERT INTO consumo_mensal (id_unidade, mes, consumo_kwh) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id_unidade, mes) DO UPDATE SET consumo_kwh = excluded.consumo_kwh",
+                    (id_unidade, int(mes), float(valor))
+                )
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar consumo de '{id_unidade}' no mês {mes}: {e}")
+
+    def definir_unidade_ativa(self, id_unidade: str, ativa: bool):
+        """Ativa ou desativa uma unidade"""
+        try:
+            with self.conexao as con:
+                con.execute("UPDATE unidades SET ativa = ? WHERE id = ?", (int(bool(ativa)), id_unidade))
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao alterar status da unidade '{id_unidade}': {e}")
+
+    def remover_unidade(self, id_unidade: str):
+        """Remove a unidade e seus consumos"""
+        try:
+            with self.conexao as con:
+                con.execute("DELETE FROM unidades WHERE id = ?", (id_unidade,))
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao remover unidade '{id_unidade}': {e}")
+
+    # Abertura sob demanda
+
+    def carregar_resumo_sistema(self) -> ResumoSistema:
+        """Agregados das unidades calculados no banco, sem carregar registros"""
+        con = self.conexao
+        resumo = ResumoSistema(
+            quantidade_unidades=con.execute("SELECT COUNT(*) FROM unidades").fetchone()[0]
+        )
+        for tipo, quantidade in con.execute(
+                "SELECT tipo_ligacao, COUNT(*) FROM unidades WHERE ativa = 1 GROUP BY tipo_ligacao"):
+            tipo = TipoLigacao(tipo)
+            resumo.contagem_por_ligacao[tipo] = quantidade
+            resumo.quantidade_ativas += quantidade
+            resumo.taxa_disponibilidade_total += quantidade * TAXAS_DISPONIBILIDADE[tipo]
+        for mes, total in con.execute(
+                "SELECT c.mes, SUM(c.consumo_kwh) FROM consumo_mensal c "
+                "JOIN unidades u ON u.id = c.id_unidade WHERE u.ativa = 1 GROUP BY c.mes"):
+            resumo.consumo_mensal_kwh[mes - 1] = total
+        return resumo
+
+    def abrir_paginado(self, tamanho_cache: int = TAMANHO_CACHE_PADRAO) -> SistemaPaginado:
+        """Abre o sistema com índice leve e unidades carregadas por página ou id"""
+        if not self.existe():
+            raise ErroCarregamentoDados(f"Nenhum sistema salvo em '{self.arquivo_dados}'")
+
+        try:
+            indice = [EntradaIndiceUnidade(**entrada) for entrada in self.carregar_resumo_unidades()]
+            metadados = self._carregar_chave_valor('metadados')
+            return SistemaPaginado(
+                configuracao=self.carregar_configuracao(),
+                unidades=UnidadesSobDemanda(indice, lambda ids: self.carregar_unidades(list(ids)), tamanho_cache),
+                resumo=self.carregar_resumo_sistema(),
+                historico_creditos=self.carregar_historico_creditos(),
+                configuracao_relatorio=self._montar_dataclass(
+                    ConfiguracaoRelatorio, metadados.pop('configuracao_relatorio', {})),
+                metadados={campo: metadados[campo] for campo in CAMPOS_METADADOS if campo in metadados}
+            )
+        except Exception as e:
+            raise ErroCarregamentoDados(f"Erro ao abrir dados de '{self.arquivo_dados}': {e}")
+
+    # Livro de créditos
+
+    def carregar_historico_creditos(self, ano: Optional[int] = None,
+                                    mes: Optional[int] = None) -> List[HistoricoCreditos]:
+        """Lotes de créditos, opcionalmente filtrados pelo ano/mês de geração"""
+        condicoes, parametros = [], []
+        if ano is not None:
+            condicoes.append("ano_geracao = ?")
+            parametros.append(ano)
+        if mes is not None:
+            condicoes.append("mes_geracao = ?")
+            parametros.append(mes)
+        filtro = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        linhas = self.conexao.execute(
+            f"SELECT {', '.join(COLUNAS_CREDITO)} FROM creditos{filtro} ORDER BY id", parametros
+        )
+        creditos = []
+        for linha in linhas:
+            dados = dict(zip(COLUNAS_CREDITO, linha))
+            dados['ativo'] = bool(dados['ativo'])
+            creditos.append(HistoricoCreditos(**dados))
+        return creditos
+
+    def salvar_historico_creditos(self, historico: Iterable[HistoricoCreditos]):
+        """Substitui o livro de créditos salvo"""
+        try:
+            with self.conexao as con:
+                con.execute("DELETE FROM creditos")
+                con.executemany(
+                    f"INSERT INTO creditos ({', '.join(COLUNAS_CREDITO)}) "
+                    f"VALUES ({', '.join('?' * len(COLUNAS_CREDITO))})",
+                    [self._linha_credito(c) for c in historico]
+                )
+        except Exception as e:
+            raise ErroSalvamentoDados(f"Erro ao salvar histórico de créditos: {e}")
+
+    # Métodos auxiliares privados
+
+    def _gravar_unidades(self, con: sqlite3.Connection, unidades: Iterable[UnidadeConsumidora]):
+        """Upsert das unidades e de seus consumos, preservando a ordem das existentes"""
+        proxima_ordem = con.execute("SELECT COALESCE(MAX(ordem) + 1, 0) FROM unidades").fetchone()[0]
+        colunas = ('ordem',) + COLUNAS_UNIDADE
+        atualizacao = ', '.join(f"{c} = excluded.{c}" for c in COLUNAS_UNIDADE[1:])
+
+        linhas_unidades, linhas_consumo = [], []
+        for i, unidade in enumerate(unidades):
+            linhas_unidades.append((proxima_ordem + i,) + tuple(
+                self._codificar(getattr(unidade, coluna)) for coluna in COLUNAS_UNIDADE))
+            linhas_consumo.extend(
+                (unidade.id, mes, float(valor)) for mes, valor in enumerate(unidade.consumo_mensal_kwh, 1))
+
+        con.executemany(
+            f"INSERT INTO unidades ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {atualizacao}",
+            linhas_unidades
+        )
+        con.executemany(
+            "INSERT INTO consumo_mensal (id_unidade, mes, consumo_kwh) VALUES (?, ?, ?) "
+            "ON CONFLICT (id_unidade, mes) DO UPDATE SET consumo_kwh = excluded.consumo_kwh",
+            linhas_consumo
+        )
+
+    def _gravar_configuracao(self, con: sqlite3.Connection, configuracao: ConfiguracaoSistema):
+        self._gravar_chave_valor(con, 'configuracao', self._para_dict(configuracao))
+
+    def _gravar_chave_valor(self, con: sqlite3.Connection, tabela: str, valores: Dict[str, Any]):
+        con.executemany(
+            f"INSERT INTO {tabela} (chave, valor) VALUES (?, ?) "
+            f"ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor",
+            [(chave, json.dumps(valor, ensure_ascii=False, default=self._codificar_json))
+             for chave, valor in valores.items()]
+        )
+
+    def _carregar_chave_valor(self, tabela: str) -> Dict[str, Any]:
+        return {chave: json.loads(valor) for chave, valor in self.conexao.execute(f"SELECT chave, valor FROM {tabela}")}
+
+    def _para_dict(self, objeto) -> Dict[str, Any]:
+        """Campos de uma dataclass, sem cópia profunda"""
+        return {campo.name: getattr(objeto, campo.name) for campo in fields(objeto)}
+
+    def _montar_dataclass(self, classe, dados: Dict[str, Any]):
+        """Recria a dataclass ignorando chaves desconhecidas e convertendo Enums"""
+        argumentos = {}
+        for campo in fields(classe):
+            if campo.name not in dados:
+                continue
+            valor = dados[campo.name]
+            if isinstance(campo.type, type) and issubclass(campo.type, Enum):
+                valor = campo.type(valor)
+            argumentos[campo.name] = valor
+        return classe(**argumentos)
+
+    def _linha_credito(self, credito: HistoricoCreditos) -> tuple:
+        return tuple(self._codificar(getattr(credito, coluna)) for coluna in COLUNAS_CREDITO)
+
+    @staticmethod
+    def _codificar(valor: Any) -> Any:
+        """Converte Enums e booleanos para tipos aceitos pelo SQLite"""
+        if isinstance(valor, Enum):
+            return valor.value
+        if isinstance(valor, bool):
+            return int(valor)
+        return valor
+
+    @staticmethod
+    def _codificar_json(valor: Any) -> Any:
+        """Valores não serializáveis por padrão no JSON"""
+        if isinstance(valor, Enum):
+            return valor.value
+        raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
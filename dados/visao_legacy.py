@@ -0,0 +1,203 @@
+"""
+Visão legacy sobre o SistemaEnergia
+Expõe o formato {"sistema", "unidades", "consumos"} com meses por extenso
+lendo diretamente os modelos, sem montar o dicionário convertido
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator
+
+from nucleo.modelos import SistemaEnergia, TipoLigacao
+
+MESES_COMPLETOS = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
+]
+
+_INDICE_MES = {mes: i for i, mes in enumerate(MESES_COMPLETOS)}
+
+TIPOS_LEGACY = {
+    TipoLigacao.MONOFASICA: "mono",
+    TipoLigacao.BIFASICA: "bi",
+    TipoLigacao.TRIFASICA: "tri"
+}
+
+# Mesmos valores usados por GerenciadorDadosLegacy.converter_de_sistema_energia
+POTENCIA_INVERSOR_PADRAO = 75.0
+GERACAO_MENSAL_PADRAO = 10000
+
+
+class VisaoMeses(Mapping):
+    """Mês por extenso -> valor, lido de uma lista de 12 posições"""
+
+    __slots__ = ('_obter_valores', '_padrao')
+
+    def __init__(self, obter_valores, padrao: float = 0):
+        self._obter_valores = obter_valores
+        self._padrao = padrao
+
+    def __getitem__(self, mes: str):
+        i = _INDICE_MES[mes]
+        valores = self._obter_valores()
+        return valores[i] if valores is not None and i < len(valores) else self._padrao
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(MESES_COMPLETOS)
+
+    def __len__(self) -> int:
+        return len(MESES_COMPLETOS)
+
+    def __contains__(self, mes) -> bool:
+        return mes in _INDICE_MES
+
+
+class VisaoUnidadeLegacy(Mapping):
+    """Cadastro de uma unidade no formato legacy (codigo, nome, tipo, endereco)"""
+
+    __slots__ = ('unidade',)
+
+    _CHAVES = ('codigo', 'nome', 'tipo', 'endereco')
+
+    def __init__(self, unidade):
+        self.unidade = unidade
+
+    def __getitem__(self, chave: str):
+        if chave == 'codigo':
+            return codigo_legacy(self.unidade)
+        if chave == 'nome':
+            return self.unidade.nome
+        if chave == 'tipo':
+            return TIPOS_LEGACY.get(self.unidade.tipo_ligacao, "tri")
+        if chave == 'endereco':
+            return self.unidade.endereco
+        raise KeyError(chave)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._CHAVES)
+
+    def __len__(self) -> int:
+        return len(self._CHAVES)
+
+
+class VisaoUnidadesLegacy(Sequence):
+    """Lista de cadastros legacy das unidades do sistema"""
+
+    __slots__ = ('_sistema',)
+
+    def __init__(self, sistema: SistemaEnergia):
+        self._sistema = sistema
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [VisaoUnidadeLegacy(u) for u in self._sistema.unidades[indice]]
+        return VisaoUnidadeLegacy(self._sistema.unidades[indice])
+
+    def __len__(self) -> int:
+        return len(self._sistema.unidades)
+
+
+class VisaoConsumosLegacy(Mapping):
+    """Código da unidade -> consumos por mês"""
+
+    __slots__ = ('_sistema', '_cache')
+
+    def __init__(self, sistema: SistemaEnergia):
+        self._sistema = sistema
+        self._cache = (None, {})
+
+    def __getitem__(self, codigo: str) -> VisaoMeses:
+        unidade = self._por_codigo()[codigo]
+        return VisaoMeses(lambda: unidade.consumo_mensal_kwh)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._por_codigo())
+
+    def __len__(self) -> int:
+        return len(self._por_codigo())
+
+    def __contains__(self, codigo) -> bool:
+        return codigo in self._por_codigo()
+
+    def _por_codigo(self) -> Dict[str, Any]:
+        """Mapa código -> unidade, refeito quando o índice do sistema muda"""
+        indice = self._sistema._obter_indice()
+        if self._cache[0] is not indice:
+            por_codigo = {}
+            for unidade in self._sistema.unidades:
+                por_codigo[codigo_legacy(unidade)] = unidade
+            self._cache = (indice, por_codigo)
+        return self._cache[1]
+
+
+class VisaoSistemaLegacy(Mapping):
+    """Bloco "sistema" do formato legacy"""
+
+    __slots__ = ('_sistema',)
+
+    _CHAVES = ('potencia_inversor', 'potencia_modulos', 'eficiencia_usina', 'geracao_mensal')
+
+    def __init__(self, sistema: SistemaEnergia):
+        self._sistema = sistema
+
+    def __getitem__(self, chave: str):
+        configuracao = self._sistema.configuracao
+        if chave == 'potencia_inversor':
+            return POTENCIA_INVERSOR_PADRAO
+        if chave == 'potencia_modulos':
+            return configuracao.potencia_instalada_kw
+        if chave == 'eficiencia_usina':
+            return configuracao.eficiencia_sistema
+        if chave == 'geracao_mensal':
+            return VisaoMeses(lambda: self._sistema.configuracao.geracao_mensal_kwh or None,
+                              GERACAO_MENSAL_PADRAO)
+        raise KeyError(chave)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._CHAVES)
+
+    def __len__(self) -> int:
+        return len(self._CHAVES)
+
+
+class VisaoDadosLegacy(Mapping):
+    """
+    Dados legacy como visão somente leitura do SistemaEnergia
+
+    Equivale ao retorno de GerenciadorDadosLegacy.converter_de_sistema_energia,
+    mas cada acesso lê o valor atual do modelo. Use como_dict() para obter uma
+    cópia serializável.
+    """
+
+    __slots__ = ('sistema', '_blocos')
+
+    def __init__(self, sistema: SistemaEnergia):
+        self.sistema = sistema
+        self._blocos = {
+            'sistema': VisaoSistemaLegacy(sistema),
+            'unidades': VisaoUnidadesLegacy(sistema),
+            'consumos': VisaoConsumosLegacy(sistema)
+        }
+
+    def __getitem__(self, chave: str):
+        return self._blocos[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._blocos)
+
+    def __len__(self) -> int:
+        return len(self._blocos)
+
+    def como_dict(self) -> Dict:
+        """Cópia em dicionários e listas comuns (para JSON)"""
+        sistema = dict(self['sistema'])
+        sistema['geracao_mensal'] = dict(sistema['geracao_mensal'])
+        return {
+            'sistema': sistema,
+            'unidades': [dict(u) for u in self['unidades']],
+            'consumos': {codigo: dict(meses) for codigo, meses in self['consumos'].items()}
+        }
+
+
+def codigo_legacy(unidade) -> str:
+    """Código legacy da unidade (atributo 'codigo' quando existir, senão o id)"""
+    return getattr(unidade, 'codigo', unidade.id)
@@ -17,12 +17,13 @@ from configuracao.definicoes import (
     CONFIGURACOES_UI, MENSAGENS_SISTEMA
 )
 from dados.repositorio import RepositorioDados
-from dados.migrador import migrar_arquivo_legacy, validar_antes_migrar
+from dados.migrador import validar_e_migrar
 from negocio.calculadora_energia import CalculadoraEnergia
 from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
 from negocio.gerador_relatorios import GeradorRelatorios
+from negocio.contexto_calculo import obter_contexto
 from ui.graficos.graficos_analise import GeradorGraficosAnalise, gerar_grafico_sistema_legacy
-from nucleo.excecoes import ErroSistemaEnergia
+from nucleo.excecoes import ErroSistemaEnergia, ErroCorrupcaoDados
 from utilitarios.formatadores import formatar_moeda, formatar_energia, formatar_percentual
 
 
@@ -46,6 +47,13 @@ class SistemaEnergiaSolar:
             # Tentar carregar sistema existente
             self.sistema = self.repositorio.carregar_sistema()
             print(f"✅ Sistema carregado: {self.sistema.versao_sistema}")
+        except ErroCorrupcaoDados as e:
+            # Preserva os arquivos corrompidos: o próximo salvamento gravaria o sistema padrão por cima
+            print(f"❌ {e}")
+            for arquivo in self.repositorio.isolar_arquivos_corrompidos():
+                print(f"⚠️ Arquivo corrompido preservado em: {arquivo}")
+            self.sistema = obter_sistema_padrao()
+            print(f"✅ Sistema padrão criado: {self.sistema.versao_sistema}")
         except:
             # Se não conseguir carregar, usar sistema padrão
             self.sistema = obter_sistema_padrao()
@@ -56,24 +64,26 @@ class SistemaEnergiaSolar:
 
     def _inicializar_componentes(self):
         """Inicializa todos os componentes do sistema"""
-        self.calculadora = CalculadoraEnergia(self.sistema)
-        self.gerenciador = GerenciadorDistribuicao(self.sistema)
-        self.gerador_relatorios = GeradorRelatorios(self.sistema)
-        self.gerador_graficos = GeradorGraficosAnalise(self.sistema)
+        # Rastreamento de alterações: o contexto valida o cache pela versão do sistema
+        self.sistema.ativar_rastreamento()
+        # Contexto único: relatórios, gráficos e calculadoras reaproveitam os mesmos resultados
+        self.contexto = obter_contexto(self.sistema)
+        self.calculadora = CalculadoraEnergia(self.sistema, self.contexto)
+        self.gerenciador = GerenciadorDistribuicao(self.sistema, self.contexto)
+        self.gerador_relatorios = GeradorRelatorios(self.sistema, self.contexto)
+        self.gerador_graficos = GeradorGraficosAnalise(self.sistema, self.contexto)
 
     def migrar_arquivo_legacy(self, caminho_arquivo: str) -> bool:
         """Migra arquivo do sistema legacy"""
         try:
             print(f"🔄 Migrando arquivo: {caminho_arquivo}")
 
-            # Validar arquivo antes de migrar
-            if not validar_antes_migrar(caminho_arquivo):
-                print("❌ Arquivo inválido para migração")
+            # Validar e migrar com uma única leitura do arquivo
+            sistema_migrado, validacao = validar_e_migrar(caminho_arquivo)
+            if sistema_migrado is None:
+                print(f"❌ Arquivo inválido para migração: {'; '.join(validacao['erros'])}")
                 return False
 
-            # Migrar arquivo
-            sistema_migrado = migrar_arquivo_legacy(caminho_arquivo)
-
             # Atualizar sistema atual
             self.sistema = sistema_migrado
             self._inicializar_componentes()
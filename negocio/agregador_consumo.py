@@ -0,0 +1,282 @@
+"""
+Agregador incremental de consumo
+Mantém totais mensais, tarifas mínimas, somas anuais e participações na
+distribuição de créditos, atualizando-os a partir da diferença de cada alteração
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from nucleo.modelos import SistemaEnergia, UnidadeConsumidora, TipoLigacao
+from nucleo.excecoes import ErroCalculoEnergia
+from nucleo.rastreamento import EventoAlteracao
+from nucleo.unidades_compactas import UnidadeCompacta
+
+TARIFAS_MINIMAS_PADRAO = {
+    TipoLigacao.MONOFASICA: 30.0,
+    TipoLigacao.BIFASICA: 50.0,
+    TipoLigacao.TRIFASICA: 100.0
+}
+
+
+@dataclass
+class _EstadoUnidade:
+    """Valores de uma unidade já contabilizados nos totais"""
+    consumos: List[float]
+    tarifa_minima: float
+    ativa: bool
+    percentual: float
+    liquidos: List[float] = field(init=False)
+
+    def __post_init__(self):
+        self.liquidos = [max(0.0, c - self.tarifa_minima) for c in self.consumos]
+
+
+class AgregadorConsumo:
+    """
+    Totais do sistema mantidos incrementalmente
+
+    Alterar um mês de uma unidade custa O(1); ativar/desativar ou trocar a tarifa
+    mínima custa O(12). Apenas unidades ativas entram nos totais. O consumo
+    líquido segue a regra da CalculadoraCreditos: max(0, consumo - tarifa mínima).
+    """
+
+    def __init__(self, tarifas_minimas: Optional[Dict[TipoLigacao, float]] = None):
+        self.tarifas_minimas = tarifas_minimas or dict(TARIFAS_MINIMAS_PADRAO)
+        self._unidades: Dict[str, _EstadoUnidade] = {}
+        self._sistema: Optional[SistemaEnergia] = None
+        self._zerar_totais()
+
+    @classmethod
+    def de_sistema(cls, sistema: SistemaEnergia, acompanhar: bool = False,
+                   tarifas_minimas: Optional[Dict[TipoLigacao, float]] = None) -> 'AgregadorConsumo':
+        """
+        Cria o agregador a partir das unidades do sistema
+
+        Com acompanhar=True, liga o rastreamento do sistema e passa a atualizar os
+        totais a cada alteração notificada.
+        """
+        agregador = cls(tarifas_minimas)
+        for unidade in sistema.unidades:
+            agregador.definir_unidade_consumidora(unidade)
+
+        if acompanhar:
+            agregador._sistema = sistema
+            sistema.inscrever(agregador.processar_evento)
+
+        return agregador
+
+    # Alterações
+
+    def definir_unidade(self, id_unidade: str, consumos: Sequence[float], tarifa_minima: float,
+                        ativa: bool = True, percentual: float = 0.0):
+        """Inclui ou substitui uma unidade"""
+        if len(consumos) != 12:
+            raise ErroCalculoEnergia(f"Unidade {id_unidade}: consumo deve ter 12 valores")
+
+        self.remover_unidade(id_unidade)
+        estado = _EstadoUnidade([float(c) for c in consumos], float(tarifa_minima), bool(ativa), float(percentual))
+        self._unidades[id_unidade] = estado
+        if estado.ativa:
+            self._contabilizar(estado, 1)
+
+    def definir_unidade_consumidora(self, unidade: UnidadeConsumidora):
+        """Inclui ou substitui uma UnidadeConsumidora"""
+        self.definir_unidade(unidade.id, unidade.consumo_mensal_kwh,
+                             self.tarifas_minimas.get(unidade.tipo_ligacao, 100.0),
+                             unidade.ativa, unidade.percentual_energia_alocada)
+
+    def remover_unidade(self, id_unidade: str):
+        """Remove uma unidade (se existir)"""
+        estado = self._unidades.pop(id_unidade, None)
+        if estado is not None and estado.ativa:
+            self._contabilizar(estado, -1)
+
+    def atualizar_consumo(self, id_unidade: str, mes: int, valor: float):
+        """Altera o consumo de um mês (1-12) de uma unidade"""
+        estado = self._obter_estado(id_unidade)
+        if not 1 <= mes <= 12:
+            raise ErroCalculoEnergia(f"Mês inválido: {mes}")
+
+        i = mes - 1
+        valor = float(valor)
+        liquido = max(0.0, valor - estado.tarifa_minima)
+
+        if estado.ativa:
+            delta_consumo = valor - estado.consumos[i]
+            delta_liquido = liquido - estado.liquidos[i]
+            self._consumo_mes[i] += delta_consumo
+            self._liquido_mes[i] += delta_liquido
+            self._consumo_anual += delta_consumo
+            self._liquido_anual += delta_liquido
+
+        estado.consumos[i] = valor
+        estado.liquidos[i] = liquido
+
+    def atualizar_consumos(self, id_unidade: str, consumos: Sequence[float]):
+        """Altera os meses cujo valor mudou"""
+        estado = self._obter_estado(id_unidade)
+        for i, valor in enumerate(consumos):
+            if valor != estado.consumos[i]:
+                self.atualizar_consumo(id_unidade, i + 1, valor)
+
+    def definir_ativa(self, id_unidade: str, ativa: bool):
+        """Ativa ou desativa uma unidade"""
+        estado = self._obter_estado(id_unidade)
+        if estado.ativa != bool(ativa):
+            self._contabilizar(estado, 1 if ativa else -1)
+            estado.ativa = bool(ativa)
+
+    def definir_tarifa_minima(self, id_unidade: str, tarifa_minima: float):
+        """Altera a tarifa mínima (kWh) de uma unidade"""
+        estado = self._obter_estado(id_unidade)
+        if estado.tarifa_minima == float(tarifa_minima):
+            return
+        if estado.ativa:
+            self._contabilizar(estado, -1)
+        estado.tarifa_minima = float(tarifa_minima)
+        estado.liquidos = [max(0.0, c - estado.tarifa_minima) for c in estado.consumos]
+        if estado.ativa:
+            self._contabilizar(estado, 1)
+
+    def definir_percentual(self, id_unidade: str, percentual: float):
+        """Altera o percentual de energia alocado a uma unidade"""
+        estado = self._obter_estado(id_unidade)
+        if estado.ativa:
+            self._percentual_total += float(percentual) - estado.percentual
+        estado.percentual = float(percentual)
+
+    def recalcular(self):
+        """Refaz os totais do zero (descarta erro acumulado de ponto flutuante)"""
+        self._zerar_totais()
+        for estado in self._unidades.values():
+            if estado.ativa:
+                self._contabilizar(estado, 1)
+
+    def processar_evento(self, evento: EventoAlteracao):
+        """Aplica uma alteração notificada pelo rastreamento dos modelos"""
+        objeto = evento.objeto
+
+        if isinstance(objeto, (UnidadeConsumidora, UnidadeCompacta)):
+            if objeto.id not in self._unidades or evento.campo == 'id':
+                self._sincronizar_unidades()
+            elif evento.campo == 'consumo_mensal_kwh':
+                self.atualizar_consumos(objeto.id, objeto.consumo_mensal_kwh)
+            elif evento.campo == 'ativa':
+                self.definir_ativa(objeto.id, objeto.ativa)
+            elif evento.campo == 'percentual_energia_alocada':
+                self.definir_percentual(objeto.id, objeto.percentual_energia_alocada)
+            elif evento.campo == 'tipo_ligacao':
+                self.definir_tarifa_minima(objeto.id, self.tarifas_minimas.get(objeto.tipo_ligacao, 100.0))
+
+        elif isinstance(objeto, SistemaEnergia) and evento.campo == 'unidades':
+            self._sincronizar_unidades()
+
+    # Consultas
+
+    @property
+    def quantidade_unidades_ativas(self) -> int:
+        """Número de unidades ativas"""
+        return self._quantidade_ativas
+
+    @property
+    def consumo_por_mes(self) -> List[float]:
+        """Consumo total das unidades ativas em cada mês"""
+        return list(self._consumo_mes)
+
+    @property
+    def consumo_liquido_por_mes(self) -> List[float]:
+        """Consumo acima da tarifa mínima, somado por mês"""
+        return list(self._liquido_mes)
+
+    @property
+    def consumo_total_anual(self) -> float:
+        """Consumo anual das unidades ativas"""
+        return self._consumo_anual
+
+    @property
+    def consumo_medio_mensal(self) -> float:
+        """Consumo médio mensal das unidades ativas"""
+        return self._consumo_anual / 12
+
+    @property
+    def consumo_liquido_anual(self) -> float:
+        """Consumo anual acima da tarifa mínima (faturável)"""
+        return self._liquido_anual
+
+    @property
+    def tarifas_minimas_total(self) -> float:
+        """Soma das tarifas mínimas mensais (kWh) das unidades ativas"""
+        return self._tarifas_minimas_total
+
+    @property
+    def percentual_total(self) -> float:
+        """Soma dos percentuais alocados às unidades ativas"""
+        return self._percentual_total
+
+    def participacao_proporcional(self, id_unidade: str, mes: int) -> float:
+        """Fração dos créditos do mês recebida pela unidade no rateio proporcional"""
+        estado = self._obter_estado(id_unidade)
+        total = self._liquido_mes[mes - 1]
+        if not estado.ativa or total <= 0:
+            return 0.0
+        return estado.liquidos[mes - 1] / total
+
+    def participacao_percentual(self, id_unidade: str) -> float:
+        """Fração da energia recebida pela unidade no rateio por percentual alocado"""
+        estado = self._obter_estado(id_unidade)
+        if not estado.ativa or self._percentual_total <= 0:
+            return 0.0
+        return estado.percentual / self._percentual_total
+
+    def participacoes(self, mes: Optional[int] = None) -> Dict[str, float]:
+        """Participações de todas as unidades ativas (proporcional se mes for informado)"""
+        if mes is None:
+            return {uid: self.participacao_percentual(uid) for uid, e in self._unidades.items() if e.ativa}
+        return {uid: self.participacao_proporcional(uid, mes) for uid, e in self._unidades.items() if e.ativa}
+
+    def __contains__(self, id_unidade: str) -> bool:
+        return id_unidade in self._unidades
+
+    def __len__(self) -> int:
+        return len(self._unidades)
+
+    # Métodos auxiliares privados
+
+    def _zerar_totais(self):
+        self._consumo_mes = [0.0] * 12
+        self._liquido_mes = [0.0] * 12
+        self._consumo_anual = 0.0
+        self._liquido_anual = 0.0
+        self._tarifas_minimas_total = 0.0
+        self._percentual_total = 0.0
+        self._quantidade_ativas = 0
+
+    def _contabilizar(self, estado: _EstadoUnidade, sinal: int):
+        """Soma (sinal=1) ou retira (sinal=-1) a unidade dos totais"""
+        for i in range(12):
+            self._consumo_mes[i] += sinal * estado.consumos[i]
+            self._liquido_mes[i] += sinal * estado.liquidos[i]
+        self._consumo_anual += sinal * sum(estado.consumos)
+        self._liquido_anual += sinal * sum(estado.liquidos)
+        self._tarifas_minimas_total += sinal * estado.tarifa_minima
+        self._percentual_total += sinal * estado.percentual
+        self._quantidade_ativas += sinal
+
+    def _obter_estado(self, id_unidade: str) -> _EstadoUnidade:
+        estado = self._unidades.get(id_unidade)
+        if estado is None:
+            raise ErroCalculoEnergia(f"Unidade não agregada: {id_unidade}")
+        return estado
+
+    def _sincronizar_unidades(self):
+        """Acompanha inclusões, remoções e trocas de id na lista do sistema"""
+        if self._sistema is None:
+            return
+
+        atuais = {u.id: u for u in self._sistema.unidades}
+        for id_unidade in [uid for uid in self._unidades if uid not in atuais]:
+            self.remover_unidade(id_unidade)
+        for id_unidade, unidade in atuais.items():
+            if id_unidade not in self._unidades:
+                self.definir_unidade_consumidora(unidade)
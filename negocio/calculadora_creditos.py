@@ -4,7 +4,16 @@ Implementa a lógica específica de distribuição de créditos
 """
 
 from typing import Dict, List, Tuple
+
+import numpy as np
+
 from nucleo.modelos import SistemaEnergia, TipoLigacao
+from nucleo.excecoes import ErroCreditos
+from nucleo.unidades_compactas import obter_matriz_compacta
+from negocio.estrategias_distribuicao import EntradaDistribuicao, obter_estrategia
+from negocio.otimizador_alocacao import (
+    TabelaAlocacao, OBJETIVOS_OTIMIZACAO, otimizar_percentuais, calcular_compra_rede
+)
 from utilitarios.formatadores import formatar_moeda, formatar_energia
 
 
@@ -40,10 +49,8 @@ class CalculadoraCreditos:
 
     def calcular_tarifas_minimas_total(self) -> float:
         """Calcula total de tarifas mínimas de todas as unidades ativas"""
-        total = 0
-        for unidade in self.sistema.get_unidades_ativas():
-            total += self.tarifas_minimas.get(unidade.tipo_ligacao, 100)
-        return total
+        return sum(self.tarifas_minimas.get(tipo, 100) * quantidade
+                   for tipo, quantidade in self.sistema.get_contagem_por_ligacao().items())
 
     def calcular_creditos_mes(self, mes: int) -> Dict:
         """Calcula os créditos disponíveis para um mês específico"""
@@ -59,85 +66,113 @@ class CalculadoraCreditos:
         # Tarifas mínimas
         tarifas_minimas = self.calcular_tarifas_minimas_total()
 
-        # Créditos disponíveis (geração - tarifas mínimas)
-        creditos_disponiveis = max(0, geracao_real - tarifas_minimas)
-
-        # Créditos utilizados (menor entre consumo e disponível)
-        creditos_utilizados = min(consumo_total, creditos_disponiveis)
-
-        # Créditos restantes
-        creditos_restantes = creditos_disponiveis - creditos_utilizados
+        return self._montar_resumo_mes(mes, geracao_real, consumo_total, tarifas_minimas)
+
+    def calcular_matriz_distribuicao(self, metodo: str = 'proporcional', limites_kwh=None,
+                                     tabela_alocacao: TabelaAlocacao = None) -> Dict:
+        """
+        Distribui os créditos dos 12 meses entre todas as unidades ativas em uma chamada
+
+        metodo: nome de uma estratégia registrada em ESTRATEGIAS_DISTRIBUICAO
+        limites_kwh: limite opcional de créditos por unidade (escalar, vetor por
+        unidade ou matriz unidades × meses)
+        tabela_alocacao: percentuais a usar no lugar de percentual_energia_alocada
+        Retorna as matrizes (unidades × 12) usadas e o resultado da estratégia.
+        """
+        estrategia = obter_estrategia(metodo)
+        unidades = self.sistema.get_unidades_ativas()
+
+        geracao = np.array([self.obter_geracao_mensal(mes) for mes in range(1, 13)])
+        consumo_bruto = obter_matriz_compacta(unidades)
+        if consumo_bruto is None:
+            consumo_bruto = np.array([u.consumo_mensal_kwh[:12] for u in unidades], dtype=float).reshape(-1, 12)
+        tarifas_minimas = np.array([self.tarifas_minimas.get(u.tipo_ligacao, 100) for u in unidades], dtype=float)
+        consumo_liquido = np.maximum(0.0, consumo_bruto - tarifas_minimas[:, np.newaxis])
+
+        creditos_disponiveis = np.maximum(0.0, geracao - tarifas_minimas.sum())
+
+        if limites_kwh is None:
+            limites = np.full(consumo_bruto.shape, np.inf)
+        else:
+            limites = np.asarray(limites_kwh, dtype=float)
+            if limites.ndim == 1:
+                limites = limites[:, np.newaxis]
+            limites = np.broadcast_to(limites, consumo_bruto.shape)
+
+        entrada = EntradaDistribuicao(
+            creditos_disponiveis=creditos_disponiveis,
+            consumo_liquido=consumo_liquido,
+            percentual_alocado=self._obter_percentuais(unidades, tabela_alocacao),
+            prioridade=np.array([u.prioridade_distribuicao for u in unidades], dtype=float),
+            limites_kwh=limites
+        )
 
         return {
-            'mes': mes,
-            'geracao_real': geracao_real,
-            'consumo_total': consumo_total,
+            'metodo': metodo,
+            'unidades': unidades,
+            'geracao': geracao,
+            'consumo_bruto': consumo_bruto,
             'tarifas_minimas': tarifas_minimas,
+            'consumo_liquido': consumo_liquido,
             'creditos_disponiveis': creditos_disponiveis,
-            'creditos_utilizados': creditos_utilizados,
-            'creditos_restantes': creditos_restantes,
-            'eficiencia': self.sistema.configuracao.eficiencia_sistema * 100,
-            'status': 'SOBRA' if creditos_restantes > 0 else 'EQUILIBRIO' if creditos_restantes == 0 else 'DEFICIT'
+            **self._calcular_valores_unidades(estrategia(entrada), consumo_liquido, tarifas_minimas)
         }
 
-    def distribuir_creditos_mes(self, mes: int, metodo: str = 'proporcional') -> Dict:
+    def distribuir_creditos_mes(self, mes: int, metodo: str = 'proporcional', limites_kwh=None,
+                                tabela_alocacao: TabelaAlocacao = None) -> Dict:
         """Distribui créditos entre as unidades para um mês"""
-        resultado_mes = self.calcular_creditos_mes(mes)
-        creditos_disponiveis = resultado_mes['creditos_disponiveis']
-
-        distribuicao = {}
-
-        if metodo == 'proporcional':
-            # Calcular consumo total líquido (sem tarifas mínimas)
-            consumo_total_liquido = 0
-            consumos_unidades = {}
-
-            for unidade in self.sistema.get_unidades_ativas():
-                if 1 <= mes <= 12:
-                    consumo_bruto = unidade.consumo_mensal_kwh[mes - 1]
-                    tarifa_minima = self.tarifas_minimas.get(unidade.tipo_ligacao, 100)
-                    consumo_liquido = max(0, consumo_bruto - tarifa_minima)
-
-                    consumos_unidades[unidade.id] = {
-                        'unidade': unidade,
-                        'consumo_bruto': consumo_bruto,
-                        'tarifa_minima': tarifa_minima,
-                        'consumo_liquido': consumo_liquido
-                    }
-                    consumo_total_liquido += consumo_liquido
-
-            # Distribuir proporcionalmente
-            for unidade_id, dados_consumo in consumos_unidades.items():
-                if consumo_total_liquido > 0:
-                    proporcao = dados_consumo['consumo_liquido'] / consumo_total_liquido
-                    creditos_recebidos = creditos_disponiveis * proporcao
-                else:
-                    creditos_recebidos = 0
-
-                # Valor que sobra para pagar (consumo - créditos recebidos)
-                valor_a_pagar = max(0, dados_consumo['consumo_liquido'] - creditos_recebidos)
-
-                # Valor final (tarifa mínima + valor a pagar)
-                valor_final = dados_consumo['tarifa_minima'] + valor_a_pagar
-
-                distribuicao[unidade_id] = {
-                    'nome': dados_consumo['unidade'].nome,
-                    'tipo_ligacao': dados_consumo['unidade'].tipo_ligacao.value,
-                    'consumo_bruto': dados_consumo['consumo_bruto'],
-                    'tarifa_minima': dados_consumo['tarifa_minima'],
-                    'consumo_liquido': dados_consumo['consumo_liquido'],
-                    'creditos_recebidos': round(creditos_recebidos, 2),
-                    'valor_a_pagar': round(valor_a_pagar, 2),
-                    'valor_final': round(valor_final, 2),
-                    'proporcao': round(proporcao * 100, 1) if consumo_total_liquido > 0 else 0
-                }
-
-        return {
-            'mes': mes,
-            'resumo': resultado_mes,
-            'distribuicao': distribuicao,
-            'metodo': metodo
-        }
+        if not 1 <= mes <= 12:
+            return {
+                'mes': mes,
+                'resumo': self.calcular_creditos_mes(mes),
+                'distribuicao': {},
+                'metodo': metodo
+            }
+
+        matrizes = self.calcular_matriz_distribuicao(metodo, limites_kwh, tabela_alocacao)
+        return self._formatar_distribuicao_mes(matrizes, mes)
+
+    def distribuir_creditos_ano(self, metodo: str = 'proporcional', limites_kwh=None,
+                                tabela_alocacao: TabelaAlocacao = None) -> List[Dict]:
+        """Distribui créditos dos 12 meses com uma única execução da estratégia"""
+        matrizes = self.calcular_matriz_distribuicao(metodo, limites_kwh, tabela_alocacao)
+        return [self._formatar_distribuicao_mes(matrizes, mes) for mes in range(1, 13)]
+
+    def otimizar_alocacao(self, objetivo: str = 'compra_rede',
+                          valores_kwh: Dict[str, float] = None) -> TabelaAlocacao:
+        """
+        Calcula percentuais de alocação ótimos para as unidades ativas
+
+        objetivo: 'compra_rede' minimiza a energia comprada da rede no ano;
+        'receita' maximiza o valor faturável dos créditos aproveitados, usando
+        valores_kwh por unidade (padrão: tarifa de energia da configuração)
+        A tabela retornada pode ser usada em calcular_matriz_distribuicao ou
+        gravada no sistema com TabelaAlocacao.aplicar.
+        """
+        if objetivo not in OBJETIVOS_OTIMIZACAO:
+            raise ErroCreditos(f"Objetivo de otimização desconhecido: {objetivo}")
+
+        matrizes = self.calcular_matriz_distribuicao('percentual_fixo')
+        unidades = matrizes['unidades']
+
+        valores = None
+        if objetivo == 'receita':
+            tarifa_padrao = self.sistema.configuracao.tarifa_energia_kwh
+            valores_kwh = valores_kwh or {}
+            valores = np.array([valores_kwh.get(u.id, tarifa_padrao) for u in unidades], dtype=float)
+
+        percentuais = otimizar_percentuais(matrizes['creditos_disponiveis'], matrizes['consumo_liquido'], valores)
+        percentuais_atuais = self._obter_percentuais(unidades)
+
+        return TabelaAlocacao(
+            objetivo=objetivo,
+            percentuais={u.id: p for u, p in zip(unidades, percentuais.tolist())},
+            compra_rede_atual_kwh=float(calcular_compra_rede(
+                matrizes['creditos_disponiveis'], matrizes['consumo_liquido'], percentuais_atuais).sum()),
+            compra_rede_otimizada_kwh=float(calcular_compra_rede(
+                matrizes['creditos_disponiveis'], matrizes['consumo_liquido'], percentuais).sum()),
+            percentuais_anteriores={u.id: p for u, p in zip(unidades, percentuais_atuais.tolist())}
+        )
 
     def calcular_balanco_anual(self) -> Dict:
         """Calcula balanço energético anual"""
@@ -164,7 +199,7 @@ class CalculadoraCreditos:
             'status': 'SOBRA' if saldo_anual > 0 else 'DEFICIT'
         }
 
-    def obter_relatorio_creditos_completo(self, ano: int = 2025) -> Dict:
+    def obter_relatorio_creditos_completo(self, ano: int = 2025, metodo: str = 'proporcional') -> Dict:
         """Gera relatório completo de créditos para o ano"""
         relatorio = {
             'ano': ano,
@@ -174,23 +209,18 @@ class CalculadoraCreditos:
             'unidades': []
         }
 
-        # Calcular para cada mês
-        for mes in range(1, 13):
-            resultado_mensal = self.distribuir_creditos_mes(mes)
-            relatorio['detalhes_mensais'].append(resultado_mensal)
+        # Distribuir os 12 meses de uma vez
+        matrizes = self.calcular_matriz_distribuicao(metodo)
+        relatorio['detalhes_mensais'] = [self._formatar_distribuicao_mes(matrizes, mes) for mes in range(1, 13)]
 
-        # Resumo por unidade
-        for unidade in self.sistema.get_unidades_ativas():
-            consumo_anual = sum(unidade.consumo_mensal_kwh)
-            creditos_anuais = 0
-            valor_final_anual = 0
+        # Resumo por unidade (mesmos arredondamentos do detalhamento mensal)
+        creditos_anuais_unidades = np.round(matrizes['creditos_recebidos'], 2).sum(axis=1).tolist()
+        valores_finais_anuais = np.round(matrizes['valor_final'], 2).sum(axis=1).tolist()
 
-            # Somar créditos de todos os meses
-            for detalhe_mensal in relatorio['detalhes_mensais']:
-                if unidade.id in detalhe_mensal['distribuicao']:
-                    dist = detalhe_mensal['distribuicao'][unidade.id]
-                    creditos_anuais += dist['creditos_recebidos']
-                    valor_final_anual += dist['valor_final']
+        for indice, unidade in enumerate(matrizes['unidades']):
+            consumo_anual = sum(unidade.consumo_mensal_kwh)
+            creditos_anuais = creditos_anuais_unidades[indice]
+            valor_final_anual = valores_finais_anuais[indice]
 
             relatorio['unidades'].append({
                 'id': unidade.id,
@@ -204,6 +234,113 @@ class CalculadoraCreditos:
 
         return relatorio
 
+    # Métodos auxiliares privados
+
+    @staticmethod
+    def _obter_percentuais(unidades: List, tabela_alocacao: TabelaAlocacao = None) -> np.ndarray:
+        """Percentuais de alocação das unidades, priorizando a tabela informada"""
+        if tabela_alocacao is None:
+            return np.array([u.percentual_energia_alocada for u in unidades], dtype=float)
+
+        return np.array([
+            tabela_alocacao.percentuais.get(u.id, u.percentual_energia_alocada) for u in unidades
+        ], dtype=float)
+
+    def _montar_resumo_mes(self, mes: int, geracao_real: float, consumo_total: float,
+                           tarifas_minimas: float) -> Dict:
+        """Monta o resumo de créditos do mês"""
+        # Créditos disponíveis (geração - tarifas mínimas)
+        creditos_disponiveis = max(0, geracao_real - tarifas_minimas)
+
+        # Créditos utilizados (menor entre consumo e disponível)
+        creditos_utilizados = min(consumo_total, creditos_disponiveis)
+
+        # Créditos restantes
+        creditos_restantes = creditos_disponiveis - creditos_utilizados
+
+        return {
+            'mes': mes,
+            'geracao_real': geracao_real,
+            'consumo_total': consumo_total,
+            'tarifas_minimas': tarifas_minimas,
+            'creditos_disponiveis': creditos_disponiveis,
+            'creditos_utilizados': creditos_utilizados,
+            'creditos_restantes': creditos_restantes,
+            'eficiencia': self.sistema.configuracao.eficiencia_sistema * 100,
+            'status': 'SOBRA' if creditos_restantes > 0 else 'EQUILIBRIO' if creditos_restantes == 0 else 'DEFICIT'
+        }
+
+    @staticmethod
+    def _percentuais(valores: np.ndarray, total: float) -> List[float]:
+        """Percentual de cada valor sobre o total (zeros se o total não for positivo)"""
+        if total <= 0:
+            return [0] * len(valores)
+        return np.round(valores / total * 100, 1).tolist()
+
+    @staticmethod
+    def _calcular_valores_unidades(creditos_recebidos: np.ndarray, consumo_liquido: np.ndarray,
+                                   tarifas_minimas: np.ndarray) -> Dict[str, np.ndarray]:
+        """Valor a pagar e valor final (unidades × 12) a partir dos créditos recebidos"""
+        # Valor que sobra para pagar (consumo - créditos recebidos)
+        valor_a_pagar = np.maximum(0.0, consumo_liquido - creditos_recebidos)
+
+        # Valor final (tarifa mínima + valor a pagar)
+        valor_final = tarifas_minimas[:, np.newaxis] + valor_a_pagar
+
+        return {
+            'creditos_recebidos': creditos_recebidos,
+            'valor_a_pagar': valor_a_pagar,
+            'valor_final': valor_final
+        }
+
+    def _formatar_distribuicao_mes(self, matrizes: Dict, mes: int) -> Dict:
+        """
+        Monta o dicionário de distribuição de um mês a partir das matrizes
+
+        'proporcao' é a participação (%) da unidade no consumo líquido do mês,
+        como no cálculo original; 'participacao_creditos' é a parcela (%) dos
+        créditos disponíveis que a unidade recebeu pelo método usado.
+        """
+        indice = mes - 1
+        creditos_disponiveis = float(matrizes['creditos_disponiveis'][indice])
+        creditos_mes = matrizes['creditos_recebidos'][:, indice]
+        consumo_liquido_mes = matrizes['consumo_liquido'][:, indice]
+
+        creditos_recebidos, valor_a_pagar, valor_final = (
+            np.round(matrizes[chave][:, indice], 2).tolist()
+            for chave in ('creditos_recebidos', 'valor_a_pagar', 'valor_final')
+        )
+        proporcoes = self._percentuais(consumo_liquido_mes, float(consumo_liquido_mes.sum()))
+        participacoes = self._percentuais(creditos_mes, creditos_disponiveis)
+
+        consumo_bruto = matrizes['consumo_bruto'][:, indice].tolist()
+        consumo_liquido = matrizes['consumo_liquido'][:, indice].tolist()
+        tarifas_minimas = matrizes['tarifas_minimas'].tolist()
+
+        distribuicao = {}
+        for i, unidade in enumerate(matrizes['unidades']):
+            distribuicao[unidade.id] = {
+                'nome': unidade.nome,
+                'tipo_ligacao': unidade.tipo_ligacao.value,
+                'consumo_bruto': consumo_bruto[i],
+                'tarifa_minima': tarifas_minimas[i],
+                'consumo_liquido': consumo_liquido[i],
+                'creditos_recebidos': creditos_recebidos[i],
+                'valor_a_pagar': valor_a_pagar[i],
+                'valor_final': valor_final[i],
+                'proporcao': proporcoes[i],
+                'participacao_creditos': participacoes[i]
+            }
+
+        return {
+            'mes': mes,
+            'resumo': self._montar_resumo_mes(mes, float(matrizes['geracao'][indice]),
+                                              float(matrizes['consumo_bruto'][:, indice].sum()),
+                                              float(matrizes['tarifas_minimas'].sum())),
+            'distribuicao': distribuicao,
+            'metodo': matrizes['metodo']
+        }
+
     def gerar_relatorio_texto_creditos(self, ano: int = 2025) -> str:
         """Gera relatório em texto dos créditos"""
         relatorio = self.obter_relatorio_creditos_completo(ano)
@@ -2,6 +2,7 @@
 Calculadora de energia solar - Versão adaptada com funcionalidades legacy
 """
 
+from dataclasses import replace
 from typing import List, Dict, Tuple
 import math
 from datetime import datetime, timedelta
@@ -11,36 +12,40 @@ from nucleo.modelos import (
     ResultadoMensalEnergia, ResultadoAnualEnergia, TipoLigacao
 )
 from nucleo.excecoes import ErroCalculoEnergia
+from negocio.motor_energia import (
+    MotorEnergia, calcular_vetor_geracao_real, dias_por_mes
+)
+from negocio.livro_creditos import LivroCreditos
+from negocio.contexto_calculo import ContextoCalculo, obter_contexto
+from negocio.projecao_creditos import ProjecaoCreditos, projetar_creditos
 
 
 class CalculadoraEnergia:
     """Calculadora principal para cálculos energéticos"""
 
-    def __init__(self, sistema: SistemaEnergia):
+    def __init__(self, sistema: SistemaEnergia, contexto: ContextoCalculo = None):
         self.sistema = sistema
         self.config = sistema.configuracao
+        self.contexto = contexto if contexto is not None else obter_contexto(sistema)
+
+    def criar_motor(self) -> MotorEnergia:
+        """Snapshot vetorizado do estado atual do sistema (compartilhado pelo contexto)"""
+        return self.contexto.obter('motor', lambda: MotorEnergia(self.sistema))
+
+    @staticmethod
+    def _validar_mes(mes: int):
+        """Valida se o mês está entre 1 e 12"""
+        if not (1 <= mes <= 12):
+            raise ErroCalculoEnergia(f"Mês inválido: {mes}")
 
     def calcular_geracao_mensal_real(self, mes: int, ano: int = None) -> float:
         """
         Calcula geração real mensal considerando fatores do sistema legacy
+        (eficiência, perdas e fator de simultaneidade)
         """
         try:
-            if not (1 <= mes <= 12):
-                raise ErroCalculoEnergia(f"Mês inválido: {mes}")
-
-            # Geração base do mês (índice 0-11)
-            geracao_base = self.config.geracao_mensal_kwh[mes - 1]
-
-            # Aplicar eficiência do sistema
-            geracao_com_eficiencia = geracao_base * self.config.eficiencia_sistema
-
-            # Aplicar perdas do sistema (do sistema legacy)
-            geracao_com_perdas = geracao_com_eficiencia * (1 - self.config.perdas_sistema)
-
-            # Aplicar fator de simultaneidade (do sistema legacy)
-            geracao_final = geracao_com_perdas * self.config.fator_simultaneidade
-
-            return max(0.0, geracao_final)
+            self._validar_mes(mes)
+            return float(calcular_vetor_geracao_real(self.config)[mes - 1])
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular geração mensal: {e}")
@@ -50,18 +55,8 @@ class CalculadoraEnergia:
         Calcula consumo total mensal de todas as unidades ativas
         """
         try:
-            if not (1 <= mes <= 12):
-                raise ErroCalculoEnergia(f"Mês inválido: {mes}")
-
-            consumo_total = 0.0
-            unidades_ativas = self.sistema.get_unidades_ativas()
-
-            for unidade in unidades_ativas:
-                # Consumo do mês (índice 0-11)
-                consumo_unidade = unidade.consumo_mensal_kwh[mes - 1]
-                consumo_total += consumo_unidade
-
-            return consumo_total
+            self._validar_mes(mes)
+            return float(self.criar_motor().consumo_total[mes - 1])
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular consumo total: {e}")
@@ -72,14 +67,7 @@ class CalculadoraEnergia:
         Funcionalidade do sistema legacy
         """
         try:
-            consumo_minimo_total = 0.0
-            unidades_ativas = self.sistema.get_unidades_ativas()
-
-            for unidade in unidades_ativas:
-                taxa_disponibilidade = unidade.get_taxa_disponibilidade()
-                consumo_minimo_total += taxa_disponibilidade
-
-            return consumo_minimo_total
+            return float(self.sistema.get_taxa_disponibilidade_total())
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular consumo mínimo: {e}")
@@ -90,23 +78,15 @@ class CalculadoraEnergia:
         Retorna: (saldo_kwh, energia_injetada, energia_consumida_rede)
         """
         try:
-            geracao = self.calcular_geracao_mensal_real(mes, ano)
-            consumo = self.calcular_consumo_total_mensal(mes)
-            consumo_minimo = self.calcular_consumo_minimo_mensal(mes)
-
-            # Consumo efetivo (maior entre consumo real e mínimo)
-            consumo_efetivo = max(consumo, consumo_minimo)
-
-            # Saldo energético
-            saldo = geracao - consumo_efetivo
-
-            # Energia injetada na rede (quando há excesso)
-            energia_injetada = max(0.0, saldo) * self.config.percentual_injecao_rede
-
-            # Energia consumida da rede (quando há déficit)
-            energia_consumida_rede = max(0.0, -saldo)
-
-            return saldo, energia_injetada, energia_consumida_rede
+            self._validar_mes(mes)
+            motor = self.criar_motor()
+            i = mes - 1
+
+            return (
+                float(motor.saldo[i]),
+                float(motor.energia_injetada[i]),
+                float(motor.energia_consumida_rede[i])
+            )
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular saldo energético: {e}")
@@ -117,23 +97,16 @@ class CalculadoraEnergia:
         Funcionalidade do sistema legacy
         """
         try:
-            geracao_real = self.calcular_geracao_mensal_real(mes, ano)
-
-            # Dias no mês
-            if ano:
-                import calendar
-                dias_mes = calendar.monthrange(ano, mes)[1]
-            else:
-                dias_mes = 30  # Aproximação
+            self._validar_mes(mes)
+            geracao_real = calcular_vetor_geracao_real(self.config)[mes - 1]
 
             # Geração máxima teórica (24h por dia)
             geracao_maxima_teorica = (
-                    self.config.potencia_instalada_kw * 24 * dias_mes
+                    self.config.potencia_instalada_kw * 24 * dias_por_mes(ano)[mes - 1]
             )
 
             if geracao_maxima_teorica > 0:
-                fator_capacidade = geracao_real / geracao_maxima_teorica
-                return min(1.0, fator_capacidade)
+                return float(min(1.0, geracao_real / geracao_maxima_teorica))
 
             return 0.0
 
@@ -146,12 +119,12 @@ class CalculadoraEnergia:
         Funcionalidade do sistema legacy
         """
         try:
+            self._validar_mes(mes)
             geracao_teorica = self.config.geracao_mensal_kwh[mes - 1]
-            geracao_real = self.calcular_geracao_mensal_real(mes, ano)
+            geracao_real = calcular_vetor_geracao_real(self.config)[mes - 1]
 
             if geracao_teorica > 0:
-                eficiencia_real = geracao_real / geracao_teorica
-                return min(1.0, eficiencia_real)
+                return float(min(1.0, geracao_real / geracao_teorica))
 
             return 0.0
 
@@ -164,11 +137,11 @@ class CalculadoraEnergia:
         Funcionalidade do sistema legacy
         """
         try:
+            self._validar_mes(mes)
             geracao_teorica = self.config.geracao_mensal_kwh[mes - 1]
-            geracao_real = self.calcular_geracao_mensal_real(mes, ano)
+            geracao_real = calcular_vetor_geracao_real(self.config)[mes - 1]
 
-            perdas_kwh = max(0.0, geracao_teorica - geracao_real)
-            return perdas_kwh
+            return float(max(0.0, geracao_teorica - geracao_real))
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular perdas: {e}")
@@ -178,32 +151,12 @@ class CalculadoraEnergia:
         Calcula resultado energético completo para um mês
         """
         try:
-            geracao = self.calcular_geracao_mensal_real(mes, ano)
-            consumo_total = self.calcular_consumo_total_mensal(mes)
-            saldo, energia_injetada, energia_consumida_rede = self.calcular_saldo_energetico_mensal(mes, ano)
-
-            # Cálculos adicionais do sistema legacy
-            fator_capacidade_real = self.calcular_fator_capacidade_real(mes, ano)
-            eficiencia_real = self.calcular_eficiencia_real_sistema(mes, ano)
-            perdas_kwh = self.calcular_perdas_sistema_kwh(mes, ano)
-
-            # Créditos (simplificado - será expandido na próxima fase)
-            creditos_gerados = max(0.0, saldo)
-            creditos_utilizados = 0.0  # Será calculado pelo gerenciador de distribuição
-
-            return ResultadoMensalEnergia(
-                mes=mes,
-                geracao_kwh=geracao,
-                consumo_total_kwh=consumo_total,
-                saldo_kwh=saldo,
-                creditos_gerados_kwh=creditos_gerados,
-                creditos_utilizados_kwh=creditos_utilizados,
-                energia_injetada_kwh=energia_injetada,
-                energia_consumida_rede_kwh=energia_consumida_rede,
-                fator_capacidade_real=fator_capacidade_real,
-                eficiencia_real=eficiencia_real,
-                perdas_kwh=perdas_kwh
+            self._validar_mes(mes)
+            resultados = self.contexto.obter(
+                ('resultados_mensais_energia', ano),
+                lambda: self.criar_motor().calcular_resultados_mensais(ano)
             )
+            return replace(resultados[mes - 1])
 
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular resultado mensal: {e}")
@@ -211,71 +164,65 @@ class CalculadoraEnergia:
     def calcular_resultado_anual_energia(self, ano: int = None) -> ResultadoAnualEnergia:
         """
         Calcula resultado energético anual completo
+        Todos os meses são derivados de um único motor vetorizado
         """
         try:
             if ano is None:
                 ano = datetime.now().year
 
-            resultados_mensais = []
-            geracao_total = 0.0
-            consumo_total = 0.0
-            creditos_acumulados = 0.0
-            perdas_totais = 0.0
+            return self.contexto.obter(
+                ('resultado_anual_energia', ano),
+                lambda: self.criar_motor().calcular_resultado_anual(ano),
+                copiar=True
+            )
 
-            # Calcular para cada mês
-            for mes in range(1, 13):
-                resultado_mensal = self.calcular_resultado_mensal_energia(mes, ano)
-                resultados_mensais.append(resultado_mensal)
+        except Exception as e:
+            raise ErroCalculoEnergia(f"Erro ao calcular resultado anual: {e}")
 
-                geracao_total += resultado_mensal.geracao_kwh
-                consumo_total += resultado_mensal.consumo_total_kwh
-                creditos_acumulados += resultado_mensal.creditos_gerados_kwh
-                perdas_totais += resultado_mensal.perdas_kwh
+    def calcular_projecao_creditos(self, anos: int = 25, ano_inicial: int = None) -> ProjecaoCreditos:
+        """
+        Projeta a rolagem de créditos mês a mês no horizonte informado
+        Aplica a validade exata em meses e a degradação anual dos painéis;
+        o histórico de créditos do sistema é usado como saldo inicial e não é alterado
+        """
+        try:
+            if anos < 1:
+                raise ErroCalculoEnergia(f"Horizonte de projeção inválido: {anos}")
+            if ano_inicial is None:
+                ano_inicial = datetime.now().year
 
-            # Saldo anual
-            saldo_anual = geracao_total - consumo_total
+            calculadora_solar = CalculadoraEnergiaSolar(self.sistema)
+            fatores = [calculadora_solar.calcular_degradacao_anual(ano_inicial + i) for i in range(anos)]
 
-            # Autossuficiência percentual
-            if consumo_total > 0:
-                autossuficiencia = min(100.0, (geracao_total / consumo_total) * 100)
-            else:
-                autossuficiencia = 0.0
-
-            # Métricas médias do sistema legacy
-            fatores_capacidade = [r.fator_capacidade_real for r in resultados_mensais]
-            fator_capacidade_medio = sum(fatores_capacidade) / len(fatores_capacidade)
-
-            eficiencias = [r.eficiencia_real for r in resultados_mensais]
-            eficiencia_media = sum(eficiencias) / len(eficiencias)
-
-            return ResultadoAnualEnergia(
-                ano=ano,
-                geracao_total_kwh=geracao_total,
-                consumo_total_kwh=consumo_total,
-                saldo_anual_kwh=saldo_anual,
-                creditos_acumulados_kwh=creditos_acumulados,
-                autossuficiencia_percentual=autossuficiencia,
-                resultados_mensais=resultados_mensais,
-                fator_capacidade_medio=fator_capacidade_medio,
-                eficiencia_media=eficiencia_media,
-                perdas_totais_kwh=perdas_totais
-            )
+            livro = LivroCreditos(self.sistema.historico_creditos, self.config.validade_creditos_meses)
+
+            return projetar_creditos(self.criar_motor(), fatores, ano_inicial, livro)
 
         except Exception as e:
-            raise ErroCalculoEnergia(f"Erro ao calcular resultado anual: {e}")
+            raise ErroCalculoEnergia(f"Erro ao projetar créditos: {e}")
 
     def calcular_projecao_multiplos_anos(self, anos: int = 5) -> List[ResultadoAnualEnergia]:
         """
         Calcula projeção para múltiplos anos
-        Funcionalidade do sistema legacy
+        Funcionalidade do sistema legacy, com degradação e créditos utilizados/vencidos por mês
         """
         try:
             ano_inicial = datetime.now().year
+            motor = self.criar_motor()
+            projecao = self.calcular_projecao_creditos(anos, ano_inicial)
+
+            utilizados_por_ano = projecao.por_ano(projecao.creditos_utilizados_kwh).tolist()
+            expirados_por_ano = projecao.por_ano(projecao.creditos_expirados_kwh).tolist()
+
             resultados = []
+            for i, fator in enumerate(projecao.fatores_degradacao.tolist()):
+                resultado_anual = motor.aplicar_fator_geracao(fator).calcular_resultado_anual(ano_inicial + i)
+
+                for resultado_mensal, utilizados, expirados in zip(
+                        resultado_anual.resultados_mensais, utilizados_por_ano[i], expirados_por_ano[i]):
+                    resultado_mensal.creditos_utilizados_kwh = utilizados
+                    resultado_mensal.creditos_expirados_kwh = expirados
 
-            for i in range(anos):
-                ano = ano_inicial + i
-                resultado_anual = self.calcular_resultado_anual_energia(ano)
                 resultados.append(resultado_anual)
 
             return resultados
@@ -283,6 +230,23 @@ class CalculadoraEnergia:
         except Exception as e:
             raise ErroCalculoEnergia(f"Erro ao calcular projeção: {e}")
 
+    def simular_horario(self, anos: int = 1, perfis_carga=None, potencia_inversor_kw: float = None,
+                        usar_float32: bool = False) -> List[ResultadoAnualEnergia]:
+        """
+        Simulação horária (8760 h/ano) agregada em resultados mensais
+        Considera o momento do autoconsumo e o corte do inversor; ver SimuladorHorario
+        """
+        from negocio.simulacao_horaria import SimuladorHorario
+
+        try:
+            simulador = SimuladorHorario(self.sistema, usar_float32)
+            simulacao = simulador.simular(anos, perfis_carga=perfis_carga,
+                                          potencia_inversor_kw=potencia_inversor_kw)
+            return simulador.montar_resultados_anuais(simulacao)
+
+        except Exception as e:
+            raise ErroCalculoEnergia(f"Erro na simulação horária: {e}")
+
     def calcular_metricas_performance(self) -> Dict[str, float]:
         """
         Calcula métricas de performance do sistema
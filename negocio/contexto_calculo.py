@@ -0,0 +1,150 @@
+"""
+Contexto compartilhado de cálculos
+Memoiza motor e resultados por sistema, invalidando o cache quando a impressão
+digital (configuração + unidades ativas + créditos) muda
+"""
+
+import copy
+import weakref
+from dataclasses import fields
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, HistoricoCreditos
+
+
+def _congelar(valor: Any) -> Hashable:
+    """Converte listas/enums em valores hasheáveis"""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    return valor
+
+
+def calcular_impressao_configuracao(config: ConfiguracaoSistema) -> int:
+    """Impressão digital dos campos da configuração"""
+    return hash(tuple(_congelar(getattr(config, campo.name)) for campo in fields(config)))
+
+
+def calcular_impressao_creditos(historico: List[HistoricoCreditos]) -> int:
+    """
+    Impressão digital do histórico de créditos: lista e, de cada lote, os campos
+    que afetam os cálculos (vencimento, saldo e situação)
+    """
+    return hash((id(historico), tuple(
+        (c.ano_vencimento, c.mes_vencimento, c.creditos_restantes_kwh, c.ativo) for c in historico
+    )))
+
+
+def calcular_impressao_digital(sistema: SistemaEnergia) -> int:
+    """
+    Impressão digital do que influencia os cálculos: configuração, unidades ativas
+    (consumo, ligação e alocação) e estado do histórico de créditos
+
+    Se o sistema estiver com rastreamento ativo, usa o contador de versão.
+    """
+    # O histórico não é rastreado: seus lotes são conferidos um a um
+    creditos = calcular_impressao_creditos(sistema.historico_creditos)
+
+    if sistema.rastreamento_ativo:
+        # Com rastreamento, a versão substitui a varredura de configuração e unidades
+        return hash((id(sistema), sistema.versao, creditos))
+
+    unidades = tuple(
+        (u.id, u.tipo_ligacao.value, u.tipo_unidade.value, tuple(u.consumo_mensal_kwh),
+         u.percentual_energia_alocada, u.prioridade_distribuicao)
+        for u in sistema.get_unidades_ativas()
+    )
+
+    return hash((calcular_impressao_configuracao(sistema.configuracao), unidades, creditos))
+
+
+class ContextoCalculo:
+    """
+    Cache de cálculos de um SistemaEnergia
+
+    Os consumidores (calculadoras, relatórios, gráficos) pedem valores por chave
+    e informam como calculá-los; o valor é reaproveitado enquanto a impressão
+    digital do sistema não mudar. Os objetos retornados são compartilhados e não
+    devem ser alterados: obter(copiar=True) devolve uma cópia própria.
+
+    Sem rastreamento no sistema, cada obter() recalcula a impressão digital sobre
+    todas as unidades ativas; o contexto compartilhado (obter_contexto) liga o
+    rastreamento para que a validação custe só a leitura da versão.
+    """
+
+    def __init__(self, sistema: SistemaEnergia):
+        # Referência fraca: o contexto não deve manter o sistema vivo
+        self._sistema = weakref.ref(sistema)
+        self._cache: Dict[Hashable, Any] = {}
+        self._impressao = None
+        self.acertos = 0
+        self.falhas = 0
+
+    @property
+    def sistema(self) -> SistemaEnergia:
+        """Sistema associado"""
+        return self._sistema()
+
+    def impressao_digital(self) -> int:
+        """Impressão digital atual do sistema"""
+        return calcular_impressao_digital(self.sistema)
+
+    def obter(self, chave: Hashable, calcular: Callable[[], Any], copiar: bool = False) -> Any:
+        """
+        Retorna o valor da chave, calculando-o apenas se não estiver em cache.
+        Com copiar=True retorna uma cópia que pode ser alterada livremente.
+        """
+        self._validar()
+
+        if chave in self._cache:
+            self.acertos += 1
+            valor = self._cache[chave]
+        else:
+            self.falhas += 1
+            valor = calcular()
+            self._cache[chave] = valor
+
+        return copy.deepcopy(valor) if copiar else valor
+
+    def invalidar(self):
+        """Descarta todos os valores em cache"""
+        self._cache.clear()
+        self._impressao = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    # Métodos auxiliares privados
+
+    def _validar(self):
+        """Limpa o cache se o sistema mudou desde o último acesso"""
+        impressao = self.impressao_digital()
+        if impressao != self._impressao:
+            self._cache.clear()
+            self._impressao = impressao
+
+
+# Um contexto por instância de SistemaEnergia (dataclasses não são hasheáveis)
+_contextos: Dict[int, ContextoCalculo] = {}
+
+
+def obter_contexto(sistema: SistemaEnergia) -> ContextoCalculo:
+    """
+    Contexto compartilhado do sistema, criado no primeiro uso
+    Liga o rastreamento de alterações do sistema (idempotente), que passa a
+    validar o cache pela versão em vez de varrer as unidades
+    """
+    chave = id(sistema)
+    contexto = _contextos.get(chave)
+    sistema.ativar_rastreamento()
+
+    if contexto is None or contexto.sistema is not sistema:
+        contexto = ContextoCalculo(sistema)
+        _contextos[chave] = contexto
+        weakref.finalize(sistema, _contextos.pop, chave, None)
+
+    return contexto
@@ -0,0 +1,146 @@
+"""
+Estratégias de distribuição de créditos entre unidades
+Cada estratégia é um kernel vetorizado sobre a matriz unidades × meses
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from nucleo.excecoes import ErroCreditos
+
+
+@dataclass
+class EntradaDistribuicao:
+    """
+    Dados de entrada das estratégias
+
+    Matrizes com forma (unidades × meses); vetores por unidade com forma (unidades,)
+    e vetores por mês com forma (meses,).
+    """
+    creditos_disponiveis: np.ndarray  # (meses,)
+    consumo_liquido: np.ndarray       # (unidades × meses)
+    percentual_alocado: np.ndarray    # (unidades,) em %
+    prioridade: np.ndarray            # (unidades,) 1 = maior prioridade
+    limites_kwh: np.ndarray           # (unidades × meses), np.inf quando sem limite
+
+
+EstrategiaDistribuicao = Callable[[EntradaDistribuicao], np.ndarray]
+
+
+def distribuir_com_limite(disponivel: np.ndarray, pesos: np.ndarray, limites: np.ndarray) -> np.ndarray:
+    """
+    Water-filling: distribui cada coluna proporcionalmente aos pesos sem exceder os limites
+
+    A sobra de quem atinge o limite é redistribuída entre os demais. Para cada mês
+    encontra o nível λ tal que Σ min(limite, λ·peso) = disponível, ordenando as
+    razões limite/peso (O(unidades·log unidades) por mês).
+    """
+    pesos = np.where(limites > 0, np.maximum(pesos, 0.0), 0.0)
+    limites = np.where(pesos > 0, limites, 0.0)
+    if pesos.shape[0] == 0:
+        return np.zeros_like(pesos)
+
+    razoes = np.divide(limites, pesos, out=np.full(pesos.shape, np.inf), where=pesos > 0)
+    ordem = np.argsort(razoes, axis=0)
+    razoes_ord = np.take_along_axis(razoes, ordem, axis=0)
+    limites_ord = np.take_along_axis(limites, ordem, axis=0)
+    pesos_ord = np.take_along_axis(pesos, ordem, axis=0)
+
+    # Antes do k-ésimo ponto de quebra: k unidades saturadas e as demais em λ·peso
+    limites_saturados = np.zeros_like(limites_ord)
+    np.cumsum(limites_ord[:-1], axis=0, out=limites_saturados[1:])
+    pesos_restantes = np.cumsum(pesos_ord[::-1], axis=0)[::-1]
+    with np.errstate(invalid='ignore'):
+        preenchido = np.where(pesos_ord > 0,
+                              limites_saturados + razoes_ord * pesos_restantes,
+                              -np.inf)
+
+    atingido = preenchido >= disponivel[np.newaxis, :]
+    tem_nivel = atingido.any(axis=0)
+    k = np.argmax(atingido, axis=0)
+
+    colunas = np.arange(pesos.shape[1])
+    restante = disponivel - limites_saturados[k, colunas]
+    peso_k = pesos_restantes[k, colunas]
+    nivel = np.divide(restante, peso_k, out=np.zeros_like(restante), where=peso_k > 0)
+    nivel = np.where(tem_nivel, np.maximum(nivel, 0.0), np.inf)
+
+    with np.errstate(invalid='ignore'):
+        alocacao = np.minimum(limites, nivel[np.newaxis, :] * pesos)
+    return np.nan_to_num(alocacao, nan=0.0, posinf=0.0)
+
+
+def distribuir_proporcional(entrada: EntradaDistribuicao) -> np.ndarray:
+    """Proporcional ao consumo líquido (consumo - tarifa mínima) de cada mês"""
+    total = entrada.consumo_liquido.sum(axis=0)
+    proporcoes = np.divide(entrada.consumo_liquido, total,
+                           out=np.zeros_like(entrada.consumo_liquido), where=total > 0)
+    return proporcoes * entrada.creditos_disponiveis[np.newaxis, :]
+
+
+def distribuir_percentual_fixo(entrada: EntradaDistribuicao) -> np.ndarray:
+    """Percentual fixo da unidade (percentual_energia_alocada) sobre os créditos do mês"""
+    proporcoes = np.maximum(entrada.percentual_alocado, 0.0) / 100
+    return proporcoes[:, np.newaxis] * entrada.creditos_disponiveis[np.newaxis, :]
+
+
+def distribuir_por_prioridade(entrada: EntradaDistribuicao) -> np.ndarray:
+    """
+    Cascata por prioridade_distribuicao: cada unidade recebe até seu consumo
+    líquido (e limite) antes de a próxima prioridade receber algo
+    """
+    demanda = np.minimum(entrada.consumo_liquido, entrada.limites_kwh)
+    ordem = np.argsort(entrada.prioridade, kind='stable')
+
+    demanda_ord = demanda[ordem]
+    demanda_anterior = np.cumsum(demanda_ord, axis=0) - demanda_ord
+    alocacao_ord = np.clip(entrada.creditos_disponiveis[np.newaxis, :] - demanda_anterior, 0.0, demanda_ord)
+
+    alocacao = np.empty_like(alocacao_ord)
+    alocacao[ordem] = alocacao_ord
+    return alocacao
+
+
+def distribuir_limitado(entrada: EntradaDistribuicao) -> np.ndarray:
+    """
+    Percentual alocado limitado ao consumo líquido (e ao limite informado),
+    redistribuindo a sobra entre as demais unidades
+    Sem percentuais configurados, usa o consumo líquido como peso
+    """
+    pesos = np.broadcast_to(entrada.percentual_alocado[:, np.newaxis], entrada.consumo_liquido.shape)
+    if not np.any(entrada.percentual_alocado > 0):
+        pesos = entrada.consumo_liquido
+
+    limites = np.minimum(entrada.consumo_liquido, entrada.limites_kwh)
+    return distribuir_com_limite(entrada.creditos_disponiveis, pesos, limites)
+
+
+ESTRATEGIAS_DISTRIBUICAO: Dict[str, EstrategiaDistribuicao] = {
+    'proporcional': distribuir_proporcional,
+    'percentual_fixo': distribuir_percentual_fixo,
+    'prioridade': distribuir_por_prioridade,
+    'limitado': distribuir_limitado
+}
+
+
+def registrar_estrategia(nome: str, estrategia: EstrategiaDistribuicao):
+    """Registra (ou substitui) uma estratégia de distribuição"""
+    ESTRATEGIAS_DISTRIBUICAO[nome] = estrategia
+
+
+def listar_estrategias() -> List[str]:
+    """Nomes das estratégias disponíveis"""
+    return list(ESTRATEGIAS_DISTRIBUICAO)
+
+
+def obter_estrategia(nome: str) -> EstrategiaDistribuicao:
+    """Retorna a estratégia registrada com o nome informado"""
+    try:
+        return ESTRATEGIAS_DISTRIBUICAO[nome]
+    except KeyError:
+        raise ErroCreditos(
+            f"Método de distribuição desconhecido: {nome} "
+            f"(disponíveis: {', '.join(listar_estrategias())})"
+        )
@@ -0,0 +1,170 @@
+"""
+Pipeline financeiro vetorizado - Fluxo de caixa anual em passagem única
+Calcula os vetores financeiros mensais uma vez e deriva payback, ROI e TIR deles
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from nucleo.modelos import ConfiguracaoSistema, BandeiraTarifaria
+from negocio.motor_energia import MotorEnergia, MESES_ANO
+from negocio.livro_creditos import LivroCreditos, simular_creditos
+
+# Aproximação de PIS/COFINS/ICMS usada em todo o sistema
+ALIQUOTA_IMPOSTOS = 0.25
+
+
+def calcular_adicional_bandeira(config: ConfiguracaoSistema, bandeira: BandeiraTarifaria) -> float:
+    """Retorna o adicional (R$/kWh) da bandeira tarifária"""
+    adicionais = {
+        BandeiraTarifaria.VERDE: 0.0,
+        BandeiraTarifaria.AMARELA: config.adicional_bandeira_amarela,
+        BandeiraTarifaria.VERMELHA_1: config.adicional_bandeira_vermelha_1,
+        BandeiraTarifaria.VERMELHA_2: config.adicional_bandeira_vermelha_2,
+        BandeiraTarifaria.ESCASSEZ: config.adicional_bandeira_escassez
+    }
+    return adicionais.get(bandeira, 0.0)
+
+
+def calcular_custos_rede(consumo_kwh: np.ndarray, config: ConfiguracaoSistema,
+                         taxa_disponibilidade: float, bandeira: BandeiraTarifaria) -> Dict[str, np.ndarray]:
+    """
+    Versão vetorizada de GerenciadorDistribuicao.calcular_custo_energia_sem_solar
+    Aceita um vetor de consumos e devolve um vetor por componente de custo
+    """
+    consumo_kwh = np.asarray(consumo_kwh, dtype=float)
+    adicional_bandeira = calcular_adicional_bandeira(config, bandeira)
+
+    custo_energia = consumo_kwh * (config.tarifa_energia_kwh + adicional_bandeira)
+    custo_tusd = consumo_kwh * config.tarifa_tusd_kwh
+    custo_te = consumo_kwh * config.tarifa_te_kwh
+    impostos = (custo_energia + custo_tusd + custo_te) * ALIQUOTA_IMPOSTOS
+
+    custo_total = np.maximum(custo_energia + custo_tusd + custo_te + impostos, taxa_disponibilidade)
+
+    return {
+        'custo_energia': custo_energia,
+        'custo_tusd': custo_tusd,
+        'custo_te': custo_te,
+        'impostos': impostos,
+        'adicional_bandeira': consumo_kwh * adicional_bandeira,
+        'custo_total': custo_total
+    }
+
+
+def calcular_tarifa_credito(config: ConfiguracaoSistema) -> float:
+    """Tarifa (R$/kWh) usada para valorar créditos de energia"""
+    return (config.tarifa_tusd_kwh + config.tarifa_te_kwh
+            + calcular_adicional_bandeira(config, config.bandeira_atual))
+
+
+def calcular_fatores_degradacao(anos_analise: int) -> np.ndarray:
+    """
+    Fatores de degradação aplicados à economia anual
+    2.5% no primeiro ano, 0.5% ao ano depois, mínimo de 70%
+    """
+    return np.maximum(0.7, 0.975 - 0.005 * np.arange(anos_analise))
+
+
+def simular_utilizacao_creditos(creditos_gerados: np.ndarray, consumo_rede: np.ndarray,
+                                livro: LivroCreditos, ano: int) -> np.ndarray:
+    """
+    Simula geração/uso de créditos ao longo dos 12 meses sem alterar o histórico
+    Retorna o vetor de créditos utilizados em cada mês.
+    """
+    _, movimentos = simular_creditos(livro, zip(
+        range(1, MESES_ANO + 1), [ano] * MESES_ANO,
+        creditos_gerados.tolist(), consumo_rede.tolist()
+    ))
+    return np.array([m.creditos_utilizados_kwh for m in movimentos])
+
+
+@dataclass
+class FluxoFinanceiroAnual:
+    """Vetores financeiros mensais (12 posições) de um ano"""
+    ano: int
+    consumo_kwh: np.ndarray
+    custo_sem_solar: np.ndarray
+    custo_com_solar: np.ndarray
+    economia: np.ndarray
+    creditos_gerados_kwh: np.ndarray
+    creditos_utilizados_kwh: np.ndarray
+    valor_creditos_gerados: np.ndarray
+    valor_creditos_utilizados: np.ndarray
+    valor_bandeira: np.ndarray
+    impostos: np.ndarray
+    taxa_disponibilidade: float
+
+    @property
+    def economia_anual(self) -> float:
+        """Economia total do ano"""
+        return float(self.economia.sum())
+
+    def calcular_payback_simples(self, investimento: float) -> float:
+        """Payback simples em anos"""
+        if investimento <= 0:
+            return 0.0
+
+        economia_anual = self.economia_anual
+        if economia_anual <= 0:
+            return float('inf')  # Nunca se paga
+
+        return investimento / economia_anual
+
+    def calcular_economias_anuais(self, anos_analise: int) -> np.ndarray:
+        """Economia de cada ano do horizonte considerando degradação"""
+        return self.economia_anual * calcular_fatores_degradacao(anos_analise)
+
+    def calcular_roi_percentual(self, investimento: float, anos_analise: int = 25) -> float:
+        """ROI percentual no horizonte de análise"""
+        if investimento <= 0:
+            return 0.0
+
+        economia_total = float(self.calcular_economias_anuais(anos_analise).sum())
+        return ((economia_total - investimento) / investimento) * 100
+
+    def montar_fluxo_caixa(self, investimento: float, anos_analise: int = 25) -> List[float]:
+        """Fluxo de caixa anual: investimento negativo seguido das economias"""
+        return [-investimento] + self.calcular_economias_anuais(anos_analise).tolist()
+
+
+def calcular_fluxo_financeiro_anual(motor: MotorEnergia, ano: int,
+                                    livro: LivroCreditos) -> FluxoFinanceiroAnual:
+    """
+    Calcula todos os vetores financeiros mensais em uma única passagem
+    O livro de créditos é apenas lido, nunca alterado
+    """
+    config = motor.config
+    bandeira = config.bandeira_atual
+    taxa_disponibilidade = float(motor.taxas_unidades.sum())
+
+    custos_sem_solar = calcular_custos_rede(motor.consumo_total, config, taxa_disponibilidade, bandeira)
+    custos_com_solar = calcular_custos_rede(motor.energia_consumida_rede, config, taxa_disponibilidade, bandeira)
+
+    creditos_utilizados = simular_utilizacao_creditos(
+        motor.creditos_gerados, motor.energia_consumida_rede, livro, ano
+    )
+
+    tarifa_credito = calcular_tarifa_credito(config)
+    valor_creditos_gerados = motor.creditos_gerados * tarifa_credito
+    valor_creditos_utilizados = creditos_utilizados * tarifa_credito
+
+    economia = (custos_sem_solar['custo_total'] - custos_com_solar['custo_total']
+                + valor_creditos_utilizados)
+
+    return FluxoFinanceiroAnual(
+        ano=ano,
+        consumo_kwh=motor.consumo_total,
+        custo_sem_solar=custos_sem_solar['custo_total'],
+        custo_com_solar=custos_com_solar['custo_total'],
+        economia=economia,
+        creditos_gerados_kwh=motor.creditos_gerados,
+        creditos_utilizados_kwh=creditos_utilizados,
+        valor_creditos_gerados=valor_creditos_gerados,
+        valor_creditos_utilizados=valor_creditos_utilizados,
+        valor_bandeira=custos_sem_solar['adicional_bandeira'],
+        impostos=custos_sem_solar['impostos'],
+        taxa_disponibilidade=taxa_disponibilidade
+    )
@@ -7,16 +7,18 @@ from typing import Optional, List
 from nucleo.modelos import SistemaEnergia
 from negocio.calculadora_energia import CalculadoraEnergia
 from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+from negocio.contexto_calculo import ContextoCalculo, obter_contexto
 from utilitarios.formatadores import formatar_moeda, formatar_energia, formatar_percentual
 
 
 class GeradorRelatorios:
     """Gerador de relatórios do sistema - Versão Simplificada"""
 
-    def __init__(self, sistema: SistemaEnergia):
+    def __init__(self, sistema: SistemaEnergia, contexto: ContextoCalculo = None):
         self.sistema = sistema
-        self.calculadora = CalculadoraEnergia(sistema)
-        self.gerenciador = GerenciadorDistribuicao(sistema)
+        self.contexto = contexto if contexto is not None else obter_contexto(sistema)
+        self.calculadora = CalculadoraEnergia(sistema, self.contexto)
+        self.gerenciador = GerenciadorDistribuicao(sistema, self.contexto)
 
     def gerar_relatorio_completo(self, ano: Optional[int] = None) -> str:
         """
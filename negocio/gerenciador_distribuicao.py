@@ -2,26 +2,37 @@
 Gerenciador de distribuição e cálculos financeiros - Versão adaptada com funcionalidades legacy
 """
 
+from dataclasses import replace
 from typing import List, Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import math
 
 from nucleo.modelos import (
     SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora,
     ResultadoMensalFinanceiro, ResultadoAnualFinanceiro,
-    HistoricoCreditos, BandeiraTarifaria, TipoLigacao
+    BandeiraTarifaria, TipoLigacao
 )
 from nucleo.excecoes import ErroCalculoFinanceiro
 from negocio.calculadora_energia import CalculadoraEnergia
+from negocio.contexto_calculo import ContextoCalculo, obter_contexto
+from negocio.livro_creditos import (
+    LivroCreditos, MovimentoCreditosMes, processar_creditos_mes, simular_creditos
+)
+from negocio.taxa_retorno import StatusTIR, calcular_tir
+from negocio.fluxo_financeiro import (
+    FluxoFinanceiroAnual, calcular_fluxo_financeiro_anual, calcular_adicional_bandeira
+)
 
 
 class GerenciadorDistribuicao:
     """Gerenciador principal para cálculos financeiros e distribuição de energia"""
 
-    def __init__(self, sistema: SistemaEnergia):
+    def __init__(self, sistema: SistemaEnergia, contexto: ContextoCalculo = None):
         self.sistema = sistema
         self.config = sistema.configuracao
-        self.calculadora_energia = CalculadoraEnergia(sistema)
+        self.contexto = contexto if contexto is not None else obter_contexto(sistema)
+        self.calculadora_energia = CalculadoraEnergia(sistema, self.contexto)
+        self._livro_creditos = None
 
     def calcular_custo_energia_sem_solar(self, mes: int, consumo_kwh: float,
                                          bandeira: BandeiraTarifaria = None) -> Dict[str, float]:
@@ -144,6 +155,8 @@ class GerenciadorDistribuicao:
     def gerenciar_creditos_energia(self, mes: int, ano: int = None) -> Dict[str, float]:
         """
         Gerencia créditos de energia (geração, utilização, vencimento)
+        Registra a movimentação do mês em sistema.historico_creditos;
+        para apenas obter os números use simular_creditos_energia
         Funcionalidade do sistema legacy
         """
         try:
@@ -153,84 +166,88 @@ class GerenciadorDistribuicao:
             # Obter dados energéticos
             resultado_energia = self.calculadora_energia.calcular_resultado_mensal_energia(mes, ano)
 
-            # Créditos gerados no mês
-            creditos_gerados = resultado_energia.creditos_gerados_kwh
+            movimento = processar_creditos_mes(
+                self._obter_livro_creditos(), mes, ano,
+                resultado_energia.creditos_gerados_kwh,
+                resultado_energia.energia_consumida_rede_kwh
+            )
 
-            # Créditos utilizados (quando há déficit)
-            creditos_utilizados = 0.0
-            if resultado_energia.energia_consumida_rede_kwh > 0:
-                # Tentar usar créditos disponíveis antes de consumir da rede
-                creditos_disponiveis = self._obter_creditos_disponiveis(mes, ano)
-                creditos_utilizados = min(creditos_disponiveis, resultado_energia.energia_consumida_rede_kwh)
+            return self._formatar_movimento_creditos(movimento)
 
-            # Valor monetário
-            valor_creditos_gerados = self.calcular_valor_creditos_gerados(creditos_gerados, mes)
-            valor_creditos_utilizados = self.calcular_valor_creditos_gerados(creditos_utilizados, mes)
+        except Exception as e:
+            raise ErroCalculoFinanceiro(f"Erro ao gerenciar créditos: {e}")
 
-            # Atualizar histórico de créditos
-            if creditos_gerados > 0:
-                self._adicionar_credito_historico(mes, ano, creditos_gerados)
+    def simular_creditos_energia(self, meses: List[Tuple[int, int]],
+                                 livro_inicial: LivroCreditos = None) -> Tuple[LivroCreditos, List[Dict[str, float]]]:
+        """
+        Simula a movimentação de créditos sem alterar o estado persistente
 
-            if creditos_utilizados > 0:
-                self._utilizar_creditos_historico(creditos_utilizados, mes, ano)
+        Args:
+            meses: sequência de (mes, ano) a simular, em ordem cronológica
+            livro_inicial: snapshot inicial (padrão: créditos atuais do sistema)
 
-            return {
-                'creditos_gerados_kwh': creditos_gerados,
-                'creditos_utilizados_kwh': creditos_utilizados,
-                'creditos_saldo_kwh': creditos_gerados - creditos_utilizados,
-                'valor_creditos_gerados': valor_creditos_gerados,
-                'valor_creditos_utilizados': valor_creditos_utilizados,
-                'creditos_disponiveis_total': self._obter_creditos_disponiveis(mes, ano)
-            }
+        Returns:
+            Tupla (novo livro de créditos, resultados mensais)
+        """
+        try:
+            if livro_inicial is None:
+                livro_inicial = self._obter_livro_creditos()
+
+            motor = self.calculadora_energia.criar_motor()
+            creditos_gerados = motor.creditos_gerados.tolist()
+            consumo_rede = motor.energia_consumida_rede.tolist()
+
+            livro, movimentos = simular_creditos(livro_inicial, (
+                (mes, ano, creditos_gerados[mes - 1], consumo_rede[mes - 1])
+                for mes, ano in meses
+            ))
+
+            return livro, [self._formatar_movimento_creditos(m) for m in movimentos]
 
         except Exception as e:
-            raise ErroCalculoFinanceiro(f"Erro ao gerenciar créditos: {e}")
+            raise ErroCalculoFinanceiro(f"Erro ao simular créditos: {e}")
 
     def calcular_resultado_financeiro_mensal(self, mes: int, ano: int = None) -> ResultadoMensalFinanceiro:
         """
         Calcula resultado financeiro completo para um mês
+        Os créditos são simulados desde janeiro sem alterar o histórico
         """
         try:
             if ano is None:
                 ano = datetime.now().year
 
-            # Consumo total do mês
-            consumo_total = self.calculadora_energia.calcular_consumo_total_mensal(mes)
-
-            # Custo sem sistema solar
-            custo_sem_solar = self.calcular_custo_energia_sem_solar(mes, consumo_total)
+            if not (1 <= mes <= 12):
+                raise ErroCalculoFinanceiro(f"Mês inválido: {mes}")
 
-            # Custo com sistema solar
-            custo_com_solar = self.calcular_custo_energia_com_solar(mes, ano)
-
-            # Gerenciamento de créditos
-            creditos_info = self.gerenciar_creditos_energia(mes, ano)
+            resultados = self.contexto.obter(
+                ('resultados_mensais_financeiros', ano),
+                lambda: self._montar_resultados_mensais(self.calcular_fluxo_financeiro_anual(ano))
+            )
+            return replace(resultados[mes - 1])
 
-            # Economia mensal
-            economia_mensal = custo_sem_solar['custo_total'] - custo_com_solar['custo_total']
-            economia_mensal += creditos_info['valor_creditos_utilizados']  # Valor dos créditos usados
+        except Exception as e:
+            raise ErroCalculoFinanceiro(f"Erro ao calcular resultado financeiro mensal: {e}")
 
-            # Valor da energia injetada (créditos gerados)
-            valor_energia_injetada = creditos_info['valor_creditos_gerados']
+    def calcular_fluxo_financeiro_anual(self, ano: int = None) -> FluxoFinanceiroAnual:
+        """
+        Calcula os vetores financeiros mensais do ano em uma única passagem
+        Não altera o histórico de créditos do sistema
+        """
+        try:
+            if ano is None:
+                ano = datetime.now().year
 
-            return ResultadoMensalFinanceiro(
-                mes=mes,
-                custo_sem_solar=custo_sem_solar['custo_total'],
-                custo_com_solar=custo_com_solar['custo_total'],
-                economia_mensal=economia_mensal,
-                valor_energia_injetada=valor_energia_injetada,
-                valor_creditos_utilizados=creditos_info['valor_creditos_utilizados'],
-                bandeira_aplicada=self.config.bandeira_atual,
-                valor_bandeira=custo_sem_solar.get('adicional_bandeira', 0.0),
-                custo_disponibilidade=custo_com_solar['taxa_disponibilidade'],
-                custo_demanda=0.0,  # Para unidades do grupo A
-                impostos=custo_sem_solar['impostos']
+            return self.contexto.obter(
+                ('fluxo_financeiro_anual', ano),
+                lambda: calcular_fluxo_financeiro_anual(
+                    self.calculadora_energia.criar_motor(), ano, self._obter_livro_creditos()
+                )
             )
 
         except Exception as e:
-            raise ErroCalculoFinanceiro(f"Erro ao calcular resultado financeiro mensal: {e}")
+            raise ErroCalculoFinanceiro(f"Erro ao calcular fluxo financeiro: {e}")
 
-    def calcular_payback_simples(self) -> float:
+    def calcular_payback_simples(self, fluxo: FluxoFinanceiroAnual = None) -> float:
         """
         Calcula payback simples do investimento
         Funcionalidade do sistema legacy
@@ -239,23 +256,15 @@ class GerenciadorDistribuicao:
             if self.config.custo_investimento <= 0:
                 return 0.0
 
-            # Calcular economia anual
-            economia_anual = 0.0
-            for mes in range(1, 13):
-                resultado_mensal = self.calcular_resultado_financeiro_mensal(mes)
-                economia_anual += resultado_mensal.economia_mensal
-
-            if economia_anual <= 0:
-                return float('inf')  # Nunca se paga
+            if fluxo is None:
+                fluxo = self.calcular_fluxo_financeiro_anual()
 
-            payback_anos = self.config.custo_investimento / economia_anual
-
-            return payback_anos
+            return fluxo.calcular_payback_simples(self.config.custo_investimento)
 
         except Exception as e:
             raise ErroCalculoFinanceiro(f"Erro ao calcular payback: {e}")
 
-    def calcular_roi_percentual(self, anos_analise: int = 25) -> float:
+    def calcular_roi_percentual(self, anos_analise: int = 25, fluxo: FluxoFinanceiroAnual = None) -> float:
         """
         Calcula ROI (Return on Investment) percentual
         Funcionalidade do sistema legacy
@@ -264,61 +273,30 @@ class GerenciadorDistribuicao:
             if self.config.custo_investimento <= 0:
                 return 0.0
 
-            # Economia anual
-            economia_anual = 0.0
-            for mes in range(1, 13):
-                resultado_mensal = self.calcular_resultado_financeiro_mensal(mes)
-                economia_anual += resultado_mensal.economia_mensal
-
-            # Economia total no período (considerando degradação)
-            economia_total = 0.0
-            for ano in range(anos_analise):
-                # Degradação anual (0.5% ao ano após primeiro ano)
-                if ano == 0:
-                    fator_degradacao = 0.975  # 2.5% no primeiro ano
-                else:
-                    fator_degradacao = 0.975 - (ano * 0.005)
-
-                fator_degradacao = max(0.7, fator_degradacao)  # Mínimo 70%
-                economia_ano = economia_anual * fator_degradacao
-                economia_total += economia_ano
-
-            # ROI percentual
-            roi = ((economia_total - self.config.custo_investimento) / self.config.custo_investimento) * 100
+            if fluxo is None:
+                fluxo = self.calcular_fluxo_financeiro_anual()
 
-            return roi
+            return fluxo.calcular_roi_percentual(self.config.custo_investimento, anos_analise)
 
         except Exception as e:
             raise ErroCalculoFinanceiro(f"Erro ao calcular ROI: {e}")
 
-    def calcular_tir_percentual(self, anos_analise: int = 25) -> float:
+    def calcular_tir_percentual(self, anos_analise: int = 25, fluxo: FluxoFinanceiroAnual = None) -> float:
         """
         Calcula TIR (Taxa Interna de Retorno) percentual
-        Funcionalidade do sistema legacy
+        Funcionalidade do sistema legacy; use calcular_tir_lote para o status da convergência
         """
         try:
-            # Fluxo de caixa inicial (investimento negativo)
-            fluxo_caixa = [-self.config.custo_investimento]
-
-            # Economia anual para cada ano
-            economia_anual = 0.0
-            for mes in range(1, 13):
-                resultado_mensal = self.calcular_resultado_financeiro_mensal(mes)
-                economia_anual += resultado_mensal.economia_mensal
+            if fluxo is None:
+                fluxo = self.calcular_fluxo_financeiro_anual()
 
-            # Adicionar fluxos anuais
-            for ano in range(anos_analise):
-                if ano == 0:
-                    fator_degradacao = 0.975
-                else:
-                    fator_degradacao = 0.975 - (ano * 0.005)
+            fluxo_caixa = fluxo.montar_fluxo_caixa(self.config.custo_investimento, anos_analise)
 
-                fator_degradacao = max(0.7, fator_degradacao)
-                economia_ano = economia_anual * fator_degradacao
-                fluxo_caixa.append(economia_ano)
+            tir, status = calcular_tir(fluxo_caixa)
 
-            # Cálculo simplificado da TIR usando método iterativo
-            tir = self._calcular_tir_iterativo(fluxo_caixa)
+            # Sem TIR definida (ex.: sem investimento) mantém o 0% do sistema legacy
+            if status != StatusTIR.CONVERGIU:
+                return 0.0
 
             return tir * 100  # Converter para percentual
 
@@ -328,151 +306,111 @@ class GerenciadorDistribuicao:
     def calcular_resultado_financeiro_anual(self, ano: int = None) -> ResultadoAnualFinanceiro:
         """
         Calcula resultado financeiro anual completo
+        Os 12 meses são calculados uma única vez e payback, ROI e TIR são derivados deles
         """
         try:
             if ano is None:
                 ano = datetime.now().year
 
-            resultados_mensais = []
-            economia_total = 0.0
-            custo_total_sem_solar = 0.0
-            custo_total_com_solar = 0.0
-
-            # Calcular para cada mês
-            for mes in range(1, 13):
-                resultado_mensal = self.calcular_resultado_financeiro_mensal(mes, ano)
-                resultados_mensais.append(resultado_mensal)
-
-                economia_total += resultado_mensal.economia_mensal
-                custo_total_sem_solar += resultado_mensal.custo_sem_solar
-                custo_total_com_solar += resultado_mensal.custo_com_solar
-
-            # Cálculos financeiros
-            payback_simples = self.calcular_payback_simples()
-            roi_percentual = self.calcular_roi_percentual()
-            tir_percentual = self.calcular_tir_percentual()
-
-            # Economia acumulada (considerando anos anteriores)
-            economia_acumulada = economia_total  # Simplificado para um ano
-
-            return ResultadoAnualFinanceiro(
-                ano=ano,
-                economia_total=economia_total,
-                custo_total_sem_solar=custo_total_sem_solar,
-                custo_total_com_solar=custo_total_com_solar,
-                payback_simples_anos=payback_simples,
-                roi_percentual=roi_percentual,
-                resultados_mensais=resultados_mensais,
-                valor_investimento=self.config.custo_investimento,
-                economia_acumulada=economia_acumulada,
-                tir_percentual=tir_percentual
-            )
+            return self.contexto.obter(('resultado_financeiro_anual', ano),
+                                       lambda: self._calcular_resultado_financeiro_anual(ano), copiar=True)
 
         except Exception as e:
             raise ErroCalculoFinanceiro(f"Erro ao calcular resultado financeiro anual: {e}")
 
     # Métodos auxiliares privados
 
-    def _calcular_adicional_bandeira(self, bandeira: BandeiraTarifaria) -> float:
-        """Calcula adicional da bandeira tarifária"""
-        adicionais = {
-            BandeiraTarifaria.VERDE: 0.0,
-            BandeiraTarifaria.AMARELA: self.config.adicional_bandeira_amarela,
-            BandeiraTarifaria.VERMELHA_1: self.config.adicional_bandeira_vermelha_1,
-            BandeiraTarifaria.VERMELHA_2: self.config.adicional_bandeira_vermelha_2,
-            BandeiraTarifaria.ESCASSEZ: self.config.adicional_bandeira_escassez
-        }
-        return adicionais.get(bandeira, 0.0)
-
-    def _calcular_taxa_disponibilidade_total(self) -> float:
-        """Calcula taxa de disponibilidade total de todas as unidades"""
-        taxa_total = 0.0
-        for unidade in self.sistema.get_unidades_ativas():
-            taxa_total += unidade.get_taxa_disponibilidade()
-        return taxa_total
-
-    def _obter_creditos_disponiveis(self, mes: int, ano: int) -> float:
-        """Obtém créditos disponíveis considerando vencimento"""
-        creditos_disponiveis = 0.0
-        data_atual = datetime(ano, mes, 1)
-
-        for credito in self.sistema.historico_creditos:
-            if credito.ativo and credito.creditos_restantes_kwh > 0:
-                data_vencimento = datetime(credito.ano_vencimento, credito.mes_vencimento, 1)
-                if data_vencimento >= data_atual:
-                    creditos_disponiveis += credito.creditos_restantes_kwh
-
-        return creditos_disponiveis
-
-    def _adicionar_credito_historico(self, mes: int, ano: int, creditos_kwh: float):
-        """Adiciona crédito ao histórico"""
-        # Calcular vencimento (60 meses)
-        data_geracao = datetime(ano, mes, 1)
-        data_vencimento = data_geracao + timedelta(days=60 * 30)  # Aproximação
-
-        credito = HistoricoCreditos(
-            mes_geracao=mes,
-            ano_geracao=ano,
-            creditos_kwh=creditos_kwh,
-            creditos_utilizados_kwh=0.0,
-            creditos_restantes_kwh=creditos_kwh,
-            mes_vencimento=data_vencimento.month,
-            ano_vencimento=data_vencimento.year,
-            ativo=True
-        )
-
-        self.sistema.historico_creditos.append(credito)
-
-    def _utilizar_creditos_historico(self, creditos_utilizados: float, mes: int, ano: int):
-        """Utiliza créditos do histórico (FIFO - primeiro a vencer, primeiro a usar)"""
-        creditos_restantes = creditos_utilizados
-
-        # Ordenar por data de vencimento
-        creditos_ordenados = sorted(
-            [c for c in self.sistema.historico_creditos if c.ativo and c.creditos_restantes_kwh > 0],
-            key=lambda x: (x.ano_vencimento, x.mes_vencimento)
+    def _calcular_resultado_financeiro_anual(self, ano: int) -> ResultadoAnualFinanceiro:
+        """Monta o resultado financeiro anual a partir de um único fluxo"""
+        fluxo = self.calcular_fluxo_financeiro_anual(ano)
+
+        resultados_mensais = self._montar_resultados_mensais(fluxo)
+
+        economia_total = fluxo.economia_anual
+
+        return ResultadoAnualFinanceiro(
+            ano=ano,
+            economia_total=economia_total,
+            custo_total_sem_solar=float(fluxo.custo_sem_solar.sum()),
+            custo_total_com_solar=float(fluxo.custo_com_solar.sum()),
+            payback_simples_anos=self.calcular_payback_simples(fluxo),
+            roi_percentual=self.calcular_roi_percentual(fluxo=fluxo),
+            resultados_mensais=resultados_mensais,
+            valor_investimento=self.config.custo_investimento,
+            economia_acumulada=economia_total,  # Simplificado para um ano
+            tir_percentual=self.calcular_tir_percentual(fluxo=fluxo)
         )
 
-        for credito in creditos_ordenados:
-            if creditos_restantes <= 0:
-                break
-
-            utilizacao = min(credito.creditos_restantes_kwh, creditos_restantes)
-            credito.creditos_utilizados_kwh += utilizacao
-            credito.creditos_restantes_kwh -= utilizacao
-            creditos_restantes -= utilizacao
-
-            if credito.creditos_restantes_kwh <= 0:
-                credito.ativo = False
-
-    def _calcular_tir_iterativo(self, fluxo_caixa: List[float], precisao: float = 0.0001) -> float:
-        """Calcula TIR usando método iterativo (Newton-Raphson simplificado)"""
-        try:
-            # Estimativa inicial
-            taxa = 0.1  # 10%
-
-            for _ in range(100):  # Máximo 100 iterações
-                vpl = sum(fluxo / ((1 + taxa) ** i) for i, fluxo in enumerate(fluxo_caixa))
-
-                if abs(vpl) < precisao:
-                    return taxa
+    def _montar_resultados_mensais(self, fluxo: FluxoFinanceiroAnual) -> List[ResultadoMensalFinanceiro]:
+        """Converte os vetores do fluxo financeiro em resultados mensais"""
+        return [
+            ResultadoMensalFinanceiro(
+                mes=mes,
+                custo_sem_solar=custo_sem_solar,
+                custo_com_solar=custo_com_solar,
+                economia_mensal=economia,
+                valor_energia_injetada=valor_injetado,
+                valor_creditos_utilizados=valor_utilizado,
+                bandeira_aplicada=self.config.bandeira_atual,
+                valor_bandeira=valor_bandeira,
+                custo_disponibilidade=fluxo.taxa_disponibilidade,
+                custo_demanda=0.0,  # Para unidades do grupo A
+                impostos=impostos
+            )
+            for mes, (custo_sem_solar, custo_com_solar, economia, valor_injetado,
+                      valor_utilizado, valor_bandeira, impostos) in enumerate(zip(
+                fluxo.custo_sem_solar.tolist(),
+                fluxo.custo_com_solar.tolist(),
+                fluxo.economia.tolist(),
+                fluxo.valor_creditos_gerados.tolist(),
+                fluxo.valor_creditos_utilizados.tolist(),
+                fluxo.valor_bandeira.tolist(),
+                fluxo.impostos.tolist()
+            ), start=1)
+        ]
+
+    def _formatar_movimento_creditos(self, movimento: MovimentoCreditosMes) -> Dict[str, float]:
+        """Converte movimento de créditos no dicionário usado pela interface"""
+        gerados = movimento.creditos_gerados_kwh
+        utilizados = movimento.creditos_utilizados_kwh
 
-                # Derivada do VPL
-                dvpl = sum(-i * fluxo / ((1 + taxa) ** (i + 1)) for i, fluxo in enumerate(fluxo_caixa) if i > 0)
+        return {
+            'mes': movimento.mes,
+            'ano': movimento.ano,
+            'creditos_gerados_kwh': gerados,
+            'creditos_utilizados_kwh': utilizados,
+            'creditos_expirados_kwh': movimento.creditos_expirados_kwh,
+            'creditos_saldo_kwh': gerados - utilizados,
+            'valor_creditos_gerados': self.calcular_valor_creditos_gerados(gerados, movimento.mes),
+            'valor_creditos_utilizados': self.calcular_valor_creditos_gerados(utilizados, movimento.mes),
+            'creditos_disponiveis_total': movimento.creditos_disponiveis_kwh
+        }
 
-                if abs(dvpl) < precisao:
-                    break
+    def _calcular_adicional_bandeira(self, bandeira: BandeiraTarifaria) -> float:
+        """Calcula adicional da bandeira tarifária"""
+        return calcular_adicional_bandeira(self.config, bandeira)
 
-                # Nova estimativa
-                taxa = taxa - vpl / dvpl
+    def _calcular_taxa_disponibilidade_total(self) -> float:
+        """Calcula taxa de disponibilidade total de todas as unidades"""
+        return self.sistema.get_taxa_disponibilidade_total()
 
-                # Limitar taxa entre -50% e 100%
-                taxa = max(-0.5, min(1.0, taxa))
+    def _obter_livro_creditos(self) -> LivroCreditos:
+        """
+        Obtém o livro de créditos indexado sobre sistema.historico_creditos
+        Reconstrói o índice se o histórico foi substituído ou alterado externamente
+        (registros incluídos ou lotes com saldo/situação editados)
+        """
+        historico = self.sistema.historico_creditos
+        livro = self._livro_creditos
 
-            return taxa
+        if (livro is None or livro.historico is not historico
+                or livro.validade_meses != self.config.validade_creditos_meses):
+            livro = LivroCreditos(historico, self.config.validade_creditos_meses)
+            self._livro_creditos = livro
+        elif not livro.sincronizado():
+            livro.invalidar()
 
-        except:
-            return 0.0  # Retorna 0% se não conseguir calcular
+        return livro
 
 
 # Funções auxiliares para compatibilidade
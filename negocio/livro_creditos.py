@@ -0,0 +1,244 @@
+"""
+Livro de créditos de energia - Índice por vencimento sobre o HistoricoCreditos
+Consumo FIFO em O(log n), saldo disponível em O(1) e varredura de vencidos
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Tuple
+
+from nucleo.modelos import HistoricoCreditos
+from nucleo.excecoes import ErroCreditos
+
+
+def calcular_vencimento(mes: int, ano: int, validade_meses: int) -> Tuple[int, int]:
+    """
+    Calcula (mes_vencimento, ano_vencimento) somando a validade em meses
+    """
+    indice = ano * 12 + (mes - 1) + validade_meses
+    return indice % 12 + 1, indice // 12
+
+
+class LivroCreditos:
+    """
+    Livro-razão de créditos indexado por (ano_vencimento, mes_vencimento)
+
+    Mantém um heap com os lotes ativos e o saldo total corrente. Os lotes
+    são os próprios objetos HistoricoCreditos da lista informada, que continua
+    sendo o registro persistente. O livro avança no tempo: uma varredura em
+    um mês marca como vencidos todos os lotes com vencimento anterior a ele.
+    """
+
+    def __init__(self, historico: List[HistoricoCreditos] = None, validade_meses: int = 60):
+        self.historico = historico if historico is not None else []
+        self.validade_meses = validade_meses
+
+        self._sequencia = itertools.count()
+        self._indexar()
+
+    def __len__(self) -> int:
+        """Quantidade de lotes ativos"""
+        return len(self._heap)
+
+    @property
+    def saldo_total(self) -> float:
+        """Saldo de todos os lotes ativos, sem considerar vencimento (O(1))"""
+        return self._saldo_total
+
+    @property
+    def tamanho_historico(self) -> int:
+        """Quantidade de registros do histórico já indexados pelo livro"""
+        return self._tamanho_indexado
+
+    def sincronizado(self) -> bool:
+        """
+        Indica se o índice ainda corresponde ao histórico: mesma quantidade de
+        registros e os mesmos lotes ativos, com o vencimento e o saldo indexados
+        (detecta lotes alterados ou substituídos por fora)
+        """
+        if self._tamanho_indexado != len(self.historico):
+            return False
+
+        ativos = {id(c): c for c in self.historico if c.ativo and c.creditos_restantes_kwh > 0}
+        if len(ativos) != len(self._heap):
+            return False
+
+        return all(
+            ativos.get(id(credito)) is credito
+            and (credito.ano_vencimento, credito.mes_vencimento, credito.creditos_restantes_kwh) == (ano, mes, saldo)
+            for ano, mes, _, saldo, credito in self._heap
+        )
+
+    def invalidar(self):
+        """Reconstrói o índice a partir do histórico (após alterar lotes fora do livro)"""
+        self._indexar()
+
+    def adicionar_credito(self, mes: int, ano: int, creditos_kwh: float) -> HistoricoCreditos:
+        """Registra créditos gerados no mês com vencimento em validade_meses"""
+        if creditos_kwh < 0:
+            raise ErroCreditos(f"Créditos gerados não podem ser negativos: {creditos_kwh}")
+
+        mes_vencimento, ano_vencimento = calcular_vencimento(mes, ano, self.validade_meses)
+
+        credito = HistoricoCreditos(
+            mes_geracao=mes,
+            ano_geracao=ano,
+            creditos_kwh=creditos_kwh,
+            creditos_utilizados_kwh=0.0,
+            creditos_restantes_kwh=creditos_kwh,
+            mes_vencimento=mes_vencimento,
+            ano_vencimento=ano_vencimento,
+            ativo=creditos_kwh > 0
+        )
+
+        self.historico.append(credito)
+        self._tamanho_indexado += 1
+        if credito.ativo:
+            heapq.heappush(self._heap, self._criar_entrada(credito))
+            self._saldo_total += creditos_kwh
+
+        return credito
+
+    def expirar_creditos(self, mes: int, ano: int) -> float:
+        """
+        Marca como inativos os lotes vencidos antes de (mes, ano)
+        Retorna o total de kWh expirados nesta varredura
+        """
+        expirados = 0.0
+        referencia = (ano, mes)
+
+        while self._heap and (self._heap[0][0], self._heap[0][1]) < referencia:
+            credito = heapq.heappop(self._heap)[-1]
+            expirados += credito.creditos_restantes_kwh
+            credito.ativo = False
+
+        self._atualizar_saldo(-expirados)
+        return expirados
+
+    def obter_saldo_disponivel(self, mes: int, ano: int) -> float:
+        """Saldo disponível em (mes, ano) após varrer os vencidos"""
+        self.expirar_creditos(mes, ano)
+        return self._saldo_total
+
+    def utilizar_creditos(self, creditos_kwh: float, mes: int, ano: int) -> float:
+        """
+        Consome créditos em ordem de vencimento (FIFO)
+        Retorna o total efetivamente utilizado
+        """
+        self.expirar_creditos(mes, ano)
+
+        restante = creditos_kwh
+        while restante > 0 and self._heap:
+            entrada = self._heap[0]
+            credito = entrada[-1]
+
+            utilizacao = min(credito.creditos_restantes_kwh, restante)
+            credito.creditos_utilizados_kwh += utilizacao
+            credito.creditos_restantes_kwh -= utilizacao
+            entrada[3] = credito.creditos_restantes_kwh
+            restante -= utilizacao
+
+            if credito.creditos_restantes_kwh <= 0:
+                credito.ativo = False
+                heapq.heappop(self._heap)
+
+        utilizado = creditos_kwh - restante
+        self._atualizar_saldo(-utilizado)
+        return utilizado
+
+    def obter_lotes_ativos(self) -> List[HistoricoCreditos]:
+        """Lotes ativos na ordem em que serão consumidos (vencimento, inserção)"""
+        return [entrada[-1] for entrada in sorted(self._heap)]
+
+    def copiar(self) -> 'LivroCreditos':
+        """
+        Cria livro independente com cópias dos lotes ativos
+        Alterações na cópia não afetam este livro nem seu histórico
+        """
+        lotes_ativos = [replace(credito) for credito in self.obter_lotes_ativos()]
+        return LivroCreditos(lotes_ativos, self.validade_meses)
+
+    # Métodos auxiliares privados
+
+    def _indexar(self):
+        """Monta o heap e o saldo com os lotes ativos do histórico"""
+        self._heap = []
+        self._saldo_total = 0.0
+
+        for credito in self.historico:
+            if credito.ativo and credito.creditos_restantes_kwh > 0:
+                self._heap.append(self._criar_entrada(credito))
+                self._saldo_total += credito.creditos_restantes_kwh
+
+        heapq.heapify(self._heap)
+        self._tamanho_indexado = len(self.historico)
+
+    def _criar_entrada(self, credito: HistoricoCreditos) -> list:
+        """
+        Cria entrada do heap ordenada por vencimento e ordem de inserção
+        Guarda também o saldo indexado do lote, conferido por sincronizado()
+        """
+        return [credito.ano_vencimento, credito.mes_vencimento, next(self._sequencia),
+                credito.creditos_restantes_kwh, credito]
+
+    def _atualizar_saldo(self, delta: float):
+        """Atualiza saldo corrente evitando resíduos de ponto flutuante"""
+        if not self._heap:
+            self._saldo_total = 0.0
+        else:
+            self._saldo_total = max(0.0, self._saldo_total + delta)
+
+
+@dataclass
+class MovimentoCreditosMes:
+    """Movimentação de créditos de um mês"""
+    mes: int
+    ano: int
+    creditos_gerados_kwh: float
+    creditos_utilizados_kwh: float
+    creditos_expirados_kwh: float
+    creditos_disponiveis_kwh: float  # Saldo ao final do mês
+
+
+def processar_creditos_mes(livro: LivroCreditos, mes: int, ano: int,
+                           creditos_gerados_kwh: float, consumo_rede_kwh: float) -> MovimentoCreditosMes:
+    """
+    Aplica um mês ao livro: vence lotes, usa créditos no déficit e registra a sobra
+    Altera o livro informado
+    """
+    expirados = livro.expirar_creditos(mes, ano)
+
+    utilizados = 0.0
+    if consumo_rede_kwh > 0:
+        # Usar créditos disponíveis antes de consumir da rede
+        utilizados = livro.utilizar_creditos(consumo_rede_kwh, mes, ano)
+
+    if creditos_gerados_kwh > 0:
+        livro.adicionar_credito(mes, ano, creditos_gerados_kwh)
+
+    return MovimentoCreditosMes(
+        mes=mes,
+        ano=ano,
+        creditos_gerados_kwh=creditos_gerados_kwh,
+        creditos_utilizados_kwh=utilizados,
+        creditos_expirados_kwh=expirados,
+        creditos_disponiveis_kwh=livro.saldo_total
+    )
+
+
+def simular_creditos(livro_inicial: LivroCreditos,
+                     meses: Iterable[Tuple[int, int, float, float]]
+                     ) -> Tuple[LivroCreditos, List[MovimentoCreditosMes]]:
+    """
+    Simula a movimentação de créditos sem alterar o livro inicial
+
+    meses: sequência de (mes, ano, creditos_gerados_kwh, consumo_rede_kwh)
+    Retorna o novo livro (somente com lotes ativos) e os movimentos mensais.
+    """
+    livro = livro_inicial.copiar()
+    movimentos = [
+        processar_creditos_mes(livro, mes, ano, gerados, consumo_rede)
+        for mes, ano, gerados, consumo_rede in meses
+    ]
+    return livro, movimentos
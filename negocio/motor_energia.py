@@ -0,0 +1,198 @@
+"""
+Motor vetorizado de cálculos energéticos
+Monta uma única matriz de consumo (unidades × 12 meses) e um vetor de geração,
+derivando todos os campos de ResultadoMensalEnergia / ResultadoAnualEnergia
+"""
+
+import calendar
+import copy
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora,
+    ResultadoMensalEnergia, ResultadoAnualEnergia
+)
+from nucleo.excecoes import ErroCalculoEnergia
+from nucleo.unidades_compactas import obter_matriz_compacta
+
+MESES_ANO = 12
+
+
+def calcular_vetor_geracao_real(config: ConfiguracaoSistema) -> np.ndarray:
+    """
+    Calcula a geração real dos 12 meses (eficiência, perdas e simultaneidade)
+    """
+    geracao_teorica = np.asarray(config.geracao_mensal_kwh, dtype=float)
+    if geracao_teorica.shape != (MESES_ANO,):
+        raise ErroCalculoEnergia(f"Geração mensal deve ter {MESES_ANO} valores")
+
+    fator = (config.eficiencia_sistema
+             * (1 - config.perdas_sistema)
+             * config.fator_simultaneidade)
+
+    return np.maximum(0.0, geracao_teorica * fator)
+
+
+def montar_matriz_consumo(unidades: Sequence[UnidadeConsumidora]) -> np.ndarray:
+    """
+    Monta a matriz de consumo (unidades × 12 meses) em kWh
+    """
+    if not unidades:
+        return np.zeros((0, MESES_ANO))
+
+    # Unidades compactas: leitura direta da tabela compartilhada
+    matriz = obter_matriz_compacta(unidades)
+    if matriz is not None:
+        return matriz
+
+    matriz = np.array([u.consumo_mensal_kwh for u in unidades], dtype=float)
+    if matriz.ndim != 2 or matriz.shape[1] != MESES_ANO:
+        raise ErroCalculoEnergia(f"Consumo mensal das unidades deve ter {MESES_ANO} valores")
+
+    return matriz
+
+
+def montar_vetor_taxas(unidades: Sequence[UnidadeConsumidora]) -> np.ndarray:
+    """
+    Monta o vetor de taxas de disponibilidade (kWh) por unidade
+    """
+    return np.array([u.get_taxa_disponibilidade() for u in unidades], dtype=float)
+
+
+def dias_por_mes(ano: Optional[int] = None) -> np.ndarray:
+    """
+    Retorna os dias de cada mês do ano (30 quando o ano não é informado)
+    """
+    if not ano:
+        return np.full(MESES_ANO, 30.0)
+    return np.array([calendar.monthrange(ano, mes)[1] for mes in range(1, MESES_ANO + 1)], dtype=float)
+
+
+class MotorEnergia:
+    """
+    Snapshot vetorizado do sistema para cálculos energéticos
+
+    Todos os vetores mensais têm 12 posições (índice 0 = janeiro). O motor
+    não observa alterações posteriores no sistema: crie um novo quando os
+    dados mudarem.
+    """
+
+    def __init__(self, sistema: SistemaEnergia):
+        try:
+            self.config = sistema.configuracao
+            unidades = sistema.get_unidades_ativas()
+
+            # Matrizes de entrada
+            self.consumo_unidades = montar_matriz_consumo(unidades)
+            self.taxas_unidades = montar_vetor_taxas(unidades)
+            self.geracao_teorica = np.asarray(self.config.geracao_mensal_kwh, dtype=float)
+            self.geracao = calcular_vetor_geracao_real(self.config)
+
+            # Consumo agregado e consumo mínimo (taxa de disponibilidade)
+            self.consumo_total = self.consumo_unidades.sum(axis=0)
+            self.consumo_minimo = np.full(MESES_ANO, self.taxas_unidades.sum())
+
+            self._calcular_derivados()
+
+        except ErroCalculoEnergia:
+            raise
+        except Exception as e:
+            raise ErroCalculoEnergia(f"Erro ao montar motor de energia: {e}")
+
+    def _calcular_derivados(self):
+        """Deriva saldo, créditos e métricas legacy a partir da geração e do consumo"""
+        # Saldo energético
+        self.consumo_efetivo = np.maximum(self.consumo_total, self.consumo_minimo)
+        self.saldo = self.geracao - self.consumo_efetivo
+        self.energia_injetada = np.maximum(0.0, self.saldo) * self.config.percentual_injecao_rede
+        self.energia_consumida_rede = np.maximum(0.0, -self.saldo)
+        self.creditos_gerados = np.maximum(0.0, self.saldo)
+
+        # Métricas do sistema legacy
+        com_geracao = self.geracao_teorica > 0
+        razao = np.divide(self.geracao, self.geracao_teorica,
+                          out=np.zeros(MESES_ANO), where=com_geracao)
+        self.eficiencia_real = np.minimum(1.0, razao)
+        self.perdas = np.maximum(0.0, self.geracao_teorica - self.geracao)
+
+    def aplicar_fator_geracao(self, fator: float) -> 'MotorEnergia':
+        """
+        Retorna cópia do motor com a geração real multiplicada por um fator
+        (ex.: degradação anual dos painéis); o consumo é reaproveitado
+        """
+        motor = copy.copy(self)
+        motor.geracao = self.geracao * fator
+        motor._calcular_derivados()
+        return motor
+
+    def calcular_fator_capacidade(self, ano: int = None) -> np.ndarray:
+        """Calcula fator de capacidade real dos 12 meses"""
+        geracao_maxima = self.config.potencia_instalada_kw * 24 * dias_por_mes(ano)
+        fator = np.divide(self.geracao, geracao_maxima,
+                          out=np.zeros(MESES_ANO), where=geracao_maxima > 0)
+        return np.minimum(1.0, fator)
+
+    def calcular_resultados_mensais(self, ano: int = None) -> List[ResultadoMensalEnergia]:
+        """Gera os 12 resultados mensais a partir dos vetores do motor"""
+        colunas = zip(
+            self.geracao.tolist(),
+            self.consumo_total.tolist(),
+            self.saldo.tolist(),
+            self.creditos_gerados.tolist(),
+            self.energia_injetada.tolist(),
+            self.energia_consumida_rede.tolist(),
+            self.calcular_fator_capacidade(ano).tolist(),
+            self.eficiencia_real.tolist(),
+            self.perdas.tolist()
+        )
+
+        return [
+            ResultadoMensalEnergia(
+                mes=mes,
+                geracao_kwh=geracao,
+                consumo_total_kwh=consumo,
+                saldo_kwh=saldo,
+                creditos_gerados_kwh=creditos,
+                creditos_utilizados_kwh=0.0,  # Será calculado pelo gerenciador de distribuição
+                energia_injetada_kwh=injetada,
+                energia_consumida_rede_kwh=consumida,
+                fator_capacidade_real=fator_capacidade,
+                eficiencia_real=eficiencia,
+                perdas_kwh=perdas
+            )
+            for mes, (geracao, consumo, saldo, creditos, injetada, consumida,
+                      fator_capacidade, eficiencia, perdas) in enumerate(colunas, start=1)
+        ]
+
+    def calcular_resultado_mensal(self, mes: int, ano: int = None) -> ResultadoMensalEnergia:
+        """Retorna o resultado energético de um único mês"""
+        if not (1 <= mes <= MESES_ANO):
+            raise ErroCalculoEnergia(f"Mês inválido: {mes}")
+        return self.calcular_resultados_mensais(ano)[mes - 1]
+
+    def calcular_resultado_anual(self, ano: int) -> ResultadoAnualEnergia:
+        """Consolida os vetores mensais em um resultado anual"""
+        resultados_mensais = self.calcular_resultados_mensais(ano)
+
+        geracao_total = float(self.geracao.sum())
+        consumo_total = float(self.consumo_total.sum())
+
+        if consumo_total > 0:
+            autossuficiencia = min(100.0, (geracao_total / consumo_total) * 100)
+        else:
+            autossuficiencia = 0.0
+
+        return ResultadoAnualEnergia(
+            ano=ano,
+            geracao_total_kwh=geracao_total,
+            consumo_total_kwh=consumo_total,
+            saldo_anual_kwh=geracao_total - consumo_total,
+            creditos_acumulados_kwh=float(self.creditos_gerados.sum()),
+            autossuficiencia_percentual=autossuficiencia,
+            resultados_mensais=resultados_mensais,
+            fator_capacidade_medio=float(self.calcular_fator_capacidade(ano).mean()),
+            eficiencia_media=float(self.eficiencia_real.mean()),
+            perdas_totais_kwh=float(self.perdas.sum())
+        )
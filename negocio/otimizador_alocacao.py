@@ -0,0 +1,109 @@
+"""
+Otimizador dos percentuais de alocação (percentual_energia_alocada)
+Water-filling sobre a matriz unidades × meses: minimiza a compra de energia da rede
+(ou maximiza o valor faturável dos créditos) no ano
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from nucleo.modelos import SistemaEnergia
+from nucleo.excecoes import ErroCreditos
+
+OBJETIVOS_OTIMIZACAO = ('compra_rede', 'receita')
+
+
+def calcular_compra_rede(creditos_disponiveis: np.ndarray, consumo_liquido: np.ndarray,
+                         percentuais: np.ndarray) -> np.ndarray:
+    """Energia comprada da rede por unidade no ano com percentuais fixos (em %)"""
+    recebidos = (percentuais[:, np.newaxis] / 100) * creditos_disponiveis[np.newaxis, :]
+    return np.maximum(0.0, consumo_liquido - recebidos).sum(axis=1)
+
+
+def otimizar_percentuais(creditos_disponiveis: np.ndarray, consumo_liquido: np.ndarray,
+                         valores_kwh: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calcula os percentuais fixos (somando 100%) que maximizam o valor dos créditos aproveitados
+
+    A unidade i com fração p recebe p·D[m] no mês m e aproveita min(L[i, m], p·D[m]).
+    O ganho marginal de cada unidade é uma função escada decrescente de p, com quebras
+    em L[i, m] / D[m]; ordenar todos os degraus pelo ganho e preenchê-los até 100% dá
+    o ótimo exato (O(12·n·log n)). Sem valores_kwh, todas as unidades valem 1 e o
+    resultado minimiza a compra de energia da rede.
+    A fração que sobrar após cobrir todo o consumo é repartida pelo consumo anual.
+    """
+    creditos_disponiveis = np.asarray(creditos_disponiveis, dtype=float)
+    consumo_liquido = np.asarray(consumo_liquido, dtype=float)
+    n_unidades, n_meses = consumo_liquido.shape
+    if n_unidades == 0:
+        return np.zeros(0)
+
+    valores = np.ones(n_unidades) if valores_kwh is None else np.asarray(valores_kwh, dtype=float)
+
+    # Pontos de quebra por unidade, em ordem crescente
+    quebras = np.divide(consumo_liquido, creditos_disponiveis[np.newaxis, :],
+                        out=np.zeros_like(consumo_liquido), where=creditos_disponiveis > 0)
+    ordem = np.argsort(quebras, axis=1)
+    quebras_ord = np.take_along_axis(quebras, ordem, axis=1)
+    creditos_ord = creditos_disponiveis[ordem]
+
+    # Degrau k: p entre quebras k-1 e k, ganho = valor·Σ D dos meses ainda não cobertos
+    comprimentos = np.diff(quebras_ord, axis=1, prepend=0.0)
+    ganhos = valores[:, np.newaxis] * np.cumsum(creditos_ord[:, ::-1], axis=1)[:, ::-1]
+
+    comprimentos = comprimentos.ravel()
+    ganhos = ganhos.ravel()
+    unidades = np.repeat(np.arange(n_unidades), n_meses)
+
+    validos = (comprimentos > 0) & (ganhos > 0)
+    comprimentos, ganhos, unidades = comprimentos[validos], ganhos[validos], unidades[validos]
+
+    ordem_ganho = np.argsort(-ganhos, kind='stable')
+    comprimentos = comprimentos[ordem_ganho]
+    preenchido_antes = np.cumsum(comprimentos) - comprimentos
+    alocado = np.clip(1.0 - preenchido_antes, 0.0, comprimentos)
+
+    fracoes = np.bincount(unidades[ordem_ganho], weights=alocado, minlength=n_unidades)
+
+    sobra = 1.0 - fracoes.sum()
+    if sobra > 1e-12:
+        consumo_anual = consumo_liquido.sum(axis=1)
+        if consumo_anual.sum() > 0:
+            fracoes += sobra * consumo_anual / consumo_anual.sum()
+        else:
+            fracoes += sobra / n_unidades
+
+    return fracoes * 100
+
+
+@dataclass
+class TabelaAlocacao:
+    """Percentuais de alocação por unidade, prontos para aplicar no sistema"""
+    objetivo: str
+    percentuais: Dict[str, float]
+    compra_rede_atual_kwh: float = 0.0
+    compra_rede_otimizada_kwh: float = 0.0
+    percentuais_anteriores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def reducao_compra_rede_kwh(self) -> float:
+        """Energia da rede evitada em relação aos percentuais atuais"""
+        return self.compra_rede_atual_kwh - self.compra_rede_otimizada_kwh
+
+    def aplicar(self, sistema: SistemaEnergia) -> List[str]:
+        """
+        Grava os percentuais em percentual_energia_alocada das unidades
+        Retorna os IDs atualizados
+        """
+        atualizadas = []
+        for id_unidade, percentual in self.percentuais.items():
+            unidade = sistema.get_unidade_por_id(id_unidade)
+            if unidade is None:
+                raise ErroCreditos(f"Unidade da tabela de alocação não encontrada: {id_unidade}")
+            unidade.percentual_energia_alocada = percentual
+            atualizadas.append(id_unidade)
+
+        sistema.atualizar_timestamp()
+        return atualizadas
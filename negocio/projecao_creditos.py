@@ -0,0 +1,111 @@
+"""
+Projeção de créditos de energia em horizonte de vários anos
+Monta a matriz de geração (anos × 12) com degradação e rola os créditos mês a mês
+sobre o livro indexado por vencimento (O(meses × log lotes))
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from nucleo.excecoes import ErroCreditos
+from negocio.motor_energia import MotorEnergia, MESES_ANO
+from negocio.livro_creditos import LivroCreditos, processar_creditos_mes
+
+
+@dataclass
+class ProjecaoCreditos:
+    """
+    Resultado da projeção de créditos
+
+    Os vetores mensais têm anos × 12 posições em ordem cronológica
+    (índice 0 = janeiro do ano inicial).
+    """
+    ano_inicial: int
+    fatores_degradacao: np.ndarray
+    geracao_kwh: np.ndarray
+    consumo_kwh: np.ndarray
+    creditos_gerados_kwh: np.ndarray
+    creditos_utilizados_kwh: np.ndarray
+    creditos_expirados_kwh: np.ndarray
+    creditos_disponiveis_kwh: np.ndarray  # Saldo ao final do mês
+    energia_consumida_rede_kwh: np.ndarray
+    livro_final: LivroCreditos
+
+    @property
+    def anos(self) -> int:
+        """Quantidade de anos projetados"""
+        return len(self.fatores_degradacao)
+
+    @property
+    def meses(self) -> List[Tuple[int, int]]:
+        """Lista de (mes, ano) do horizonte"""
+        return [(indice % MESES_ANO + 1, self.ano_inicial + indice // MESES_ANO)
+                for indice in range(self.anos * MESES_ANO)]
+
+    def por_ano(self, vetor: np.ndarray) -> np.ndarray:
+        """Reorganiza um vetor mensal do horizonte como matriz (anos × 12)"""
+        return np.asarray(vetor).reshape(self.anos, MESES_ANO)
+
+    def totais_anuais(self, vetor: np.ndarray) -> np.ndarray:
+        """Soma anual de um vetor mensal do horizonte"""
+        return self.por_ano(vetor).sum(axis=1)
+
+    @property
+    def total_expirado_kwh(self) -> float:
+        """Total de créditos vencidos no horizonte"""
+        return float(self.creditos_expirados_kwh.sum())
+
+
+def projetar_creditos(motor: MotorEnergia, fatores_degradacao: Sequence[float],
+                      ano_inicial: int, livro_inicial: LivroCreditos = None) -> ProjecaoCreditos:
+    """
+    Projeta geração, uso e vencimento de créditos ano a ano
+
+    fatores_degradacao: fator multiplicativo da geração em cada ano do horizonte
+    livro_inicial: saldo de créditos no início da projeção (não é alterado)
+    """
+    fatores = np.asarray(fatores_degradacao, dtype=float)
+    if fatores.ndim != 1 or len(fatores) == 0:
+        raise ErroCreditos("Informe ao menos um fator de degradação anual")
+
+    # Matrizes (anos × 12): geração degradada e saldo contra o consumo efetivo
+    geracao = fatores[:, np.newaxis] * motor.geracao[np.newaxis, :]
+    saldo = geracao - motor.consumo_efetivo[np.newaxis, :]
+    creditos_gerados = np.maximum(0.0, saldo).ravel()
+    consumo_rede = np.maximum(0.0, -saldo).ravel()
+
+    if livro_inicial is None:
+        livro = LivroCreditos(validade_meses=motor.config.validade_creditos_meses)
+    else:
+        livro = livro_inicial.copiar()
+
+    total_meses = len(fatores) * MESES_ANO
+    utilizados = np.zeros(total_meses)
+    expirados = np.zeros(total_meses)
+    disponiveis = np.zeros(total_meses)
+
+    gerados_lista = creditos_gerados.tolist()
+    consumo_lista = consumo_rede.tolist()
+    for indice in range(total_meses):
+        mes = indice % MESES_ANO + 1
+        ano = ano_inicial + indice // MESES_ANO
+        movimento = processar_creditos_mes(livro, mes, ano, gerados_lista[indice], consumo_lista[indice])
+
+        utilizados[indice] = movimento.creditos_utilizados_kwh
+        expirados[indice] = movimento.creditos_expirados_kwh
+        disponiveis[indice] = movimento.creditos_disponiveis_kwh
+
+    return ProjecaoCreditos(
+        ano_inicial=ano_inicial,
+        fatores_degradacao=fatores,
+        geracao_kwh=geracao.ravel(),
+        consumo_kwh=np.tile(motor.consumo_total, len(fatores)),
+        creditos_gerados_kwh=creditos_gerados,
+        creditos_utilizados_kwh=utilizados,
+        creditos_expirados_kwh=expirados,
+        creditos_disponiveis_kwh=disponiveis,
+        energia_consumida_rede_kwh=consumo_rede,
+        livro_final=livro
+    )
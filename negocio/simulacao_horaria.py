@@ -0,0 +1,336 @@
+"""
+Simulação horária (8760 h) de geração e carga
+Distribui a geração mensal em perfis horários de irradiância e temperatura,
+cruza com os perfis de carga das unidades e agrega de volta em ResultadoMensalEnergia
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from nucleo.modelos import (
+    SistemaEnergia, TipoUnidade, ResultadoMensalEnergia, ResultadoAnualEnergia
+)
+from nucleo.excecoes import ErroCalculoEnergia
+from negocio.motor_energia import MotorEnergia, MESES_ANO, dias_por_mes
+from negocio.calculadora_energia import CalculadoraEnergiaSolar
+from negocio.livro_creditos import LivroCreditos, processar_creditos_mes
+
+HORAS_DIA = 24
+HORAS_ANO = 8760
+DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])  # Ano de 365 dias
+
+# Início de cada mês no vetor horário
+INICIO_MES_HORA = np.concatenate([[0], np.cumsum(DIAS_MES * HORAS_DIA)[:-1]])
+
+# Janela de sol (hora inicial inclusiva, hora final exclusiva)
+NASCER_SOL_HORA = 6
+POR_SOL_HORA = 18
+
+# Modelo térmico de calcular_temperatura_celula / calcular_eficiencia_temperatura
+NOCT = 45.0
+IRRADIANCIA_REFERENCIA = 600.0  # W/m² usada na temperatura mensal
+TEMPERATURA_STC = 25.0
+COEFICIENTE_TEMPERATURA = -0.004
+
+# Perfis diários de carga (fração do consumo diário por hora)
+PERFIS_CARGA_PADRAO: Dict[TipoUnidade, List[float]] = {
+    TipoUnidade.RESIDENCIAL: [
+        0.020, 0.018, 0.017, 0.017, 0.018, 0.025, 0.035, 0.040, 0.035, 0.032, 0.032, 0.035,
+        0.040, 0.037, 0.033, 0.033, 0.037, 0.050, 0.072, 0.083, 0.078, 0.067, 0.050, 0.032
+    ],
+    TipoUnidade.COMERCIAL: [
+        0.015, 0.015, 0.015, 0.015, 0.015, 0.018, 0.030, 0.050, 0.065, 0.070, 0.072, 0.072,
+        0.068, 0.070, 0.072, 0.072, 0.068, 0.060, 0.045, 0.030, 0.020, 0.018, 0.017, 0.016
+    ],
+    TipoUnidade.INDUSTRIAL: [
+        0.030, 0.030, 0.030, 0.030, 0.030, 0.035, 0.045, 0.055, 0.055, 0.055, 0.055, 0.055,
+        0.050, 0.055, 0.055, 0.055, 0.055, 0.050, 0.040, 0.035, 0.035, 0.035, 0.030, 0.030
+    ]
+}
+PERFIS_CARGA_PADRAO[TipoUnidade.RURAL] = PERFIS_CARGA_PADRAO[TipoUnidade.RESIDENCIAL]
+PERFIS_CARGA_PADRAO[TipoUnidade.PODER_PUBLICO] = PERFIS_CARGA_PADRAO[TipoUnidade.COMERCIAL]
+
+
+def indices_mes_por_hora() -> np.ndarray:
+    """Mês (0-11) de cada hora do ano de 8760 h"""
+    return np.repeat(np.arange(MESES_ANO), DIAS_MES * HORAS_DIA)
+
+
+def agregar_por_mes(vetor_horario: np.ndarray) -> np.ndarray:
+    """Soma a última dimensão (8760 h) em 12 meses"""
+    return np.add.reduceat(vetor_horario, INICIO_MES_HORA, axis=-1)
+
+
+def calcular_forma_solar_diaria() -> np.ndarray:
+    """Forma senoidal da irradiância ao longo do dia (24 valores, soma 1)"""
+    horas = np.arange(HORAS_DIA) + 0.5
+    forma = np.sin(np.pi * (horas - NASCER_SOL_HORA) / (POR_SOL_HORA - NASCER_SOL_HORA))
+    forma = np.where((horas > NASCER_SOL_HORA) & (horas < POR_SOL_HORA), forma, 0.0)
+    return forma / forma.sum()
+
+
+@dataclass
+class SimulacaoHoraria:
+    """
+    Resultado da simulação horária
+
+    Vetores horários têm forma (anos × 8760); agregados mensais (anos × 12).
+    A carga não muda entre os anos e é guardada uma única vez (8760,).
+    """
+    ano_inicial: int
+    fatores_degradacao: np.ndarray
+    geracao_horaria_kwh: np.ndarray
+    carga_horaria_kwh: np.ndarray
+    geracao_kwh: np.ndarray
+    consumo_kwh: np.ndarray
+    autoconsumo_kwh: np.ndarray
+    energia_injetada_kwh: np.ndarray
+    energia_consumida_rede_kwh: np.ndarray
+    creditos_gerados_kwh: np.ndarray
+    creditos_utilizados_kwh: np.ndarray
+    creditos_expirados_kwh: np.ndarray
+    energia_limitada_inversor_kwh: np.ndarray
+    demanda_maxima_rede_kw: np.ndarray
+    demanda_maxima_unidades_kw: np.ndarray  # (unidades × 12), igual em todos os anos
+
+    @property
+    def anos(self) -> int:
+        """Quantidade de anos simulados"""
+        return len(self.fatores_degradacao)
+
+
+class SimuladorHorario:
+    """
+    Simulação de 8760 horas por ano sobre o motor mensal
+
+    A geração mensal do MotorEnergia é distribuída nas horas proporcionalmente à
+    irradiância horária (forma senoidal sobre calcular_irradiacao_mensal) corrigida
+    pela temperatura da célula, de modo que os totais mensais coincidem com o motor
+    (antes da limitação do inversor). A carga de cada unidade vem de um perfil
+    horário próprio ou de um perfil diário por tipo de unidade, escalado para o
+    consumo mensal cadastrado.
+    """
+
+    def __init__(self, sistema: SistemaEnergia, usar_float32: bool = False):
+        self.sistema = sistema
+        self.config = sistema.configuracao
+        self.dtype = np.float32 if usar_float32 else np.float64
+        self.motor = MotorEnergia(sistema)
+        self.calculadora_solar = CalculadoraEnergiaSolar(sistema)
+        self._meses_hora = indices_mes_por_hora()
+
+    def calcular_irradiancia_horaria(self, latitude: float = -15.0) -> np.ndarray:
+        """Irradiância média de cada hora do ano (W/m²)"""
+        irradiacao_diaria = np.array([
+            self.calculadora_solar.calcular_irradiacao_mensal(mes, latitude) for mes in range(1, MESES_ANO + 1)
+        ]) / DIAS_MES  # kWh/m²/dia
+
+        forma = np.tile(calcular_forma_solar_diaria(), DIAS_MES.sum())
+        return irradiacao_diaria[self._meses_hora] * 1000 * forma
+
+    def calcular_fator_temperatura_horario(self, irradiancia: np.ndarray) -> np.ndarray:
+        """
+        Fator de eficiência por temperatura em cada hora
+        Desloca a temperatura mensal de calcular_temperatura_celula (calculada a
+        600 W/m²) conforme a irradiância da hora
+        """
+        temperatura_mes = np.array([
+            self.calculadora_solar.calcular_temperatura_celula(mes) for mes in range(1, MESES_ANO + 1)
+        ])
+        temperatura_celula = (temperatura_mes[self._meses_hora]
+                              + (NOCT - 20) * (irradiancia - IRRADIANCIA_REFERENCIA) / 800)
+        fator = 1.0 + (temperatura_celula - TEMPERATURA_STC) * COEFICIENTE_TEMPERATURA
+        return np.maximum(0.5, fator)
+
+    def calcular_geracao_horaria(self, latitude: float = -15.0) -> np.ndarray:
+        """Geração horária (8760,) com totais mensais iguais aos do motor"""
+        irradiancia = self.calcular_irradiancia_horaria(latitude)
+        pesos = irradiancia * self.calcular_fator_temperatura_horario(irradiancia)
+
+        soma_mes = agregar_por_mes(pesos)
+        escala = np.divide(self.motor.geracao, soma_mes, out=np.zeros(MESES_ANO), where=soma_mes > 0)
+        return (pesos * escala[self._meses_hora]).astype(self.dtype)
+
+    def montar_cargas_horarias(self, perfis_carga: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Carga horária por unidade ativa (unidades × 8760)
+
+        perfis_carga:
+          None          perfil diário padrão do tipo de cada unidade
+          (24,)/(n, 24) perfil diário (um para todas ou um por unidade)
+          (n, 8760)     carga horária em kWh, usada como está
+        Perfis diários são escalados para o consumo mensal de cada unidade.
+        """
+        unidades = self.sistema.get_unidades_ativas()
+        n_unidades = len(unidades)
+
+        if perfis_carga is None:
+            perfis = np.array([PERFIS_CARGA_PADRAO.get(u.tipo_unidade, PERFIS_CARGA_PADRAO[TipoUnidade.RESIDENCIAL])
+                               for u in unidades], dtype=float).reshape(n_unidades, HORAS_DIA)
+        else:
+            perfis = np.asarray(perfis_carga, dtype=float)
+            if perfis.ndim == 1:
+                perfis = np.broadcast_to(perfis, (n_unidades, perfis.shape[0]))
+
+        if perfis.shape == (n_unidades, HORAS_ANO):
+            return perfis.astype(self.dtype)
+        if perfis.shape != (n_unidades, HORAS_DIA):
+            raise ErroCalculoEnergia(
+                f"Perfis de carga devem ter 24 ou {HORAS_ANO} valores por unidade (recebido {perfis.shape})"
+            )
+
+        # Perfil diário escalado para o consumo de cada mês e repetido nos dias
+        soma_mes = perfis.sum(axis=1, keepdims=True) * DIAS_MES[np.newaxis, :]
+        escala = np.divide(self.motor.consumo_unidades, soma_mes,
+                           out=np.zeros_like(soma_mes), where=soma_mes > 0).astype(self.dtype)
+
+        cargas = np.tile(perfis.astype(self.dtype), (1, DIAS_MES.sum()))
+        cargas *= escala[:, self._meses_hora]
+        return cargas
+
+    def simular(self, anos: int = 1, ano_inicial: int = None, perfis_carga: Optional[np.ndarray] = None,
+                potencia_inversor_kw: float = None, latitude: float = -15.0) -> SimulacaoHoraria:
+        """
+        Executa a simulação horária no horizonte informado
+
+        potencia_inversor_kw: limite de potência CA; a geração horária acima dele é cortada
+        Os créditos (injeção horária) rolam mês a mês no livro de créditos do sistema,
+        sem alterar o histórico.
+        """
+        try:
+            if anos < 1:
+                raise ErroCalculoEnergia(f"Horizonte de simulação inválido: {anos}")
+            if ano_inicial is None:
+                ano_inicial = datetime.now().year
+
+            fatores = np.array([self.calculadora_solar.calcular_degradacao_anual(ano_inicial + i)
+                                for i in range(anos)], dtype=self.dtype)
+
+            cargas_unidades = self.montar_cargas_horarias(perfis_carga)
+            carga = cargas_unidades.sum(axis=0, dtype=self.dtype)
+
+            # Geração (anos × 8760) e corte do inversor (1 h → kWh = kW)
+            geracao_bruta = fatores[:, np.newaxis] * self.calcular_geracao_horaria(latitude)[np.newaxis, :]
+            if potencia_inversor_kw is not None:
+                geracao = np.minimum(geracao_bruta, self.dtype(potencia_inversor_kw))
+            else:
+                geracao = geracao_bruta
+
+            saldo = geracao - carga[np.newaxis, :]
+            injecao = np.maximum(saldo, 0)
+            importacao = np.maximum(-saldo, 0)
+
+            geracao_mes = agregar_por_mes(geracao)
+            creditos_gerados = agregar_por_mes(injecao)
+            consumo_rede = agregar_por_mes(importacao)
+
+            utilizados, expirados = self._rolar_creditos(creditos_gerados, consumo_rede, ano_inicial)
+
+            return SimulacaoHoraria(
+                ano_inicial=ano_inicial,
+                fatores_degradacao=fatores,
+                geracao_horaria_kwh=geracao,
+                carga_horaria_kwh=carga,
+                geracao_kwh=geracao_mes,
+                consumo_kwh=np.broadcast_to(agregar_por_mes(carga), (anos, MESES_ANO)),
+                autoconsumo_kwh=geracao_mes - creditos_gerados,
+                energia_injetada_kwh=creditos_gerados * self.config.percentual_injecao_rede,
+                energia_consumida_rede_kwh=consumo_rede,
+                creditos_gerados_kwh=creditos_gerados,
+                creditos_utilizados_kwh=utilizados,
+                creditos_expirados_kwh=expirados,
+                energia_limitada_inversor_kwh=agregar_por_mes(geracao_bruta - geracao),
+                demanda_maxima_rede_kw=np.maximum.reduceat(importacao, INICIO_MES_HORA, axis=-1),
+                demanda_maxima_unidades_kw=np.maximum.reduceat(cargas_unidades, INICIO_MES_HORA, axis=-1)
+            )
+
+        except ErroCalculoEnergia:
+            raise
+        except Exception as e:
+            raise ErroCalculoEnergia(f"Erro na simulação horária: {e}")
+
+    def montar_resultados_anuais(self, simulacao: SimulacaoHoraria) -> List[ResultadoAnualEnergia]:
+        """Agrega a simulação em ResultadoAnualEnergia / ResultadoMensalEnergia"""
+        geracao_teorica = self.motor.geracao_teorica
+        resultados = []
+
+        for i in range(simulacao.anos):
+            ano = simulacao.ano_inicial + i
+            colunas = {
+                nome: np.asarray(valores[i], dtype=float) for nome, valores in (
+                    ('geracao', simulacao.geracao_kwh),
+                    ('consumo', simulacao.consumo_kwh),
+                    ('creditos_gerados', simulacao.creditos_gerados_kwh),
+                    ('creditos_utilizados', simulacao.creditos_utilizados_kwh),
+                    ('creditos_expirados', simulacao.creditos_expirados_kwh),
+                    ('injetada', simulacao.energia_injetada_kwh),
+                    ('rede', simulacao.energia_consumida_rede_kwh)
+                )
+            }
+
+            geracao_maxima = self.config.potencia_instalada_kw * HORAS_DIA * dias_por_mes(ano)
+            fator_capacidade = np.minimum(1.0, np.divide(colunas['geracao'], geracao_maxima,
+                                                         out=np.zeros(MESES_ANO), where=geracao_maxima > 0))
+            eficiencia = np.minimum(1.0, np.divide(colunas['geracao'], geracao_teorica,
+                                                   out=np.zeros(MESES_ANO), where=geracao_teorica > 0))
+            perdas = np.maximum(0.0, geracao_teorica - colunas['geracao'])
+
+            mensais = [
+                ResultadoMensalEnergia(
+                    mes=mes + 1,
+                    geracao_kwh=float(colunas['geracao'][mes]),
+                    consumo_total_kwh=float(colunas['consumo'][mes]),
+                    saldo_kwh=float(colunas['geracao'][mes] - colunas['consumo'][mes]),
+                    creditos_gerados_kwh=float(colunas['creditos_gerados'][mes]),
+                    creditos_utilizados_kwh=float(colunas['creditos_utilizados'][mes]),
+                    energia_injetada_kwh=float(colunas['injetada'][mes]),
+                    energia_consumida_rede_kwh=float(colunas['rede'][mes]),
+                    fator_capacidade_real=float(fator_capacidade[mes]),
+                    eficiencia_real=float(eficiencia[mes]),
+                    perdas_kwh=float(perdas[mes]),
+                    creditos_expirados_kwh=float(colunas['creditos_expirados'][mes])
+                )
+                for mes in range(MESES_ANO)
+            ]
+
+            geracao_total = float(colunas['geracao'].sum())
+            consumo_total = float(colunas['consumo'].sum())
+
+            resultados.append(ResultadoAnualEnergia(
+                ano=ano,
+                geracao_total_kwh=geracao_total,
+                consumo_total_kwh=consumo_total,
+                saldo_anual_kwh=geracao_total - consumo_total,
+                creditos_acumulados_kwh=float(colunas['creditos_gerados'].sum()),
+                autossuficiencia_percentual=(min(100.0, geracao_total / consumo_total * 100)
+                                             if consumo_total > 0 else 0.0),
+                resultados_mensais=mensais,
+                fator_capacidade_medio=float(fator_capacidade.mean()),
+                eficiencia_media=float(eficiencia.mean()),
+                perdas_totais_kwh=float(perdas.sum())
+            ))
+
+        return resultados
+
+    # Métodos auxiliares privados
+
+    def _rolar_creditos(self, creditos_gerados: np.ndarray, consumo_rede: np.ndarray, ano_inicial: int):
+        """Rola créditos mensais no livro (cópia do histórico); retorna (utilizados, expirados)"""
+        livro = LivroCreditos(self.sistema.historico_creditos, self.config.validade_creditos_meses).copiar()
+
+        utilizados = np.zeros(creditos_gerados.shape)
+        expirados = np.zeros(creditos_gerados.shape)
+        gerados_lista = creditos_gerados.tolist()
+        rede_lista = consumo_rede.tolist()
+
+        for i in range(creditos_gerados.shape[0]):
+            for mes in range(MESES_ANO):
+                movimento = processar_creditos_mes(livro, mes + 1, ano_inicial + i,
+                                                   gerados_lista[i][mes], rede_lista[i][mes])
+                utilizados[i, mes] = movimento.creditos_utilizados_kwh
+                expirados[i, mes] = movimento.creditos_expirados_kwh
+
+        return utilizados, expirados
@@ -0,0 +1,167 @@
+"""
+VPL e TIR vetorizados para lotes de fluxos de caixa
+Resolve a TIR de milhares de séries de uma vez com Newton protegido por bisseção
+"""
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from nucleo.excecoes import ErroCalculoFinanceiro
+
+# Taxas usadas para procurar o intervalo com mudança de sinal do VPL
+TAXAS_BUSCA_INTERVALO = (-0.99, -0.9, -0.75, -0.5, -0.25, 0.0, 0.05, 0.1, 0.2,
+                         0.35, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 25.0, 100.0)
+
+
+class StatusTIR(IntEnum):
+    """Situação do cálculo da TIR de cada série"""
+    CONVERGIU = 0
+    SEM_MUDANCA_SINAL = 1  # VPL não muda de sinal no intervalo de busca
+    LIMITE_ITERACOES = 2
+    FLUXO_INVALIDO = 3     # Valores não finitos
+
+
+@dataclass
+class ResultadoTIR:
+    """TIR (fração) e status por série; taxas sem convergência são NaN"""
+    taxas: np.ndarray
+    status: np.ndarray
+    iteracoes: np.ndarray
+
+    @property
+    def convergiu(self) -> np.ndarray:
+        """Máscara das séries resolvidas"""
+        return self.status == StatusTIR.CONVERGIU
+
+    def __len__(self) -> int:
+        return len(self.taxas)
+
+
+def _preparar_fluxos(fluxos_caixa) -> np.ndarray:
+    """Converte para matriz (séries × períodos)"""
+    fluxos = np.asarray(fluxos_caixa, dtype=float)
+    if fluxos.ndim == 1:
+        fluxos = fluxos[np.newaxis, :]
+    if fluxos.ndim != 2 or fluxos.shape[1] == 0:
+        raise ErroCalculoFinanceiro("Fluxos de caixa devem ser uma matriz (séries × períodos)")
+    return fluxos
+
+
+def _vpl_e_derivada(fluxos: np.ndarray, taxas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    VPL e dVPL/dtaxa por série, pelo esquema de Horner em v = 1 / (1 + taxa)
+    O laço é sobre os períodos; cada passo opera sobre todas as séries
+    """
+    v = 1.0 / (1.0 + taxas)
+    vpl = np.zeros_like(v)
+    derivada_v = np.zeros_like(v)
+
+    for coluna in range(fluxos.shape[1] - 1, -1, -1):
+        derivada_v = derivada_v * v + vpl
+        vpl = vpl * v + fluxos[:, coluna]
+
+    return vpl, -derivada_v * v * v
+
+
+def calcular_vpl_lote(fluxos_caixa, taxas) -> np.ndarray:
+    """
+    VPL de cada série (período 0 sem desconto)
+    taxas: escalar ou uma taxa por série
+    """
+    fluxos = _preparar_fluxos(fluxos_caixa)
+    taxas = np.broadcast_to(np.asarray(taxas, dtype=float), (fluxos.shape[0],))
+    if np.any(taxas <= -1.0):
+        raise ErroCalculoFinanceiro("Taxa de desconto deve ser maior que -100%")
+
+    vpl, _ = _vpl_e_derivada(fluxos, taxas.copy())
+    return vpl
+
+
+def _buscar_intervalos(fluxos: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Procura, para cada série, o intervalo de taxas com mudança de sinal do VPL mais
+    próximo de 0%; retorna (inferior, superior, encontrado)
+    """
+    grade = np.asarray(TAXAS_BUSCA_INTERVALO)
+    vpl_grade = np.stack([_vpl_e_derivada(fluxos, np.full(fluxos.shape[0], taxa))[0] for taxa in grade],
+                         axis=1)
+
+    mudanca = np.signbit(vpl_grade[:, :-1]) != np.signbit(vpl_grade[:, 1:])
+    distancia = np.minimum(np.abs(grade[:-1]), np.abs(grade[1:]))
+    distancia = np.where(mudanca, distancia[np.newaxis, :], np.inf)
+
+    indice = np.argmin(distancia, axis=1)
+    encontrado = np.isfinite(distancia[np.arange(fluxos.shape[0]), indice])
+    return grade[indice], grade[indice + 1], encontrado
+
+
+def calcular_tir_lote(fluxos_caixa, tolerancia: float = 1e-10,
+                      max_iteracoes: int = 100) -> ResultadoTIR:
+    """
+    Calcula a TIR de cada série de fluxo de caixa (linhas da matriz)
+
+    Localiza um intervalo com mudança de sinal do VPL e itera Newton dentro dele,
+    recorrendo à bisseção quando o passo sai do intervalo. Séries sem mudança de
+    sinal recebem NaN e status SEM_MUDANCA_SINAL, em vez de um valor silencioso.
+    """
+    fluxos = _preparar_fluxos(fluxos_caixa)
+    n_series = fluxos.shape[0]
+
+    taxas = np.full(n_series, np.nan)
+    status = np.full(n_series, StatusTIR.LIMITE_ITERACOES, dtype=np.int8)
+    iteracoes = np.zeros(n_series, dtype=np.int32)
+
+    validas = np.isfinite(fluxos).all(axis=1)
+    status[~validas] = StatusTIR.FLUXO_INVALIDO
+
+    inferior, superior, encontrado = _buscar_intervalos(np.where(validas[:, np.newaxis], fluxos, 0.0))
+    status[validas & ~encontrado] = StatusTIR.SEM_MUDANCA_SINAL
+
+    ativas = np.flatnonzero(validas & encontrado)
+    a, b = inferior[ativas], superior[ativas]
+    vpl_a = _vpl_e_derivada(fluxos[ativas], a)[0]
+    x = (a + b) / 2
+    escala = np.maximum(np.abs(fluxos[ativas]).max(axis=1), 1.0)
+
+    for iteracao in range(1, max_iteracoes + 1):
+        if len(ativas) == 0:
+            break
+
+        vpl, derivada = _vpl_e_derivada(fluxos[ativas], x)
+
+        # Atualizar o intervalo mantendo a mudança de sinal
+        mesmo_sinal_a = np.signbit(vpl) == np.signbit(vpl_a)
+        a = np.where(mesmo_sinal_a, x, a)
+        vpl_a = np.where(mesmo_sinal_a, vpl, vpl_a)
+        b = np.where(mesmo_sinal_a, b, x)
+
+        # Passo de Newton, com bisseção quando sai do intervalo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_newton = x - vpl / derivada
+        fora = ~np.isfinite(x_newton) | (x_newton <= np.minimum(a, b)) | (x_newton >= np.maximum(a, b))
+        x_novo = np.where(fora, (a + b) / 2, x_newton)
+
+        resolvidas = (np.abs(vpl) <= tolerancia * escala) | (np.abs(x_novo - x) <= tolerancia * (1 + np.abs(x)))
+        indices = ativas[resolvidas]
+        taxas[indices] = np.where(np.abs(vpl[resolvidas]) <= tolerancia * escala[resolvidas],
+                                  x[resolvidas], x_novo[resolvidas])
+        status[indices] = StatusTIR.CONVERGIU
+        iteracoes[indices] = iteracao
+
+        restantes = ~resolvidas
+        ativas, a, b, vpl_a, x, escala = (
+            ativas[restantes], a[restantes], b[restantes], vpl_a[restantes],
+            x_novo[restantes], escala[restantes]
+        )
+
+    iteracoes[ativas] = max_iteracoes
+    return ResultadoTIR(taxas=taxas, status=status, iteracoes=iteracoes)
+
+
+def calcular_tir(fluxo_caixa: Sequence[float], tolerancia: float = 1e-10) -> Tuple[float, StatusTIR]:
+    """TIR (fração) e status de uma única série"""
+    resultado = calcular_tir_lote([fluxo_caixa], tolerancia)
+    return float(resultado.taxas[0]), StatusTIR(int(resultado.status[0]))
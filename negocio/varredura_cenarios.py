@@ -0,0 +1,342 @@
+"""
+Varredura de cenários sobre parâmetros da ConfiguracaoSistema
+Avalia KPIs energéticos e financeiros de milhares de variações em forma matricial
+(cenários × meses), com pool de processos para parâmetros não vetorizáveis
+"""
+
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, BandeiraTarifaria
+from nucleo.excecoes import ErroCalculoFinanceiro
+from negocio.motor_energia import MotorEnergia, MESES_ANO
+from negocio.livro_creditos import LivroCreditos, calcular_vencimento
+from negocio.fluxo_financeiro import (
+    ALIQUOTA_IMPOSTOS, calcular_adicional_bandeira, calcular_fatores_degradacao
+)
+from negocio.taxa_retorno import StatusTIR, calcular_tir_lote
+
+# Parâmetros avaliados diretamente nas matrizes; os demais vão para o pool de processos
+PARAMETROS_VETORIZADOS = frozenset({
+    'potencia_instalada_kw', 'eficiencia_sistema', 'perdas_sistema', 'fator_simultaneidade',
+    'tarifa_energia_kwh', 'tarifa_tusd_kwh', 'tarifa_te_kwh', 'custo_investimento', 'bandeira_atual'
+})
+
+# A partir deste número de cenários não vetorizáveis usa-se o pool de processos
+MINIMO_CENARIOS_POOL = 8
+
+
+def gerar_grade(**parametros: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Produto cartesiano dos valores informados
+    Ex.: gerar_grade(potencia_instalada_kw=[50, 100], custo_investimento=[1e5, 2e5])
+    """
+    nomes = list(parametros)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*parametros.values())]
+
+
+@dataclass
+class ResultadoVarredura:
+    """KPIs por cenário (vetores na ordem dos cenários informados)"""
+    cenarios: List[Dict[str, Any]]
+    geracao_anual_kwh: np.ndarray
+    consumo_anual_kwh: np.ndarray
+    autossuficiencia_percentual: np.ndarray
+    economia_anual: np.ndarray
+    payback_anos: np.ndarray
+    roi_percentual: np.ndarray
+    tir_percentual: np.ndarray  # NaN quando não há TIR (ver status_tir)
+    status_tir: np.ndarray
+    vetorizado: np.ndarray      # False para cenários avaliados no pool de processos
+
+    def __len__(self) -> int:
+        return len(self.cenarios)
+
+    def como_registros(self) -> List[Dict[str, Any]]:
+        """Um dicionário por cenário com os parâmetros e os KPIs"""
+        colunas = {
+            'geracao_anual_kwh': self.geracao_anual_kwh.tolist(),
+            'consumo_anual_kwh': self.consumo_anual_kwh.tolist(),
+            'autossuficiencia_percentual': self.autossuficiencia_percentual.tolist(),
+            'economia_anual': self.economia_anual.tolist(),
+            'payback_anos': self.payback_anos.tolist(),
+            'roi_percentual': self.roi_percentual.tolist(),
+            'tir_percentual': self.tir_percentual.tolist(),
+            'status_tir': [StatusTIR(int(s)).name for s in self.status_tir]
+        }
+        return [
+            {**cenario, **{nome: valores[i] for nome, valores in colunas.items()}}
+            for i, cenario in enumerate(self.cenarios)
+        ]
+
+    def melhor_cenario(self, kpi: str = 'economia_anual', maior: bool = True) -> Dict[str, Any]:
+        """Cenário com o melhor valor do KPI (NaN é ignorado)"""
+        valores = np.asarray(getattr(self, kpi), dtype=float)
+        indice = np.nanargmax(valores) if maior else np.nanargmin(valores)
+        return self.como_registros()[int(indice)]
+
+
+class VarreduraCenarios:
+    """
+    Avalia variações da configuração de um sistema sem alterá-lo
+
+    Os parâmetros de PARAMETROS_VETORIZADOS são avaliados em lote: geração, custos
+    e créditos de todos os cenários viram matrizes (cenários × 12) e a TIR é
+    resolvida de uma vez. A potência escala a geração mensal configurada na
+    proporção da potência base. Cenários com outros parâmetros são avaliados pelo
+    GerenciadorDistribuicao completo, em um pool de processos.
+    """
+
+    def __init__(self, sistema: SistemaEnergia, ano: int = None, anos_analise: int = 25):
+        self.sistema = sistema
+        self.config = sistema.configuracao
+        self.ano = ano if ano is not None else datetime.now().year
+        self.anos_analise = anos_analise
+
+    def avaliar(self, cenarios: List[Dict[str, Any]], processos: int = None) -> ResultadoVarredura:
+        """
+        Avalia a lista de sobrescritas de parâmetros
+        processos: máximo de processos do pool (1 avalia tudo no processo atual)
+        """
+        try:
+            campos_validos = {campo.name for campo in fields(ConfiguracaoSistema)}
+            for cenario in cenarios:
+                desconhecidos = set(cenario) - campos_validos
+                if desconhecidos:
+                    raise ErroCalculoFinanceiro(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+            vetorizaveis = np.array([set(c) <= PARAMETROS_VETORIZADOS for c in cenarios], dtype=bool)
+            kpis = {nome: np.full(len(cenarios), np.nan) for nome in (
+                'geracao_anual_kwh', 'consumo_anual_kwh', 'autossuficiencia_percentual',
+                'economia_anual', 'payback_anos', 'roi_percentual', 'tir_percentual'
+            )}
+            status_tir = np.full(len(cenarios), StatusTIR.SEM_MUDANCA_SINAL, dtype=np.int8)
+
+            indices = np.flatnonzero(vetorizaveis)
+            if len(indices):
+                parciais = self._avaliar_vetorizado([cenarios[i] for i in indices])
+                for nome, valores in parciais.items():
+                    if nome == 'status_tir':
+                        status_tir[indices] = valores
+                    else:
+                        kpis[nome][indices] = valores
+
+            indices = np.flatnonzero(~vetorizaveis)
+            if len(indices):
+                parciais = self._avaliar_completo([cenarios[i] for i in indices], processos)
+                for posicao, resultado in zip(indices, parciais):
+                    for nome, valor in resultado.items():
+                        if nome == 'status_tir':
+                            status_tir[posicao] = valor
+                        else:
+                            kpis[nome][posicao] = valor
+
+            return ResultadoVarredura(cenarios=list(cenarios), status_tir=status_tir,
+                                      vetorizado=vetorizaveis, **kpis)
+
+        except ErroCalculoFinanceiro:
+            raise
+        except Exception as e:
+            raise ErroCalculoFinanceiro(f"Erro ao avaliar cenários: {e}")
+
+    def avaliar_grade(self, processos: int = None, **parametros: Sequence[Any]) -> ResultadoVarredura:
+        """Avalia o produto cartesiano dos valores informados"""
+        return self.avaliar(gerar_grade(**parametros), processos)
+
+    # Métodos auxiliares privados
+
+    def _vetor_parametro(self, cenarios: List[Dict[str, Any]], nome: str) -> np.ndarray:
+        """Valor do parâmetro em cada cenário (padrão: valor da configuração base)"""
+        padrao = getattr(self.config, nome)
+        return np.array([c.get(nome, padrao) for c in cenarios], dtype=float)
+
+    def _vetor_adicional_bandeira(self, cenarios: List[Dict[str, Any]]) -> np.ndarray:
+        """Adicional de bandeira (R$/kWh) de cada cenário"""
+        adicionais = {bandeira: calcular_adicional_bandeira(self.config, bandeira) for bandeira in BandeiraTarifaria}
+        return np.array([
+            adicionais[BandeiraTarifaria(c.get('bandeira_atual', self.config.bandeira_atual))]
+            for c in cenarios
+        ])
+
+    def _avaliar_vetorizado(self, cenarios: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """KPIs dos cenários vetorizáveis em forma matricial (cenários × 12)"""
+        motor = MotorEnergia(self.sistema)
+        config = self.config
+
+        # Geração (cenários × 12)
+        potencia_base = config.potencia_instalada_kw
+        escala_potencia = (self._vetor_parametro(cenarios, 'potencia_instalada_kw') / potencia_base
+                           if potencia_base > 0 else np.ones(len(cenarios)))
+        fator_geracao = (self._vetor_parametro(cenarios, 'eficiencia_sistema')
+                         * (1 - self._vetor_parametro(cenarios, 'perdas_sistema'))
+                         * self._vetor_parametro(cenarios, 'fator_simultaneidade')
+                         * escala_potencia)
+        geracao = np.maximum(0.0, fator_geracao[:, np.newaxis] * motor.geracao_teorica[np.newaxis, :])
+
+        saldo = geracao - motor.consumo_efetivo[np.newaxis, :]
+        creditos_gerados = np.maximum(0.0, saldo)
+        consumo_rede = np.maximum(0.0, -saldo)
+
+        # Custos (mesma fórmula de calcular_custos_rede, com tarifas por cenário)
+        adicional = self._vetor_adicional_bandeira(cenarios)
+        tarifa_tusd = self._vetor_parametro(cenarios, 'tarifa_tusd_kwh')
+        tarifa_te = self._vetor_parametro(cenarios, 'tarifa_te_kwh')
+        tarifa_total = (self._vetor_parametro(cenarios, 'tarifa_energia_kwh') + adicional
+                        + tarifa_tusd + tarifa_te) * (1 + ALIQUOTA_IMPOSTOS)
+        taxa_disponibilidade = float(motor.taxas_unidades.sum())
+
+        custo_sem_solar = np.maximum(motor.consumo_total[np.newaxis, :] * tarifa_total[:, np.newaxis],
+                                     taxa_disponibilidade)
+        custo_com_solar = np.maximum(consumo_rede * tarifa_total[:, np.newaxis], taxa_disponibilidade)
+
+        creditos_utilizados = self._simular_creditos_lote(creditos_gerados, consumo_rede)
+        tarifa_credito = tarifa_tusd + tarifa_te + adicional
+        economia = (custo_sem_solar - custo_com_solar
+                    + creditos_utilizados * tarifa_credito[:, np.newaxis])
+
+        return self._calcular_kpis(geracao.sum(axis=1), float(motor.consumo_total.sum()),
+                                   economia.sum(axis=1),
+                                   self._vetor_parametro(cenarios, 'custo_investimento'))
+
+    def _simular_creditos_lote(self, creditos_gerados: np.ndarray, consumo_rede: np.ndarray) -> np.ndarray:
+        """
+        Créditos utilizados por mês em todos os cenários, com as mesmas regras do livro
+
+        Os vencimentos não dependem do cenário, então os lotes (histórico ativo +
+        12 novos) viram colunas ordenadas por vencimento; a cada mês vencem
+        colunas inteiras e o consumo FIFO é um cumsum ao longo das colunas.
+        """
+        livro = LivroCreditos(self.sistema.historico_creditos, self.config.validade_creditos_meses)
+        lotes_antigos = livro.obter_lotes_ativos()
+
+        vencimentos = [(c.ano_vencimento, c.mes_vencimento) for c in lotes_antigos]
+        for mes in range(1, MESES_ANO + 1):
+            mes_vencimento, ano_vencimento = calcular_vencimento(mes, self.ano, self.config.validade_creditos_meses)
+            vencimentos.append((ano_vencimento, mes_vencimento))
+        ordem = sorted(range(len(vencimentos)), key=lambda i: vencimentos[i])
+        coluna_lote = np.empty(len(ordem), dtype=int)
+        coluna_lote[ordem] = np.arange(len(ordem))
+        vencimentos_ordenados = [vencimentos[i] for i in ordem]
+
+        n_cenarios = creditos_gerados.shape[0]
+        saldos = np.zeros((n_cenarios, len(vencimentos)))
+        if lotes_antigos:
+            saldos[:, coluna_lote[:len(lotes_antigos)]] = [c.creditos_restantes_kwh for c in lotes_antigos]
+
+        utilizados = np.zeros_like(consumo_rede)
+        for indice in range(MESES_ANO):
+            referencia = (self.ano, indice + 1)
+            vencidos = [i for i, vencimento in enumerate(vencimentos_ordenados) if vencimento < referencia]
+            saldos[:, vencidos] = 0.0
+
+            demanda = consumo_rede[:, indice]
+            saldo_anterior = np.cumsum(saldos, axis=1) - saldos
+            consumo_lotes = np.clip(demanda[:, np.newaxis] - saldo_anterior, 0.0, saldos)
+            saldos -= consumo_lotes
+            utilizados[:, indice] = consumo_lotes.sum(axis=1)
+
+            saldos[:, coluna_lote[len(lotes_antigos) + indice]] += creditos_gerados[:, indice]
+
+        return utilizados
+
+    def _calcular_kpis(self, geracao_anual: np.ndarray, consumo_anual: float,
+                       economia_anual: np.ndarray, investimento: np.ndarray) -> Dict[str, np.ndarray]:
+        """Payback, ROI e TIR em lote a partir da economia anual"""
+        if consumo_anual > 0:
+            autossuficiencia = np.minimum(100.0, geracao_anual / consumo_anual * 100)
+        else:
+            autossuficiencia = np.zeros_like(geracao_anual)
+
+        com_investimento = investimento > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payback = np.where(economia_anual > 0, investimento / economia_anual, np.inf)
+            economias = economia_anual[:, np.newaxis] * calcular_fatores_degradacao(self.anos_analise)[np.newaxis, :]
+            roi = (economias.sum(axis=1) - investimento) / investimento * 100
+        payback = np.where(com_investimento, payback, 0.0)
+        roi = np.where(com_investimento, roi, 0.0)
+
+        resultado_tir = calcular_tir_lote(np.column_stack([-investimento, economias]))
+
+        return {
+            'geracao_anual_kwh': geracao_anual,
+            'consumo_anual_kwh': np.full(len(geracao_anual), consumo_anual),
+            'autossuficiencia_percentual': autossuficiencia,
+            'economia_anual': economia_anual,
+            'payback_anos': payback,
+            'roi_percentual': roi,
+            'tir_percentual': resultado_tir.taxas * 100,
+            'status_tir': resultado_tir.status
+        }
+
+    def _avaliar_completo(self, cenarios: List[Dict[str, Any]], processos: int = None) -> List[Dict[str, float]]:
+        """Avalia cenários pelo pipeline completo, em paralelo quando vale a pena"""
+        if processos == 1 or len(cenarios) < MINIMO_CENARIOS_POOL:
+            return [_avaliar_cenario_completo(cenario, self.sistema, self.ano, self.anos_analise)
+                    for cenario in cenarios]
+
+        # O sistema é enviado uma vez por processo, não uma vez por cenário
+        with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_worker,
+                                 initargs=(self.sistema, self.ano, self.anos_analise)) as executor:
+            return list(executor.map(_avaliar_cenario_worker, cenarios,
+                                     chunksize=max(1, len(cenarios) // 32)))
+
+
+# Contexto dos processos do pool (sistema base, ano, anos de análise)
+_contexto_worker = None
+
+
+def _inicializar_worker(sistema: SistemaEnergia, ano: int, anos_analise: int):
+    """Guarda o contexto compartilhado no processo do pool"""
+    global _contexto_worker
+    _contexto_worker = (sistema, ano, anos_analise)
+
+
+def _avaliar_cenario_worker(cenario: Dict[str, Any]) -> Dict[str, float]:
+    """Avalia um cenário com o contexto do processo do pool"""
+    return _avaliar_cenario_completo(cenario, *_contexto_worker)
+
+
+def _avaliar_cenario_completo(cenario: Dict[str, Any], sistema_base: SistemaEnergia,
+                              ano: int, anos_analise: int) -> Dict[str, float]:
+    """Aplica as sobrescritas em uma cópia do sistema e roda o pipeline completo"""
+    from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+
+    sistema = copy.deepcopy(sistema_base)
+    config = sistema.configuracao
+
+    # Mesma convenção da avaliação vetorizada: a potência escala a geração configurada
+    if 'potencia_instalada_kw' in cenario and 'geracao_mensal_kwh' not in cenario and config.potencia_instalada_kw > 0:
+        escala = cenario['potencia_instalada_kw'] / config.potencia_instalada_kw
+        config.geracao_mensal_kwh = [g * escala for g in config.geracao_mensal_kwh]
+
+    for nome, valor in cenario.items():
+        if nome == 'bandeira_atual':
+            valor = BandeiraTarifaria(valor)
+        setattr(config, nome, valor)
+
+    gerenciador = GerenciadorDistribuicao(sistema)
+    motor = gerenciador.calculadora_energia.criar_motor()
+    fluxo = gerenciador.calcular_fluxo_financeiro_anual(ano)
+
+    resultado_tir = calcular_tir_lote(fluxo.montar_fluxo_caixa(config.custo_investimento, anos_analise))
+
+    geracao_anual = float(motor.geracao.sum())
+    consumo_anual = float(motor.consumo_total.sum())
+
+    return {
+        'geracao_anual_kwh': geracao_anual,
+        'consumo_anual_kwh': consumo_anual,
+        'autossuficiencia_percentual': (min(100.0, geracao_anual / consumo_anual * 100)
+                                        if consumo_anual > 0 else 0.0),
+        'economia_anual': fluxo.economia_anual,
+        'payback_anos': gerenciador.calcular_payback_simples(fluxo),
+        'roi_percentual': gerenciador.calcular_roi_percentual(anos_analise, fluxo),
+        'tir_percentual': float(resultado_tir.taxas[0]) * 100,
+        'status_tir': int(resultado_tir.status[0])
+    }
@@ -8,6 +8,9 @@ from enum import Enum
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import json
+import weakref
+
+from nucleo.rastreamento import Rastreavel, Rastreador, ListaRastreada
 
 
 class TipoLigacao(Enum):
@@ -17,6 +20,14 @@ class TipoLigacao(Enum):
     TRIFASICA = "trifasica"
 
 
+# Consumo mínimo faturado (kWh) por tipo de ligação
+TAXAS_DISPONIBILIDADE = {
+    TipoLigacao.MONOFASICA: 30.0,
+    TipoLigacao.BIFASICA: 50.0,
+    TipoLigacao.TRIFASICA: 100.0
+}
+
+
 class BandeiraTarifaria(Enum):
     """Bandeiras tarifárias"""
     VERDE = "verde"
@@ -36,7 +47,7 @@ class TipoUnidade(Enum):
 
 
 @dataclass
-class ConfiguracaoSistema:
+class ConfiguracaoSistema(Rastreavel):
     """Configurações gerais do sistema fotovoltaico"""
     # Configurações básicas
     potencia_instalada_kw: float = 100.0
@@ -76,7 +87,7 @@ class ConfiguracaoSistema:
 
 
 @dataclass
-class UnidadeConsumidora:
+class UnidadeConsumidora(Rastreavel):
     """Unidade consumidora de energia"""
     id: str
     nome: str
@@ -101,14 +112,24 @@ class UnidadeConsumidora:
     percentual_energia_alocada: float = 0.0
     prioridade_distribuicao: int = 1
 
+    # Campos usados pelos índices do SistemaEnergia; alterá-los invalida os índices
+    # dos sistemas que indexaram a unidade (referências fracas em _indexadores)
+    _campos_indexados = frozenset({'id', 'ativa', 'tipo_ligacao'})
+    _indexadores = ()
+
+    def __setattr__(self, nome: str, valor: Any):
+        if nome in UnidadeConsumidora._campos_indexados and self._indexadores:
+            self._invalidar_indices()
+        super().__setattr__(nome, valor)
+
+    def __getstate__(self):
+        estado = super().__getstate__()
+        estado.pop('_indexadores', None)
+        return estado
+
     def get_taxa_disponibilidade(self) -> float:
         """Retorna taxa de disponibilidade baseada no tipo de ligação"""
-        taxas = {
-            TipoLigacao.MONOFASICA: 30.0,
-            TipoLigacao.BIFASICA: 50.0,
-            TipoLigacao.TRIFASICA: 100.0
-        }
-        return taxas.get(self.tipo_ligacao, 30.0)
+        return TAXAS_DISPONIBILIDADE.get(self.tipo_ligacao, 30.0)
 
     def get_consumo_total_anual(self) -> float:
         """Retorna consumo total anual em kWh"""
@@ -119,6 +140,24 @@ class UnidadeConsumidora:
         consumos_validos = [c for c in self.consumo_mensal_kwh if c > 0]
         return sum(consumos_validos) / len(consumos_validos) if consumos_validos else 0.0
 
+    # Métodos auxiliares privados
+
+    def _vincular_indice(self, referencia: weakref.ref):
+        """Registra o sistema (referência fraca) cujo índice contém a unidade"""
+        vinculos = self._indexadores
+        for vinculo in vinculos:
+            if vinculo is referencia:
+                return
+        vinculos = tuple(v for v in vinculos if v() is not None)
+        object.__setattr__(self, '_indexadores', vinculos + (referencia,))
+
+    def _invalidar_indices(self):
+        """Invalida os índices dos sistemas que contêm a unidade"""
+        for vinculo in self._indexadores:
+            sistema = vinculo()
+            if sistema is not None:
+                sistema._invalidar_indice()
+
 
 @dataclass
 class ResultadoMensalEnergia:
@@ -137,6 +176,9 @@ class ResultadoMensalEnergia:
     eficiencia_real: float = 0.0
     perdas_kwh: float = 0.0
 
+    # Créditos vencidos no mês (projeções de longo prazo)
+    creditos_expirados_kwh: float = 0.0
+
 
 @dataclass
 class ResultadoMensalFinanceiro:
@@ -222,7 +264,17 @@ class ConfiguracaoRelatorio:
 
 
 @dataclass
-class SistemaEnergia:
+class _IndiceUnidades:
+    """Índices derivados da lista de unidades de um SistemaEnergia"""
+    versao: int
+    por_id: Dict[str, UnidadeConsumidora]
+    ativas: List[UnidadeConsumidora]
+    contagem_por_ligacao: Dict[TipoLigacao, int]
+    taxa_disponibilidade_total: float
+
+
+@dataclass
+class SistemaEnergia(Rastreavel):
     """Sistema completo de energia solar"""
     configuracao: ConfiguracaoSistema
     unidades: List[UnidadeConsumidora]
@@ -238,20 +290,75 @@ class SistemaEnergia:
     dados_importacao: Dict[str, Any] = field(default_factory=dict)
     configuracoes_avancadas: Dict[str, Any] = field(default_factory=dict)
 
+    # Metadados e histórico (alterado no lugar pelo gerenciador) não contam como alteração
+    _campos_nao_rastreados = frozenset({
+        'historico_creditos', 'versao_sistema', 'data_criacao', 'data_ultima_atualizacao'
+    })
+
+    def __setattr__(self, nome: str, valor: Any):
+        if nome == 'unidades':
+            # A lista sempre avisa o sistema quando é alterada no lugar (índices)
+            if not (isinstance(valor, ListaRastreada) and valor._dono is self):
+                valor = ListaRastreada(valor, self, 'unidades')
+            self._invalidar_indice()
+        super().__setattr__(nome, valor)
+        # Unidades ou configuração substituídas passam a ser rastreadas
+        rastreador = self._rastreador
+        if rastreador is not None and nome in ('unidades', 'configuracao'):
+            self._rastrear_filhos(rastreador)
+
+    def ativar_rastreamento(self, pai: Optional[Rastreador] = None) -> Rastreador:
+        """Liga o rastreamento no sistema, na configuração e em todas as unidades"""
+        rastreador = super().ativar_rastreamento(pai)
+        self._rastrear_filhos(rastreador)
+        return rastreador
+
+    def desativar_rastreamento(self):
+        """Desliga o rastreamento no sistema e nos filhos"""
+        self.configuracao.desativar_rastreamento()
+        for unidade in self.unidades:
+            unidade.desativar_rastreamento()
+        super().desativar_rastreamento()
+        self.unidades = self.unidades
+
     def atualizar_timestamp(self):
         """Atualiza timestamp da última modificação"""
         self.data_ultima_atualizacao = datetime.now().isoformat()
 
     def get_unidade_por_id(self, id_unidade: str) -> Optional[UnidadeConsumidora]:
         """Busca unidade por ID"""
-        for unidade in self.unidades:
-            if unidade.id == id_unidade:
-                return unidade
-        return None
+        return self._obter_indice().por_id.get(id_unidade)
 
     def get_unidades_ativas(self) -> List[UnidadeConsumidora]:
-        """Retorna apenas unidades ativas"""
-        return [u for u in self.unidades if u.ativa]
+        """Retorna apenas unidades ativas (lista compartilhada, não alterar)"""
+        return self._obter_indice().ativas
+
+    def get_contagem_por_ligacao(self) -> Dict[TipoLigacao, int]:
+        """Quantidade de unidades ativas por tipo de ligação"""
+        return dict(self._obter_indice().contagem_por_ligacao)
+
+    def get_taxa_disponibilidade_total(self) -> float:
+        """Soma das taxas de disponibilidade (kWh) das unidades ativas"""
+        return self._obter_indice().taxa_disponibilidade_total
+
+    def adicionar_unidade(self, unidade: UnidadeConsumidora):
+        """Inclui uma unidade no sistema"""
+        self.unidades.append(unidade)
+
+    def remover_unidade(self, id_unidade: str) -> Optional[UnidadeConsumidora]:
+        """Remove a unidade pelo ID, retornando-a (None se não existir)"""
+        unidade = self.get_unidade_por_id(id_unidade)
+        if unidade is not None:
+            self.unidades.remove(unidade)
+        return unidade
+
+    def definir_unidade_ativa(self, id_unidade: str, ativa: bool) -> bool:
+        """Ativa ou desativa a unidade pelo ID; retorna False se não existir"""
+        unidade = self.get_unidade_por_id(id_unidade)
+        if unidade is None:
+            return False
+        unidade.ativa = ativa
+        return True
 
     def get_consumo_total_sistema(self) -> float:
         """Retorna consumo total anual do sistema"""
@@ -282,6 +389,70 @@ class SistemaEnergia:
 
         return erros
 
+    # Métodos auxiliares privados
+
+    def __getstate__(self):
+        estado = super().__getstate__()
+        estado.pop('_indice', None)
+        estado.pop('_versao_unidades', None)
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        # Cópias (pickle/deepcopy) recebem a lista como list comum
+        self.unidades = self.unidades
+
+    def _invalidar_indice(self):
+        """Incrementa a versão da lista de unidades deste sistema"""
+        self.__dict__['_versao_unidades'] = self.__dict__.get('_versao_unidades', 0) + 1
+
+    def _obter_indice(self) -> _IndiceUnidades:
+        """
+        Índices das unidades, reconstruídos apenas quando a versão do sistema muda:
+        lista substituída ou alterada no lugar, ou campo indexado de uma unidade
+        """
+        versao = self.__dict__.get('_versao_unidades', 0)
+        indice = self.__dict__.get('_indice')
+        if indice is not None and indice.versao == versao:
+            return indice
+
+        referencia = weakref.ref(self)
+        por_id = {}
+        for unidade in self.unidades:
+            por_id.setdefault(unidade.id, unidade)
+            unidade._vincular_indice(referencia)
+
+        ativas = [u for u in self.unidades if u.ativa]
+        contagem = {}
+        for unidade in ativas:
+            contagem[unidade.tipo_ligacao] = contagem.get(unidade.tipo_ligacao, 0) + 1
+
+        indice = _IndiceUnidades(
+            versao=versao,
+            por_id=por_id,
+            ativas=ativas,
+            contagem_por_ligacao=contagem,
+            taxa_disponibilidade_total=sum(u.get_taxa_disponibilidade() for u in ativas)
+        )
+        self.__dict__['_indice'] = indice
+        return indice
+
+    def _rastrear_filhos(self, rastreador: Rastreador):
+        """Liga configuração e unidades ao rastreador do sistema"""
+        self.configuracao.ativar_rastreamento(rastreador)
+        for unidade in self.unidades:
+            unidade.ativar_rastreamento(rastreador)
+
+    def _alteracao_lista(self, campo: str, lista, adicionados: tuple):
+        """Alterações na lista de unidades invalidam os índices; só as incluídas passam a ser rastreadas"""
+        if campo == 'unidades':
+            self._invalidar_indice()
+            rastreador = self._rastreador
+            if rastreador is not None:
+                for unidade in adicionados:
+                    unidade.ativar_rastreamento(rastreador)
+        super()._alteracao_lista(campo, lista, adicionados)
+
 
 # Funções auxiliares para compatibilidade com sistema legacy
 def criar_sistema_exemplo_legacy() -> SistemaEnergia:
@@ -0,0 +1,210 @@
+"""
+Rastreamento opcional de alterações nos modelos
+Contadores de versão por objeto e notificação de inscritos, sem polling
+"""
+
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+_AUSENTE = object()
+
+
+@dataclass
+class EventoAlteracao:
+    """Alteração de um campo de um objeto rastreado"""
+    objeto: Any
+    campo: str
+    valor_anterior: Any
+    valor_novo: Any
+
+
+class Rastreador:
+    """
+    Estado de rastreamento de um objeto: versão, inscritos e rastreador pai
+
+    Eventos sobem para o pai (ex.: unidade → sistema), que também incrementa sua
+    versão. Não é copiado nem serializado junto com o objeto.
+    """
+
+    def __init__(self, pai: 'Rastreador' = None):
+        self.versao = 0
+        self.pai = pai
+        self.inscritos: List[Callable[[EventoAlteracao], None]] = []
+
+    def registrar(self, evento: EventoAlteracao):
+        """Incrementa a versão e notifica inscritos e pai"""
+        self.versao += 1
+        for callback in list(self.inscritos):
+            callback(evento)
+        if self.pai is not None:
+            self.pai.registrar(evento)
+
+    def __deepcopy__(self, memo):
+        return None
+
+    def __reduce__(self):
+        return (type(self), ())
+
+
+class ListaRastreada(list):
+    """
+    Lista que avisa o objeto dono quando é alterada no lugar
+    (ex.: unidade.consumo_mensal_kwh[0] = 500). Cópias são listas comuns.
+    """
+
+    def __init__(self, valores=(), dono: 'Rastreavel' = None, campo: str = None):
+        super().__init__(valores)
+        self._dono = dono
+        self._campo = campo
+
+    def __reduce_ex__(self, protocolo):
+        return (list, (list(self),))
+
+    def _notificar(self, adicionados: Tuple[Any, ...] = ()):
+        if self._dono is not None:
+            self._dono._alteracao_lista(self._campo, self, adicionados)
+
+
+def _metodo_notificador(nome: str):
+    metodo = getattr(list, nome)
+
+    def notificador(self, *args, **kwargs):
+        resultado = metodo(self, *args, **kwargs)
+        self._notificar()
+        return resultado
+
+    notificador.__name__ = nome
+    return notificador
+
+
+def _metodo_notificador_inclusao(nome: str, posicao: int, varios: bool):
+    """Notificador de métodos que incluem itens (args[posicao]: item ou iterável de itens)"""
+    metodo = getattr(list, nome)
+
+    def notificador(self, *args):
+        itens = args[posicao]
+        if varios or (nome == '__setitem__' and isinstance(args[0], slice)):
+            # Iteráveis são consumidos uma única vez
+            itens = tuple(itens)
+            args = args[:posicao] + (itens,) + args[posicao + 1:]
+        else:
+            itens = (itens,)
+        resultado = metodo(self, *args)
+        self._notificar(itens)
+        return resultado
+
+    notificador.__name__ = nome
+    return notificador
+
+
+for _nome in ('__delitem__', '__imul__', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(ListaRastreada, _nome, _metodo_notificador(_nome))
+
+for _nome, _posicao, _varios in (('__setitem__', 1, False), ('__iadd__', 0, True), ('append', 0, False),
+                                 ('extend', 0, True), ('insert', 1, False)):
+    setattr(ListaRastreada, _nome, _metodo_notificador_inclusao(_nome, _posicao, _varios))
+
+
+class Rastreavel:
+    """
+    Mixin de rastreamento opcional para os dataclasses do modelo
+
+    Desligado por padrão (custo de uma consulta de atributo por atribuição).
+    Após ativar_rastreamento, cada atribuição que muda um campo — ou alteração
+    no lugar de um campo lista — incrementa a versão do objeto e notifica os
+    inscritos com um EventoAlteracao. Compatível com classes que usam __slots__
+    (desde que declarem o slot '_rastreador' e o preencham antes dos demais campos).
+    """
+
+    __slots__ = ()
+
+    # Sem rastreamento até ativar_rastreamento (evita exceção no getattr)
+    _rastreador = None
+
+    # Campos de metadados que não invalidam cálculos
+    _campos_nao_rastreados = frozenset()
+
+    def __setattr__(self, nome: str, valor: Any):
+        rastreador = self._rastreador
+        if rastreador is None or nome.startswith('_') or nome in self._campos_nao_rastreados:
+            object.__setattr__(self, nome, valor)
+            return
+
+        anterior = getattr(self, nome, _AUSENTE)
+        if isinstance(valor, list) and nome in self._campos_lista() and not (
+                isinstance(valor, ListaRastreada) and valor._dono is self and valor._campo == nome):
+            valor = ListaRastreada(valor, self, nome)
+        object.__setattr__(self, nome, valor)
+
+        try:
+            alterado = anterior is _AUSENTE or bool(anterior != valor)
+        except Exception:
+            alterado = True
+        if alterado:
+            self._registrar_alteracao(nome, None if anterior is _AUSENTE else anterior, valor)
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado.pop('_rastreador', None)
+        return estado
+
+    @property
+    def rastreamento_ativo(self) -> bool:
+        """Indica se o objeto está sendo rastreado"""
+        return getattr(self, '_rastreador', None) is not None
+
+    @property
+    def versao(self) -> int:
+        """Contador de alterações (0 sem rastreamento)"""
+        rastreador = getattr(self, '_rastreador', None)
+        return rastreador.versao if rastreador is not None else 0
+
+    def ativar_rastreamento(self, pai: Optional[Rastreador] = None) -> Rastreador:
+        """Liga o rastreamento (idempotente) e retorna o rastreador do objeto"""
+        rastreador = getattr(self, '_rastreador', None)
+        if rastreador is None:
+            rastreador = Rastreador(pai)
+            object.__setattr__(self, '_rastreador', rastreador)
+
+            for nome in self._campos_lista():
+                valor = getattr(self, nome, None)
+                if isinstance(valor, list):
+                    object.__setattr__(self, nome, ListaRastreada(valor, self, nome))
+        elif pai is not None:
+            rastreador.pai = pai
+
+        return rastreador
+
+    def desativar_rastreamento(self):
+        """Desliga o rastreamento, mantendo os valores atuais"""
+        for nome in self._campos_lista():
+            valor = getattr(self, nome, None)
+            if isinstance(valor, ListaRastreada):
+                object.__setattr__(self, nome, list(valor))
+        object.__setattr__(self, '_rastreador', None)
+
+    def inscrever(self, callback: Callable[[EventoAlteracao], None]):
+        """Registra callback para alterações neste objeto (e nos filhos rastreados)"""
+        self.ativar_rastreamento().inscritos.append(callback)
+
+    def desinscrever(self, callback: Callable[[EventoAlteracao], None]):
+        """Remove callback registrado"""
+        rastreador = getattr(self, '_rastreador', None)
+        if rastreador is not None and callback in rastreador.inscritos:
+            rastreador.inscritos.remove(callback)
+
+    def _alteracao_lista(self, campo: str, lista: ListaRastreada, adicionados: Tuple[Any, ...]):
+        """Alteração no lugar de um campo lista (adicionados: itens incluídos pela operação)"""
+        self._registrar_alteracao(campo, None, lista)
+
+    def _registrar_alteracao(self, campo: str, anterior: Any, novo: Any):
+        """Propaga a alteração para o rastreador"""
+        rastreador = getattr(self, '_rastreador', None)
+        if rastreador is not None:
+            rastreador.registrar(EventoAlteracao(self, campo, anterior, novo))
+
+    def _campos_lista(self) -> Tuple[str, ...]:
+        """Campos de dataclass que podem conter listas alteradas no lugar"""
+        if not is_dataclass(self):
+            return ()
+        return tuple(c.name for c in fields(self) if c.name not in self._campos_nao_rastreados)
@@ -0,0 +1,270 @@
+"""
+Armazenamento compacto de unidades consumidoras
+Unidades com __slots__ cujo consumo mensal fica em um array contíguo
+compartilhado (unidades × 12), para sistemas com dezenas de milhares de unidades
+"""
+
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from nucleo.modelos import SistemaEnergia, UnidadeConsumidora, TipoLigacao, TipoUnidade
+from nucleo.excecoes import ErroUnidadeConsumidora
+from nucleo.rastreamento import Rastreavel
+
+MESES_ANO = 12
+
+
+class TabelaConsumo:
+    """
+    Consumo mensal de várias unidades em um único array (linhas × 12)
+
+    A capacidade cresce por duplicação; linhas de unidades descartadas não são
+    reaproveitadas.
+    """
+
+    def __init__(self, capacidade: int = 0, dtype=np.float64):
+        self._valores = np.zeros((max(int(capacidade), 1), MESES_ANO), dtype=dtype)
+        self._linhas = 0
+
+    @property
+    def valores(self) -> np.ndarray:
+        """Linhas ocupadas (visão, sem cópia)"""
+        return self._valores[:self._linhas]
+
+    @property
+    def dtype(self):
+        return self._valores.dtype
+
+    def __len__(self) -> int:
+        return self._linhas
+
+    def alocar(self, consumos: Sequence[float]) -> int:
+        """Reserva uma linha com os consumos informados e retorna seu índice"""
+        return self.alocar_lote(np.asarray(consumos, dtype=float).reshape(1, -1))
+
+    def alocar_lote(self, matriz: np.ndarray) -> int:
+        """Reserva várias linhas de uma vez; retorna o índice da primeira"""
+        matriz = np.asarray(matriz, dtype=float)
+        if matriz.ndim != 2 or matriz.shape[1] != MESES_ANO:
+            raise ErroUnidadeConsumidora(f"Consumo mensal deve ter {MESES_ANO} valores")
+
+        inicio = self._linhas
+        fim = inicio + matriz.shape[0]
+        if fim > self._valores.shape[0]:
+            nova = np.zeros((max(fim, 2 * self._valores.shape[0]), MESES_ANO), dtype=self._valores.dtype)
+            nova[:inicio] = self._valores[:inicio]
+            self._valores = nova
+
+        self._valores[inicio:fim] = matriz
+        self._linhas = fim
+        return inicio
+
+    def linha(self, indice: int) -> np.ndarray:
+        """Visão da linha de uma unidade"""
+        return self._valores[indice]
+
+    def selecionar(self, indices: Sequence[int]) -> np.ndarray:
+        """Cópia das linhas informadas (matriz unidades × 12)"""
+        return self._valores[np.asarray(indices, dtype=np.intp)].astype(float, copy=False)
+
+
+class LinhaConsumo:
+    """
+    Visão de lista sobre a linha de uma unidade na TabelaConsumo
+
+    Leitura e escrita por índice vão direto ao array; fatias e cópias
+    (list(), tuple()) retornam valores float comuns.
+    """
+
+    __slots__ = ('_unidade',)
+
+    def __init__(self, unidade: 'UnidadeCompacta'):
+        self._unidade = unidade
+
+    def _linha(self) -> np.ndarray:
+        return self._unidade._tabela.linha(self._unidade._linha)
+
+    def __len__(self) -> int:
+        return MESES_ANO
+
+    def __getitem__(self, indice):
+        valor = self._linha()[indice]
+        return valor.tolist()
+
+    def __setitem__(self, indice, valor):
+        self._linha()[indice] = valor
+        self._unidade._registrar_alteracao('consumo_mensal_kwh', None, self)
+
+    def __iter__(self):
+        return iter(self._linha().tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self._linha(), dtype=dtype)
+
+    def __eq__(self, outro) -> bool:
+        try:
+            return list(self) == list(outro)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class UnidadeCompacta(Rastreavel):
+    """
+    Unidade consumidora com __slots__ e consumo armazenado em uma TabelaConsumo
+
+    Expõe os mesmos atributos e métodos de UnidadeConsumidora;
+    consumo_mensal_kwh é uma LinhaConsumo (visão do array compartilhado).
+    """
+
+    __slots__ = ('id', 'nome', 'tipo_ligacao', 'tipo_unidade', 'ativa', 'endereco', 'cidade', 'estado',
+                 'cep', 'demanda_contratada_kw', 'grupo_tarifario', 'percentual_energia_alocada',
+                 'prioridade_distribuicao', '_tabela', '_linha', '_rastreador', '_indexadores')
+
+    # Campos exportados (mesma ordem de UnidadeConsumidora)
+    CAMPOS = ('id', 'nome', 'tipo_ligacao', 'tipo_unidade', 'ativa', 'endereco', 'cidade', 'estado', 'cep',
+              'demanda_contratada_kw', 'grupo_tarifario', 'consumo_mensal_kwh',
+              'percentual_energia_alocada', 'prioridade_distribuicao')
+
+    def __init__(self, id: str, nome: str, tipo_ligacao: TipoLigacao,
+                 tipo_unidade: TipoUnidade = TipoUnidade.RESIDENCIAL, ativa: bool = True,
+                 endereco: str = "", cidade: str = "", estado: str = "", cep: str = "",
+                 demanda_contratada_kw: float = 0.0, grupo_tarifario: str = "B1",
+                 consumo_mensal_kwh: Optional[Sequence[float]] = None,
+                 percentual_energia_alocada: float = 0.0, prioridade_distribuicao: int = 1,
+                 tabela: Optional[TabelaConsumo] = None, linha: Optional[int] = None):
+        object.__setattr__(self, '_rastreador', None)
+        object.__setattr__(self, '_indexadores', ())
+        object.__setattr__(self, '_tabela', tabela if tabela is not None else TabelaConsumo(1))
+
+        # Linha já preenchida (compactação em lote) ou nova linha
+        if linha is None:
+            linha = self._tabela.alocar(consumo_mensal_kwh if consumo_mensal_kwh is not None else [0.0] * MESES_ANO)
+        object.__setattr__(self, '_linha', linha)
+
+        self.id = id
+        self.nome = nome
+        self.tipo_ligacao = tipo_ligacao
+        self.tipo_unidade = tipo_unidade
+        self.ativa = ativa
+        self.endereco = endereco
+        self.cidade = cidade
+        self.estado = estado
+        self.cep = cep
+        self.demanda_contratada_kw = demanda_contratada_kw
+        self.grupo_tarifario = grupo_tarifario
+        self.percentual_energia_alocada = percentual_energia_alocada
+        self.prioridade_distribuicao = prioridade_distribuicao
+
+    @classmethod
+    def de_unidade(cls, unidade: UnidadeConsumidora, tabela: TabelaConsumo,
+                   linha: Optional[int] = None) -> 'UnidadeCompacta':
+        """Cria a versão compacta de uma UnidadeConsumidora"""
+        campos = {nome: getattr(unidade, nome) for nome in cls.CAMPOS}
+        return cls(**campos, tabela=tabela, linha=linha)
+
+    def para_unidade(self) -> UnidadeConsumidora:
+        """Converte de volta para UnidadeConsumidora (dataclass)"""
+        campos = {nome: getattr(self, nome) for nome in self.CAMPOS}
+        campos['consumo_mensal_kwh'] = list(self.consumo_mensal_kwh)
+        return UnidadeConsumidora(**campos)
+
+    def __setattr__(self, nome: str, valor: Any):
+        # Mantém válidos os índices do SistemaEnergia (ver UnidadeConsumidora)
+        if nome in UnidadeConsumidora._campos_indexados and self._indexadores:
+            self._invalidar_indices()
+        super().__setattr__(nome, valor)
+
+    @property
+    def consumo_mensal_kwh(self) -> LinhaConsumo:
+        """Consumo mensal (visão sobre a tabela compartilhada)"""
+        return LinhaConsumo(self)
+
+    @consumo_mensal_kwh.setter
+    def consumo_mensal_kwh(self, valores: Sequence[float]):
+        valores = np.asarray(valores, dtype=float)
+        if valores.shape != (MESES_ANO,):
+            raise ErroUnidadeConsumidora(f"Consumo mensal deve ter {MESES_ANO} valores")
+        self._tabela.linha(self._linha)[:] = valores
+        self._registrar_alteracao('consumo_mensal_kwh', None, self.consumo_mensal_kwh)
+
+    # Mesmos métodos de UnidadeConsumidora
+    get_taxa_disponibilidade = UnidadeConsumidora.get_taxa_disponibilidade
+
+    def get_consumo_total_anual(self) -> float:
+        """Retorna consumo total anual em kWh"""
+        return float(self._tabela.linha(self._linha).sum())
+
+    get_consumo_medio_mensal = UnidadeConsumidora.get_consumo_medio_mensal
+
+    _vincular_indice = UnidadeConsumidora._vincular_indice
+    _invalidar_indices = UnidadeConsumidora._invalidar_indices
+
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, (UnidadeCompacta, UnidadeConsumidora)):
+            return NotImplemented
+        return all(getattr(self, nome) == getattr(outro, nome) for nome in self.CAMPOS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"UnidadeCompacta(id={self.id!r}, nome={self.nome!r}, ativa={self.ativa!r})"
+
+    def __getstate__(self):
+        # A tabela é serializada uma única vez quando compartilhada (memo do pickle/deepcopy)
+        return {nome: getattr(self, nome) for nome in self.__slots__ if nome not in ('_rastreador', '_indexadores')}
+
+    def __setstate__(self, estado):
+        object.__setattr__(self, '_rastreador', None)
+        object.__setattr__(self, '_indexadores', ())
+        for nome, valor in estado.items():
+            object.__setattr__(self, nome, valor)
+
+
+def compactar_unidades(unidades: Iterable[UnidadeConsumidora], dtype=np.float64) -> List[UnidadeCompacta]:
+    """Converte unidades para a forma compacta, com todos os consumos em uma única tabela"""
+    unidades = list(unidades)
+    tabela = TabelaConsumo(len(unidades), dtype)
+    if not unidades:
+        return []
+
+    inicio = tabela.alocar_lote(np.array([list(u.consumo_mensal_kwh) for u in unidades], dtype=float))
+    return [UnidadeCompacta.de_unidade(u, tabela, inicio + i) for i, u in enumerate(unidades)]
+
+
+def expandir_unidades(unidades: Iterable[Any]) -> List[UnidadeConsumidora]:
+    """Converte unidades compactas de volta para UnidadeConsumidora"""
+    return [u.para_unidade() if isinstance(u, UnidadeCompacta) else u for u in unidades]
+
+
+def compactar_sistema(sistema: SistemaEnergia, dtype=np.float64) -> SistemaEnergia:
+    """Substitui as unidades do sistema pela forma compacta (no lugar)"""
+    sistema.unidades = compactar_unidades(sistema.unidades, dtype)
+    return sistema
+
+
+def expandir_sistema(sistema: SistemaEnergia) -> SistemaEnergia:
+    """Restaura as unidades do sistema como dataclasses (no lugar)"""
+    sistema.unidades = expandir_unidades(sistema.unidades)
+    return sistema
+
+
+def obter_matriz_compacta(unidades: Sequence[Any]) -> Optional[np.ndarray]:
+    """
+    Matriz de consumo lida diretamente da tabela quando todas as unidades são
+    compactas e compartilham a mesma tabela; None caso contrário
+    """
+    if not unidades or not isinstance(unidades[0], UnidadeCompacta):
+        return None
+
+    tabela = unidades[0]._tabela
+    indices = []
+    for unidade in unidades:
+        if not isinstance(unidade, UnidadeCompacta) or unidade._tabela is not tabela:
+            return None
+        indices.append(unidade._linha)
+
+    return tabela.selecionar(indices)
@@ -0,0 +1,9 @@
+"""
+Configuração dos testes
+Permite importar os pacotes do projeto a partir da raiz do repositório
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
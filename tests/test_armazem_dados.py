@@ -0,0 +1,82 @@
+"""
+Testes do armazém de dados e do cache de sistemas do RepositorioDados
+"""
+
+import json
+import os
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
+from dados.armazem_dados import ArmazemDados
+from dados.repositorio import RepositorioDados
+
+
+def criar_sistema() -> SistemaEnergia:
+    unidades = [UnidadeConsumidora(id=id_unidade, nome=f"Unidade {id_unidade}", tipo_ligacao=TipoLigacao.BIFASICA,
+                                   consumo_mensal_kwh=[100.0 * (i + 1)] * 12)
+                for i, id_unidade in enumerate(['A', 'B', 'C'])]
+    return SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=unidades)
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    arquivo = str(tmp_path / 'dados_sistema.json')
+    RepositorioDados(arquivo, armazem=ArmazemDados()).salvar_sistema(criar_sistema())
+    return arquivo
+
+
+@pytest.fixture
+def repositorio(arquivo):
+    return RepositorioDados(arquivo, compactar_em_segundo_plano=False, armazem=ArmazemDados())
+
+
+def test_carregamentos_recebem_instancias_independentes(repositorio):
+    primeiro = repositorio.carregar_sistema()
+    primeiro.unidades[0].consumo_mensal_kwh[0] = -1.0
+    primeiro.configuracao.tarifa_energia_kwh = 9.9
+
+    segundo = repositorio.carregar_sistema()
+    assert segundo is not primeiro
+    assert segundo.unidades[0].consumo_mensal_kwh[0] == 100.0
+    assert segundo.configuracao.tarifa_energia_kwh != 9.9
+
+
+def test_edicoes_apos_salvar_nao_vazam_para_o_cache(repositorio):
+    sistema = repositorio.carregar_sistema()
+    sistema.unidades[1].consumo_mensal_kwh[0] = 5.0
+    repositorio.salvar_sistema(sistema)
+    sistema.unidades[1].consumo_mensal_kwh[0] = 6.0
+
+    assert repositorio.carregar_sistema().unidades[1].consumo_mensal_kwh[0] == 5.0
+
+
+def test_cache_invalidado_pelo_journal(repositorio):
+    assert repositorio.carregar_sistema().get_unidade_por_id('C').consumo_mensal_kwh[4] == 300.0
+    repositorio.registrar_consumo('C', 5, 55.0)
+
+    assert repositorio.carregar_sistema().get_unidade_por_id('C').consumo_mensal_kwh[4] == 55.0
+
+
+def test_cache_invalidado_por_gravacao_externa(repositorio, arquivo):
+    repositorio.carregar_sistema()
+    with open(arquivo, encoding='utf-8') as f:
+        dados = json.load(f)
+    dados['unidades'][0]['nome'] = 'Alterada por fora'
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    # Garante assinatura diferente mesmo com relógio de baixa resolução
+    info = os.stat(arquivo)
+    os.utime(arquivo, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000))
+
+    assert repositorio.carregar_sistema().unidades[0].nome == 'Alterada por fora'
+
+
+def test_ler_json_com_copia(tmp_path):
+    caminho = str(tmp_path / 'documento.json')
+    armazem = ArmazemDados()
+    armazem.gravar_json(caminho, {'valores': [1, 2]})
+
+    copia = armazem.ler_json(caminho, copiar=True)
+    copia['valores'].append(3)
+    assert armazem.ler_json(caminho) == {'valores': [1, 2]}
@@ -0,0 +1,137 @@
+"""
+Testes do layout paginado (RepositorioPaginado)
+"""
+
+import gc
+import os
+
+import pytest
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, ConfiguracaoRelatorio, UnidadeConsumidora, TipoLigacao
+)
+from nucleo.excecoes import ErroCarregamentoDados
+from dados.armazem_dados import ArmazemDados
+from dados.repositorio import RepositorioDados
+from dados.carregamento_paginado import RepositorioPaginado, CAMPOS_METADADOS
+
+
+def criar_sistema(quantidade: int = 7) -> SistemaEnergia:
+    unidades = [UnidadeConsumidora(id=f"U{i}", nome=f"Unidade {i}", tipo_ligacao=TipoLigacao.TRIFASICA,
+                                   ativa=i % 3 != 0, consumo_mensal_kwh=[float(i * 12 + m) for m in range(12)])
+                for i in range(quantidade)]
+    return SistemaEnergia(
+        configuracao=ConfiguracaoSistema(potencia_instalada_kw=42.0),
+        unidades=unidades,
+        configuracao_relatorio=ConfiguracaoRelatorio(),
+        versao_sistema='9.1',
+        data_criacao='2024-01-02T03:04:05',
+        data_ultima_atualizacao='2024-06-07T08:09:10',
+        dados_importacao={'origem': 'teste'},
+        configuracoes_avancadas={'modo': 'avancado'}
+    )
+
+
+def arquivos_unidades(diretorio) -> list:
+    return sorted(nome for nome in os.listdir(diretorio) if '.unidades.' in nome)
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    return RepositorioPaginado(str(tmp_path / 'dados_sistema.json'), tamanho_cache=2)
+
+
+def test_ida_e_volta_preserva_o_sistema(repositorio):
+    original = criar_sistema()
+    repositorio.salvar_paginado(original)
+
+    paginado = repositorio.abrir_paginado()
+    assert paginado.unidades.hidratadas == 0
+    assert paginado.resumo.quantidade_unidades == 7 and paginado.resumo.quantidade_ativas == 4
+    assert [e.id for e in paginado.unidades.entradas(apenas_ativas=True)] == ['U1', 'U2', 'U4', 'U5']
+
+    sistema = paginado.materializar()
+    assert sistema.configuracao.potencia_instalada_kw == 42.0
+    assert sistema.configuracao_relatorio == original.configuracao_relatorio
+    for campo in CAMPOS_METADADOS:
+        assert getattr(sistema, campo) == getattr(original, campo)
+    assert [(u.id, u.ativa, list(u.consumo_mensal_kwh)) for u in sistema.unidades] == \
+           [(u.id, u.ativa, list(u.consumo_mensal_kwh)) for u in original.unidades]
+
+
+def test_paginas_e_cache_limitado(repositorio):
+    repositorio.salvar_paginado(criar_sistema())
+    unidades = repositorio.abrir_paginado().unidades
+
+    assert unidades.quantidade_paginas(tamanho=3) == 3
+    assert [u.id for u in unidades.pagina(2, tamanho=3)] == ['U6']
+    assert unidades.obter('U3').consumo_mensal_kwh[0] == 36.0
+    assert unidades.obter('inexistente') is None
+    assert unidades.hidratadas == 2
+
+
+def test_geracao_anterior_mantida_enquanto_aberta(repositorio, tmp_path):
+    repositorio.salvar_paginado(criar_sistema())
+    aberto = repositorio.abrir_paginado()
+
+    alterado = criar_sistema()
+    alterado.unidades[5].nome = 'Renomeada'
+    repositorio.salvar_paginado(alterado)
+    repositorio.salvar_paginado(alterado)
+
+    # O sistema aberto continua lendo a sua geração
+    assert aberto.unidades.obter('U5').nome == 'Unidade 5'
+    assert arquivos_unidades(tmp_path) == ['dados_sistema.json.unidades.1.jsonl',
+                                           'dados_sistema.json.unidades.3.jsonl']
+
+    del aberto
+    gc.collect()
+    repositorio.salvar_paginado(alterado)
+    assert arquivos_unidades(tmp_path) == ['dados_sistema.json.unidades.4.jsonl']
+    assert repositorio.abrir_paginado().unidades.obter('U5').nome == 'Renomeada'
+
+
+def test_arquivo_removido_por_outro_repositorio(repositorio, tmp_path):
+    repositorio.salvar_paginado(criar_sistema())
+    aberto = repositorio.abrir_paginado()
+    RepositorioPaginado(repositorio.arquivo_dados).salvar_paginado(criar_sistema())
+
+    with pytest.raises(ErroCarregamentoDados):
+        aberto.unidades.obter('U1')
+
+
+def test_salvar_sistema_mantem_o_layout_paginado(repositorio, tmp_path):
+    repositorio.salvar_sistema(criar_sistema())
+    paginado = repositorio.abrir_paginado()
+
+    # Gravado junto com o JSON: a abertura não precisa regenerar
+    assert arquivos_unidades(tmp_path) == ['dados_sistema.json.unidades.1.jsonl']
+    assert paginado.resumo.quantidade_unidades == 7
+
+    # Cópia avulsa (backup) não mexe no layout paginado
+    repositorio.salvar_sistema(criar_sistema(2), str(tmp_path / 'backup.json'))
+    assert len(repositorio.abrir_paginado().unidades) == 7
+
+
+def test_json_alterado_depois_regenera_o_layout(repositorio):
+    repositorio.salvar_sistema(criar_sistema())
+
+    # Edição pelo journal
+    repositorio.registrar_consumo('U1', 1, 500.0)
+    esperado = criar_sistema()
+    esperado.unidades[1].consumo_mensal_kwh[0] = 500.0
+    paginado = repositorio.abrir_paginado()
+    assert paginado.unidades.obter('U1').consumo_mensal_kwh[0] == 500.0
+    assert paginado.resumo.consumo_mensal_kwh[0] == sum(u.consumo_mensal_kwh[0] for u in esperado.get_unidades_ativas())
+
+    # Salvamento por um repositório que não conhece o layout paginado
+    RepositorioDados(repositorio.arquivo_dados, armazem=ArmazemDados()).salvar_sistema(criar_sistema(3))
+    assert [e.id for e in repositorio.abrir_paginado().unidades.entradas()] == ['U0', 'U1', 'U2']
+
+
+def test_abrir_so_com_o_json_gera_o_layout(repositorio):
+    assert not repositorio.existe_paginado()
+    RepositorioDados(repositorio.arquivo_dados, armazem=ArmazemDados()).salvar_sistema(criar_sistema())
+
+    assert len(repositorio.abrir_paginado().unidades) == 7
+    assert repositorio.existe_paginado()
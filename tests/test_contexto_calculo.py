@@ -0,0 +1,69 @@
+"""
+Testes do contexto compartilhado de cálculos
+"""
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao, HistoricoCreditos
+from negocio.contexto_calculo import ContextoCalculo, obter_contexto
+from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+
+ANO = 2025
+
+
+def criar_sistema(ano_vencimento: int) -> SistemaEnergia:
+    unidade = UnidadeConsumidora(id='1', nome='Galpão', tipo_ligacao=TipoLigacao.TRIFASICA,
+                                 consumo_mensal_kwh=[20000.0] * 12)
+    lote = HistoricoCreditos(mes_geracao=12, ano_geracao=2021, creditos_kwh=50000.0, creditos_utilizados_kwh=0.0,
+                             creditos_restantes_kwh=50000.0, mes_vencimento=12, ano_vencimento=ano_vencimento,
+                             ativo=True)
+    return SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=[unidade], historico_creditos=[lote])
+
+
+def economia_total(sistema: SistemaEnergia, contexto: ContextoCalculo = None) -> float:
+    contexto = contexto if contexto is not None else ContextoCalculo(sistema)
+    return GerenciadorDistribuicao(sistema, contexto).calcular_resultado_financeiro_anual(ANO).economia_total
+
+
+@pytest.mark.parametrize('rastreamento', [False, True], ids=['sem_rastreamento', 'com_rastreamento'])
+def test_vencimento_alterado_no_lugar_invalida_o_cache(rastreamento):
+    sistema = criar_sistema(2026)
+    if rastreamento:
+        sistema.ativar_rastreamento()
+    contexto = ContextoCalculo(sistema)
+    economia_total(sistema, contexto)
+
+    # Mesmo saldo, mas o lote passa a vencer antes do ano calculado
+    sistema.historico_creditos[0].ano_vencimento = 2024
+    esperado = economia_total(criar_sistema(2024))
+
+    assert esperado != pytest.approx(economia_total(criar_sistema(2026)))
+    assert economia_total(sistema, contexto) == pytest.approx(esperado)
+
+
+def test_contexto_compartilhado_liga_rastreamento():
+    sistema = criar_sistema(2026)
+    contexto = obter_contexto(sistema)
+
+    assert sistema.rastreamento_ativo
+    assert obter_contexto(sistema) is contexto
+
+
+def test_resultados_em_cache_sao_copias():
+    sistema = criar_sistema(2026)
+    gerenciador = GerenciadorDistribuicao(sistema, ContextoCalculo(sistema))
+    calculadora = gerenciador.calculadora_energia
+
+    anual = calculadora.calcular_resultado_anual_energia(ANO)
+    anual.resultados_mensais[0].geracao_kwh = -1.0
+    anual.resultados_mensais.clear()
+    calculadora.calcular_resultado_mensal_energia(2, ANO).saldo_kwh = -1.0
+    financeiro = gerenciador.calcular_resultado_financeiro_anual(ANO)
+    financeiro.resultados_mensais[0].economia_mensal = -1.0
+    gerenciador.calcular_resultado_financeiro_mensal(2, ANO).economia_mensal = -1.0
+
+    assert len(calculadora.calcular_resultado_anual_energia(ANO).resultados_mensais) == 12
+    assert calculadora.calcular_resultado_anual_energia(ANO).resultados_mensais[0].geracao_kwh > 0
+    assert calculadora.calcular_resultado_mensal_energia(2, ANO).saldo_kwh != -1.0
+    assert gerenciador.calcular_resultado_financeiro_anual(ANO).resultados_mensais[0].economia_mensal != -1.0
+    assert gerenciador.calcular_resultado_financeiro_mensal(2, ANO).economia_mensal != -1.0
@@ -0,0 +1,98 @@
+"""
+Testes do importador de consumos em CSV
+"""
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
+from nucleo.unidades_compactas import compactar_sistema
+from nucleo.excecoes import ErroMigracaoDados
+from dados.importador_csv import importar_consumos_csv
+from dados.migrador import MigradorDados
+
+
+@pytest.fixture(params=[False, True], ids=['dataclass', 'compacta'])
+def sistema(request):
+    unidades = [UnidadeConsumidora(id=id_unidade, nome=nome, tipo_ligacao=TipoLigacao.MONOFASICA,
+                                   consumo_mensal_kwh=[10.0] * 12)
+                for id_unidade, nome in [('1', 'Casa'), ('2', 'Loja'), ('3', 'Depósito')]]
+    sistema = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=unidades)
+    if request.param:
+        compactar_sistema(sistema)
+    return sistema
+
+
+def escrever_csv(tmp_path, linhas, encoding: str = 'utf-8') -> str:
+    caminho = tmp_path / 'consumos.csv'
+    caminho.write_text("\n".join(linhas) + "\n", encoding=encoding)
+    return str(caminho)
+
+
+def consumo(sistema, id_unidade):
+    return list(sistema.get_unidade_por_id(id_unidade).consumo_mensal_kwh)
+
+
+def test_linhas_rejeitadas_nao_interrompem(sistema, tmp_path):
+    caminho = escrever_csv(tmp_path, [
+        'id,Jan,Fev',
+        '1,100,200',
+        '99,1,1',
+        ',5,5',
+        '2,abc,7',
+        'Depósito,30,',
+    ])
+    resultado = importar_consumos_csv(caminho, sistema)
+
+    assert (resultado.linhas_lidas, resultado.linhas_aplicadas, resultado.total_rejeitadas) == (5, 2, 3)
+    assert [(r.numero, r.motivo) for r in resultado.rejeitadas] == [
+        (3, 'Unidade não encontrada: 99'),
+        (4, 'Identificação vazia'),
+        (5, "Valor inválido em Jan: 'abc'"),
+    ]
+    assert resultado.unidades_atualizadas == 2
+    assert consumo(sistema, '1')[:3] == [100.0, 200.0, 10.0]
+    # Linha rejeitada não altera nenhum mês; campo vazio mantém o valor atual
+    assert consumo(sistema, '2') == [10.0] * 12
+    assert consumo(sistema, '3')[:2] == [30.0, 10.0]
+
+
+@pytest.mark.parametrize('tamanho_lote', [1, 2, 100])
+def test_ultimo_valor_prevalece(sistema, tmp_path, tamanho_lote):
+    caminho = escrever_csv(tmp_path, [
+        'id,Jan,Fev,Mar',
+        '1,1,2,3',
+        '2,50,,',
+        '1,11,,33',
+        '1,,22,',
+        '1,111,,',
+    ])
+    resultado = importar_consumos_csv(caminho, sistema, tamanho_lote)
+
+    assert resultado.linhas_aplicadas == 5 and resultado.total_rejeitadas == 0
+    assert consumo(sistema, '1')[:4] == [111.0, 22.0, 33.0, 10.0]
+    assert consumo(sistema, '2')[:2] == [50.0, 10.0]
+
+
+def test_sem_coluna_de_identificacao(sistema, tmp_path):
+    caminho = escrever_csv(tmp_path, ['codigo,Jan', '1,5'])
+    with pytest.raises(ErroMigracaoDados):
+        importar_consumos_csv(caminho, sistema)
+
+
+def test_bom_do_excel_no_cabecalho(sistema, tmp_path):
+    caminho = escrever_csv(tmp_path, ['id,Jan', '1,42'], encoding='utf-8-sig')
+    resultado = importar_consumos_csv(caminho, sistema)
+
+    assert resultado.linhas_aplicadas == 1
+    assert consumo(sistema, '1')[0] == 42.0
+    assert MigradorDados().validar_arquivo_legacy(caminho)['estatisticas']['nomes_colunas'] == ['id', 'Jan']
+
+
+@pytest.mark.parametrize('valor', ['inf', '-inf', 'nan', 'NaN', '1e999'])
+def test_valores_nao_finitos_rejeitados(sistema, tmp_path, valor):
+    caminho = escrever_csv(tmp_path, ['id,Jan,Fev', f'1,5,{valor}', '2,7,8'])
+    resultado = importar_consumos_csv(caminho, sistema)
+
+    assert [(r.numero, r.motivo) for r in resultado.rejeitadas] == [(2, f"Valor inválido em Fev: {valor!r}")]
+    assert consumo(sistema, '1') == [10.0] * 12
+    assert consumo(sistema, '2')[:2] == [7.0, 8.0]
@@ -0,0 +1,53 @@
+"""
+Testes do importador de planilhas Excel
+"""
+
+import pytest
+from openpyxl import Workbook
+
+from nucleo.excecoes import ErroMigracaoDados
+from dados.importador_excel import ImportadorExcel, MENSAGEM_XLS_NAO_SUPORTADO
+from dados.migrador import MigradorDados, migrar_arquivo_legacy
+
+
+def escrever_planilha(caminho: str):
+    pasta = Workbook()
+    aba = pasta.active
+    aba.title = 'Unidades'
+    aba.append(['Nome', 'Tipo_Ligacao', 'Percentual', 'Jan', 'Fev'])
+    aba.append(['Casa', 'Bifasica', 40, 120, None])
+    aba.append([None, None, None, None, None])
+    aba.append(['Loja', None, None, 300.5, 280])
+    pasta.save(caminho)
+
+
+def test_leitura_das_unidades(tmp_path):
+    caminho = str(tmp_path / 'legacy.xlsx')
+    escrever_planilha(caminho)
+
+    importador = ImportadorExcel(caminho)
+    dados = importador.ler()
+
+    assert importador.abas == ['Unidades']
+    assert [(u['nome'], u['tipo_ligacao'], u['percentual_alocacao']) for u in dados['unidades']] == \
+           [('Casa', 'bifasica', 40.0), ('Loja', 'monofasica', 0.0)]
+    assert dados['unidades'][1]['consumo_mensal'][:3] == [300.5, 280.0, 0]
+
+
+def test_xls_recusado_com_mensagem_clara(tmp_path):
+    # Conteúdo .xlsx válido: a recusa vem da extensão, não de uma falha do openpyxl
+    caminho = str(tmp_path / 'legacy.xls')
+    escrever_planilha(caminho)
+    migrador = MigradorDados()
+
+    with pytest.raises(ErroMigracaoDados, match='.xls'):
+        ImportadorExcel(caminho).ler()
+
+    validacao = migrador.validar_arquivo_legacy(caminho)
+    assert not validacao['valido'] and validacao['erros'] == [MENSAGEM_XLS_NAO_SUPORTADO]
+
+    sistema, validacao = migrador.migrar_com_validacao(caminho)
+    assert sistema is None and validacao['erros'] == [MENSAGEM_XLS_NAO_SUPORTADO]
+
+    with pytest.raises(ErroMigracaoDados, match='.xlsx'):
+        migrar_arquivo_legacy(caminho)
@@ -0,0 +1,109 @@
+"""
+Testes dos índices de unidades do SistemaEnergia
+"""
+
+import copy
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
+from nucleo.unidades_compactas import compactar_sistema
+from dados.visao_legacy import VisaoDadosLegacy
+
+
+def criar_unidade(id_unidade: str, **campos) -> UnidadeConsumidora:
+    return UnidadeConsumidora(id=id_unidade, nome=f"Unidade {id_unidade}",
+                              tipo_ligacao=TipoLigacao.MONOFASICA, **campos)
+
+
+@pytest.fixture(params=[(False, False), (False, True), (True, False), (True, True)],
+                ids=['dataclass', 'dataclass-rastreado', 'compacta', 'compacta-rastreado'])
+def sistema(request):
+    compacto, rastreado = request.param
+    sistema = SistemaEnergia(configuracao=ConfiguracaoSistema(),
+                             unidades=[criar_unidade('A'), criar_unidade('B'), criar_unidade('C')])
+    if compacto:
+        compactar_sistema(sistema)
+    if rastreado:
+        sistema.ativar_rastreamento()
+    # Índice montado antes das alterações
+    assert sistema.get_unidade_por_id('A') is not None
+    return sistema
+
+
+def ids_ativas(sistema: SistemaEnergia):
+    return [u.id for u in sistema.get_unidades_ativas()]
+
+
+def test_substituicao_no_lugar(sistema):
+    nova = criar_unidade('NOVA')
+    # Índice montado depois de criar a unidade: só a troca na lista pode invalidá-lo
+    sistema.get_unidades_ativas()
+    sistema.unidades[0] = nova
+
+    assert sistema.get_unidade_por_id('NOVA') is nova
+    assert sistema.get_unidade_por_id('A') is None
+    assert ids_ativas(sistema) == ['NOVA', 'B', 'C']
+
+
+def test_pop_seguido_de_append(sistema):
+    nova = criar_unidade('D', ativa=False)
+    sistema.get_unidades_ativas()
+    sistema.unidades.pop()
+    sistema.unidades.append(nova)
+
+    assert sistema.get_unidade_por_id('C') is None
+    assert sistema.get_unidade_por_id('D') is not None
+    assert ids_ativas(sistema) == ['A', 'B']
+
+
+def test_remove_e_campos_indexados(sistema):
+    sistema.unidades.remove(sistema.get_unidade_por_id('A'))
+    assert sistema.get_unidade_por_id('A') is None
+
+    sistema.unidades[0].ativa = False
+    assert ids_ativas(sistema) == ['C']
+
+    sistema.unidades[1].id = 'CC'
+    assert sistema.get_unidade_por_id('CC') is sistema.unidades[1]
+    assert sistema.get_unidade_por_id('C') is None
+
+
+def test_visao_legacy_acompanha_substituicao(sistema):
+    consumos = VisaoDadosLegacy(sistema)['consumos']
+    nova = criar_unidade('NOVA')
+    assert 'A' in consumos
+
+    sistema.unidades[0] = nova
+    assert 'NOVA' in consumos and 'A' not in consumos
+
+
+def test_indice_e_por_sistema():
+    sistema = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=[criar_unidade('A')])
+    outro = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=[criar_unidade('X')])
+    indice = sistema._obter_indice()
+
+    # Criar ou alterar unidades de outro sistema não invalida este índice
+    criar_unidade('Y')
+    outro.unidades[0].ativa = False
+    assert sistema._obter_indice() is indice
+
+
+def test_unidade_compartilhada_invalida_os_dois_sistemas():
+    unidades = [criar_unidade('A'), criar_unidade('B')]
+    primeiro = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=unidades)
+    segundo = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=unidades[:1])
+    assert len(primeiro.get_unidades_ativas()) == 2 and len(segundo.get_unidades_ativas()) == 1
+
+    unidades[0].ativa = False
+    assert ids_ativas(primeiro) == ['B']
+    assert ids_ativas(segundo) == []
+
+
+def test_copias_continuam_atualizando_indice(sistema):
+    copia = copy.deepcopy(sistema)
+    copia.get_unidades_ativas()
+    copia.unidades[0] = criar_unidade('NOVA')
+
+    assert copia.get_unidade_por_id('NOVA') is not None
+    assert sistema.get_unidade_por_id('NOVA') is None
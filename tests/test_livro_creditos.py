@@ -0,0 +1,118 @@
+"""
+Testes do livro de créditos contra as rotinas originais sobre a lista de histórico
+"""
+
+import random
+from dataclasses import replace
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, HistoricoCreditos
+from negocio.livro_creditos import LivroCreditos, calcular_vencimento
+from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+
+
+# Rotinas originais do GerenciadorDistribuicao (varredura da lista a cada chamada)
+
+def disponiveis_referencia(historico, mes: int, ano: int) -> float:
+    return sum(c.creditos_restantes_kwh for c in historico
+               if c.ativo and c.creditos_restantes_kwh > 0 and (c.ano_vencimento, c.mes_vencimento) >= (ano, mes))
+
+
+def utilizar_referencia(historico, creditos: float):
+    restante = creditos
+    ordenados = sorted([c for c in historico if c.ativo and c.creditos_restantes_kwh > 0],
+                       key=lambda c: (c.ano_vencimento, c.mes_vencimento))
+    for credito in ordenados:
+        if restante <= 0:
+            break
+        utilizacao = min(credito.creditos_restantes_kwh, restante)
+        credito.creditos_utilizados_kwh += utilizacao
+        credito.creditos_restantes_kwh -= utilizacao
+        restante -= utilizacao
+        if credito.creditos_restantes_kwh <= 0:
+            credito.ativo = False
+
+
+def criar_lote(mes: int, ano: int, kwh: float, validade: int) -> HistoricoCreditos:
+    mes_vencimento, ano_vencimento = calcular_vencimento(mes, ano, validade)
+    return HistoricoCreditos(mes_geracao=mes, ano_geracao=ano, creditos_kwh=kwh, creditos_utilizados_kwh=0.0,
+                             creditos_restantes_kwh=kwh, mes_vencimento=mes_vencimento,
+                             ano_vencimento=ano_vencimento, ativo=True)
+
+
+def test_vencimento_exato_em_meses():
+    assert calcular_vencimento(1, 2024, 60) == (1, 2029)
+    assert calcular_vencimento(12, 2024, 1) == (1, 2025)
+    assert calcular_vencimento(3, 2024, 22) == (1, 2026)
+
+
+def test_livro_igual_as_rotinas_originais():
+    aleatorio = random.Random(11)
+    validade = 6
+    referencia = []
+    livro = LivroCreditos([], validade)
+
+    for indice in range(48):
+        mes, ano = indice % 12 + 1, 2024 + indice // 12
+        assert livro.obter_saldo_disponivel(mes, ano) == pytest.approx(disponiveis_referencia(referencia, mes, ano))
+
+        if aleatorio.random() < 0.5:
+            uso = aleatorio.uniform(0, 3000)
+            # A rotina original não descontava vencidos: aplica só sobre os disponíveis
+            disponiveis = [c for c in referencia if (c.ano_vencimento, c.mes_vencimento) >= (ano, mes)]
+            utilizar_referencia(disponiveis, uso)
+            livro.utilizar_creditos(uso, mes, ano)
+        else:
+            gerados = aleatorio.uniform(0, 2000)
+            referencia.append(criar_lote(mes, ano, gerados, validade))
+            livro.adicionar_credito(mes, ano, gerados)
+
+        lotes = sorted(livro.obter_lotes_ativos(), key=lambda c: (c.ano_geracao, c.mes_geracao))
+        esperados = [c for c in referencia if c.ativo and c.creditos_restantes_kwh > 0
+                     and (c.ano_vencimento, c.mes_vencimento) >= (ano, mes)]
+        assert [(c.ano_geracao, c.mes_geracao) for c in lotes] == [(c.ano_geracao, c.mes_geracao) for c in esperados]
+        assert [c.creditos_restantes_kwh for c in lotes] == pytest.approx(
+            [c.creditos_restantes_kwh for c in esperados])
+
+
+def test_livro_opera_sobre_o_historico_e_copia_e_independente():
+    historico = [criar_lote(1, 2024, 100.0, 60), criar_lote(2, 2024, 50.0, 60)]
+    livro = LivroCreditos(historico, 60)
+    copia = livro.copiar()
+
+    assert livro.utilizar_creditos(120.0, 3, 2024) == pytest.approx(120.0)
+    assert (historico[0].ativo, historico[1].creditos_restantes_kwh) == (False, pytest.approx(30.0))
+    assert copia.saldo_total == pytest.approx(150.0)
+
+
+def test_gerenciador_reconstroi_livro_apos_edicao_no_lugar():
+    historico = [criar_lote(1, 2024, 500.0, 60)]
+    sistema = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=[], historico_creditos=historico)
+    gerenciador = GerenciadorDistribuicao(sistema)
+    assert gerenciador._obter_livro_creditos().saldo_total == pytest.approx(500.0)
+
+    historico[0].creditos_restantes_kwh = 200.0
+    assert gerenciador._obter_livro_creditos().saldo_total == pytest.approx(200.0)
+
+    # Vencimento alterado com o mesmo saldo
+    historico[0].ano_vencimento = 2024
+    assert gerenciador._obter_livro_creditos().obter_saldo_disponivel(6, 2024) == 0.0
+
+    # Lote (já vencido pela consulta acima) substituído por outro objeto ativo
+    historico[0] = replace(historico[0], ano_vencimento=2030, ativo=True)
+    assert gerenciador._obter_livro_creditos().obter_saldo_disponivel(6, 2024) == pytest.approx(200.0)
+
+
+def test_sincronizado_detecta_saldo_trocado_entre_lotes():
+    historico = [criar_lote(1, 2024, 100.0, 60), criar_lote(2, 2024, 50.0, 60)]
+    livro = LivroCreditos(historico, 60)
+    livro.utilizar_creditos(30.0, 3, 2024)
+    assert livro.sincronizado()
+
+    historico[0].creditos_restantes_kwh, historico[1].creditos_restantes_kwh = 50.0, 70.0
+    assert not livro.sincronizado()
+    livro.invalidar()
+    assert livro.utilizar_creditos(60.0, 3, 2024) == pytest.approx(60.0)
+    assert historico[0].ativo is False and historico[1].creditos_restantes_kwh == pytest.approx(60.0)
+
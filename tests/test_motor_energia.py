@@ -0,0 +1,118 @@
+"""
+Testes do motor vetorizado de energia contra as fórmulas originais da CalculadoraEnergia
+"""
+
+import calendar
+import random
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
+from nucleo.unidades_compactas import compactar_sistema
+from negocio.calculadora_energia import CalculadoraEnergia
+from negocio.contexto_calculo import ContextoCalculo
+
+ANO = 2024
+
+
+def geracao_referencia(config: ConfiguracaoSistema, mes: int) -> float:
+    geracao = config.geracao_mensal_kwh[mes - 1] * config.eficiencia_sistema
+    geracao *= (1 - config.perdas_sistema) * config.fator_simultaneidade
+    return max(0.0, geracao)
+
+
+def resultado_mensal_referencia(sistema: SistemaEnergia, mes: int, ano: int) -> dict:
+    """Resultado mensal calculado unidade a unidade, como na calculadora original"""
+    config = sistema.configuracao
+    ativas = [u for u in sistema.unidades if u.ativa]
+
+    geracao = geracao_referencia(config, mes)
+    consumo = sum(u.consumo_mensal_kwh[mes - 1] for u in ativas)
+    consumo_minimo = sum(u.get_taxa_disponibilidade() for u in ativas)
+    saldo = geracao - max(consumo, consumo_minimo)
+
+    teorica = config.geracao_mensal_kwh[mes - 1]
+    maxima = config.potencia_instalada_kw * 24 * (calendar.monthrange(ano, mes)[1] if ano else 30)
+
+    return {
+        'geracao_kwh': geracao,
+        'consumo_total_kwh': consumo,
+        'saldo_kwh': saldo,
+        'creditos_gerados_kwh': max(0.0, saldo),
+        'energia_injetada_kwh': max(0.0, saldo) * config.percentual_injecao_rede,
+        'energia_consumida_rede_kwh': max(0.0, -saldo),
+        'fator_capacidade_real': min(1.0, geracao / maxima) if maxima > 0 else 0.0,
+        'eficiencia_real': min(1.0, geracao / teorica) if teorica > 0 else 0.0,
+        'perdas_kwh': max(0.0, teorica - geracao),
+    }
+
+
+@pytest.fixture(params=[False, True], ids=['dataclass', 'compacta'])
+def sistema(request):
+    aleatorio = random.Random(3)
+    unidades = [UnidadeConsumidora(id=str(i), nome=f"Unidade {i}", tipo_ligacao=aleatorio.choice(list(TipoLigacao)),
+                                   ativa=aleatorio.random() > 0.2,
+                                   consumo_mensal_kwh=[aleatorio.uniform(0, 900) for _ in range(12)])
+                for i in range(40)]
+    config = ConfiguracaoSistema(geracao_mensal_kwh=[aleatorio.uniform(0, 20000) for _ in range(12)])
+    # Um mês sem geração teórica (divisões protegidas)
+    config.geracao_mensal_kwh[5] = 0.0
+    sistema = SistemaEnergia(configuracao=config, unidades=unidades)
+    if request.param:
+        compactar_sistema(sistema)
+    return sistema
+
+
+@pytest.mark.parametrize('ano', [ANO, None])
+def test_resultados_mensais_iguais_as_formulas_originais(sistema, ano):
+    calculadora = CalculadoraEnergia(sistema, ContextoCalculo(sistema))
+
+    for mes in range(1, 13):
+        esperado = resultado_mensal_referencia(sistema, mes, ano)
+        resultado = calculadora.calcular_resultado_mensal_energia(mes, ano)
+        for campo, valor in esperado.items():
+            assert getattr(resultado, campo) == pytest.approx(valor, rel=1e-12, abs=1e-9), (mes, campo)
+
+        assert calculadora.calcular_geracao_mensal_real(mes) == pytest.approx(esperado['geracao_kwh'])
+        assert calculadora.calcular_consumo_total_mensal(mes) == pytest.approx(esperado['consumo_total_kwh'])
+        saldo, injetada, consumida = calculadora.calcular_saldo_energetico_mensal(mes)
+        assert (saldo, injetada, consumida) == pytest.approx(
+            (esperado['saldo_kwh'], esperado['energia_injetada_kwh'], esperado['energia_consumida_rede_kwh']))
+
+
+def test_resultado_anual_igual_a_soma_dos_meses(sistema):
+    resultado = CalculadoraEnergia(sistema, ContextoCalculo(sistema)).calcular_resultado_anual_energia(ANO)
+    mensais = [resultado_mensal_referencia(sistema, mes, ANO) for mes in range(1, 13)]
+
+    geracao = sum(m['geracao_kwh'] for m in mensais)
+    consumo = sum(m['consumo_total_kwh'] for m in mensais)
+    assert resultado.geracao_total_kwh == pytest.approx(geracao)
+    assert resultado.consumo_total_kwh == pytest.approx(consumo)
+    assert resultado.saldo_anual_kwh == pytest.approx(geracao - consumo)
+    assert resultado.creditos_acumulados_kwh == pytest.approx(sum(m['creditos_gerados_kwh'] for m in mensais))
+    assert resultado.autossuficiencia_percentual == pytest.approx(min(100.0, geracao / consumo * 100))
+    assert resultado.fator_capacidade_medio == pytest.approx(sum(m['fator_capacidade_real'] for m in mensais) / 12)
+    assert resultado.eficiencia_media == pytest.approx(sum(m['eficiencia_real'] for m in mensais) / 12)
+    assert resultado.perdas_totais_kwh == pytest.approx(sum(m['perdas_kwh'] for m in mensais))
+    assert [r.mes for r in resultado.resultados_mensais] == list(range(1, 13))
+
+
+def test_sistema_sem_unidades_ativas():
+    sistema = SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=[
+        UnidadeConsumidora(id='1', nome='Inativa', tipo_ligacao=TipoLigacao.BIFASICA, ativa=False,
+                           consumo_mensal_kwh=[500.0] * 12)])
+    resultado = CalculadoraEnergia(sistema, ContextoCalculo(sistema)).calcular_resultado_anual_energia(ANO)
+
+    assert resultado.consumo_total_kwh == 0.0
+    assert resultado.autossuficiencia_percentual == 0.0
+    assert resultado.geracao_total_kwh == pytest.approx(
+        sum(geracao_referencia(sistema.configuracao, mes) for mes in range(1, 13)))
+
+
+def test_consumo_mensal_acompanha_edicoes(sistema):
+    calculadora = CalculadoraEnergia(sistema, ContextoCalculo(sistema))
+    unidade = sistema.get_unidades_ativas()[0]
+    antes = calculadora.calcular_consumo_total_mensal(2)
+
+    unidade.consumo_mensal_kwh[1] += 1000.0
+    assert calculadora.calcular_consumo_total_mensal(2) == pytest.approx(antes + 1000.0)
@@ -0,0 +1,93 @@
+"""
+Testes da projeção de créditos em vários anos contra uma rolagem mês a mês sobre listas
+"""
+
+import random
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao, HistoricoCreditos
+from negocio.livro_creditos import LivroCreditos, calcular_vencimento
+from negocio.motor_energia import MotorEnergia
+from negocio.projecao_creditos import projetar_creditos
+
+ANO_INICIAL = 2025
+
+
+def geracao_referencia(config: ConfiguracaoSistema, mes: int) -> float:
+    return max(0.0, config.geracao_mensal_kwh[mes - 1] * config.eficiencia_sistema
+               * (1 - config.perdas_sistema) * config.fator_simultaneidade)
+
+
+def projecao_referencia(sistema: SistemaEnergia, fatores, lotes_iniciais):
+    """Rolagem com as fórmulas originais: saldo mensal, FIFO por vencimento e vencimento exato"""
+    config = sistema.configuracao
+    ativas = [u for u in sistema.unidades if u.ativa]
+    minimo = sum(u.get_taxa_disponibilidade() for u in ativas)
+    lotes = [[c.ano_vencimento, c.mes_vencimento, c.creditos_restantes_kwh] for c in lotes_iniciais]
+
+    meses = []
+    for i, fator in enumerate(fatores):
+        ano = ANO_INICIAL + i
+        for mes in range(1, 13):
+            consumo = max(sum(u.consumo_mensal_kwh[mes - 1] for u in ativas), minimo)
+            saldo = geracao_referencia(config, mes) * fator - consumo
+
+            vencidos = [lote for lote in lotes if (lote[0], lote[1]) < (ano, mes)]
+            expirados = sum(lote[2] for lote in vencidos)
+            lotes = [lote for lote in lotes if (lote[0], lote[1]) >= (ano, mes)]
+
+            utilizados, deficit = 0.0, max(0.0, -saldo)
+            for lote in sorted(lotes, key=lambda l: (l[0], l[1])):
+                uso = min(lote[2], deficit - utilizados)
+                lote[2] -= uso
+                utilizados += uso
+            lotes = [lote for lote in lotes if lote[2] > 0]
+
+            if saldo > 0:
+                mes_vencimento, ano_vencimento = calcular_vencimento(mes, ano, config.validade_creditos_meses)
+                lotes.append([ano_vencimento, mes_vencimento, saldo])
+
+            meses.append((max(0.0, saldo), utilizados, expirados, sum(lote[2] for lote in lotes)))
+    return meses
+
+
+@pytest.fixture
+def sistema():
+    aleatorio = random.Random(5)
+    unidades = [UnidadeConsumidora(id=str(i), nome=f"Unidade {i}", tipo_ligacao=TipoLigacao.TRIFASICA,
+                                   consumo_mensal_kwh=[aleatorio.uniform(100, 1200) for _ in range(12)])
+                for i in range(12)]
+    # Meses com sobra e com déficit; validade curta para haver vencimentos no horizonte
+    config = ConfiguracaoSistema(geracao_mensal_kwh=[aleatorio.uniform(2000, 16000) for _ in range(12)],
+                                 validade_creditos_meses=14)
+    return SistemaEnergia(configuracao=config, unidades=unidades)
+
+
+def test_projecao_igual_a_rolagem_mes_a_mes(sistema):
+    fatores = [1.0, 0.975, 0.97, 0.965, 0.96]
+    inicial = [HistoricoCreditos(mes_geracao=6, ano_geracao=2024, creditos_kwh=8000.0, creditos_utilizados_kwh=0.0,
+                                 creditos_restantes_kwh=8000.0, mes_vencimento=2, ano_vencimento=2025, ativo=True)]
+    livro = LivroCreditos(inicial, sistema.configuracao.validade_creditos_meses)
+
+    projecao = projetar_creditos(MotorEnergia(sistema), fatores, ANO_INICIAL, livro)
+    esperado = projecao_referencia(sistema, fatores, inicial)
+
+    assert projecao.anos == len(fatores)
+    assert projecao.creditos_gerados_kwh.tolist() == pytest.approx([m[0] for m in esperado])
+    assert projecao.creditos_utilizados_kwh.tolist() == pytest.approx([m[1] for m in esperado])
+    assert projecao.creditos_expirados_kwh.tolist() == pytest.approx([m[2] for m in esperado])
+    assert projecao.creditos_disponiveis_kwh.tolist() == pytest.approx([m[3] for m in esperado])
+    assert projecao.total_expirado_kwh > 0
+
+    # O livro inicial (e o histórico do sistema) não é alterado
+    assert inicial[0].creditos_restantes_kwh == 8000.0 and inicial[0].ativo
+    assert livro.saldo_total == 8000.0
+
+
+def test_totais_anuais(sistema):
+    projecao = projetar_creditos(MotorEnergia(sistema), [1.0, 0.9], ANO_INICIAL)
+
+    assert projecao.por_ano(projecao.geracao_kwh).shape == (2, 12)
+    assert projecao.totais_anuais(projecao.geracao_kwh).tolist() == pytest.approx(
+        [sum(geracao_referencia(sistema.configuracao, m) for m in range(1, 13)) * f for f in (1.0, 0.9)])
@@ -0,0 +1,161 @@
+"""
+Testes do RepositorioDados: journal de alterações e compactação
+"""
+
+import json
+import os
+
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao
+from nucleo.excecoes import ErroCorrupcaoDados
+from dados.armazem_dados import ArmazemDados
+from dados.repositorio import RepositorioDados
+
+
+def criar_sistema() -> SistemaEnergia:
+    unidades = [UnidadeConsumidora(id=id_unidade, nome=f"Unidade {id_unidade}", tipo_ligacao=TipoLigacao.BIFASICA,
+                                   consumo_mensal_kwh=[100.0 * (i + 1)] * 12)
+                for i, id_unidade in enumerate(['A', 'B', 'C'])]
+    return SistemaEnergia(configuracao=ConfiguracaoSistema(), unidades=unidades)
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    arquivo = str(tmp_path / 'dados_sistema.json')
+    RepositorioDados(arquivo, armazem=ArmazemDados()).salvar_sistema(criar_sistema())
+    return arquivo
+
+
+@pytest.fixture
+def repositorio(arquivo):
+    return RepositorioDados(arquivo, compactar_em_segundo_plano=False, armazem=ArmazemDados())
+
+
+def recarregar(arquivo: str) -> SistemaEnergia:
+    """Carrega com um armazém novo, como em outro processo"""
+    return RepositorioDados(arquivo, armazem=ArmazemDados()).carregar_sistema()
+
+
+# Journal
+
+def test_journal_reaplicado_no_carregamento(repositorio, arquivo):
+    repositorio.registrar_consumo('B', 3, 777.0)
+    repositorio.registrar_campo_unidade('C', 'ativa', False)
+    repositorio.registrar_campo_configuracao('tarifa_energia_kwh', 0.95)
+
+    sistema = recarregar(arquivo)
+    assert sistema.get_unidade_por_id('B').consumo_mensal_kwh[2] == 777.0
+    assert sistema.get_unidade_por_id('C').ativa is False
+    assert sistema.configuracao.tarifa_energia_kwh == 0.95
+    # O snapshot não foi regravado
+    with open(arquivo, encoding='utf-8') as f:
+        assert json.load(f)['unidades'][1]['consumo_mensal_kwh'][2] == 200.0
+
+
+def test_ultima_linha_incompleta_e_ignorada(repositorio, arquivo):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    with open(repositorio.arquivo_journal, 'a', encoding='utf-8') as f:
+        f.write('{"op": "consumo", "id": "A", "mes": 2, "val')
+
+    assert recarregar(arquivo).get_unidade_por_id('A').consumo_mensal_kwh[:2] == [11.0, 100.0]
+
+    # A próxima operação descarta a linha incompleta em vez de ficar depois dela
+    repositorio.registrar_consumo('A', 3, 33.0)
+    assert recarregar(arquivo).get_unidade_por_id('A').consumo_mensal_kwh[:3] == [11.0, 100.0, 33.0]
+
+
+def test_linha_invalida_no_meio_do_journal_e_corrupcao(repositorio, arquivo):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    with open(repositorio.arquivo_journal, 'a', encoding='utf-8') as f:
+        f.write('lixo\n')
+    repositorio.registrar_consumo('A', 2, 22.0)
+
+    with pytest.raises(ErroCorrupcaoDados):
+        recarregar(arquivo)
+
+
+def test_isolar_arquivos_corrompidos(repositorio, arquivo):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    movidos = repositorio.isolar_arquivos_corrompidos()
+
+    assert len(movidos) == 2 and all(os.path.exists(caminho) for caminho in movidos)
+    assert not os.path.exists(arquivo) and not os.path.exists(repositorio.arquivo_journal)
+
+
+def test_compactacao_incorpora_o_journal(repositorio, arquivo):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    repositorio.compactar()
+
+    assert not os.path.exists(repositorio.arquivo_journal)
+    with open(arquivo, encoding='utf-8') as f:
+        assert json.load(f)['unidades'][0]['consumo_mensal_kwh'][0] == 11.0
+
+
+def test_compactacao_em_segundo_plano(arquivo):
+    repositorio = RepositorioDados(arquivo, limite_journal_bytes=200, armazem=ArmazemDados())
+    for mes in range(1, 13):
+        repositorio.registrar_consumo('B', mes, float(mes))
+    repositorio.aguardar_compactacao()
+
+    assert recarregar(arquivo).get_unidade_por_id('B').consumo_mensal_kwh == [float(m) for m in range(1, 13)]
+
+
+def test_salvar_durante_compactacao_prevalece(repositorio, arquivo):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    salvo = criar_sistema()
+    salvo.unidades[0].consumo_mensal_kwh[0] = 999.0
+    aplicar_original = repositorio._aplicar_operacao
+
+    def aplicar_e_salvar(dados, operacao):
+        # salvar_sistema concorrente entre a rotação do journal e a gravação do snapshot compactado
+        repositorio._aplicar_operacao = aplicar_original
+        repositorio.salvar_sistema(salvo)
+        aplicar_original(dados, operacao)
+
+    repositorio._aplicar_operacao = aplicar_e_salvar
+    repositorio.compactar()
+
+    assert recarregar(arquivo).get_unidade_por_id('A').consumo_mensal_kwh[0] == 999.0
+    assert not os.path.exists(repositorio.arquivo_journal)
+    assert not os.path.exists(repositorio._arquivo_journal_compactando)
+
+
+def test_salvar_em_destino_nao_toca_no_arquivo_de_dados(repositorio, arquivo, tmp_path):
+    repositorio.registrar_consumo('A', 1, 11.0)
+    backup = str(tmp_path / 'backup.json')
+    sistema = repositorio.carregar_sistema()
+    sistema.unidades[0].nome = 'Somente no backup'
+    repositorio.salvar_sistema(sistema, backup)
+
+    assert os.path.exists(repositorio.arquivo_journal)
+    assert recarregar(arquivo).unidades[0].nome == 'Unidade A'
+    with open(backup, encoding='utf-8') as f:
+        documento = json.load(f)
+    assert documento['unidades'][0]['nome'] == 'Somente no backup'
+    assert documento['unidades'][0]['consumo_mensal_kwh'][0] == 11.0
+
+
+# Documento sem conversão para o modelo (formato legacy da tela de Unidades)
+
+def test_documento_legacy_com_journal(tmp_path):
+    arquivo = str(tmp_path / 'unidades_sistema.json')
+    repositorio = RepositorioDados(arquivo, compactar_em_segundo_plano=False, armazem=ArmazemDados())
+    assert repositorio.carregar_documento() is None
+
+    repositorio.salvar_documento({'unidades': [{'codigo': '101', 'nome': 'Loja', 'tipo': 'tri', 'ativa': True}],
+                                  'consumos': {'101': {'Janeiro': 300, 'Fevereiro': 280}}})
+    repositorio.registrar_campo_unidade('101', 'ativa', False)
+    repositorio.registrar_consumo('101', 2, 310)
+    repositorio.registrar_consumo('101', 3, 295)
+
+    documento = RepositorioDados(arquivo, armazem=ArmazemDados()).carregar_documento()
+    assert documento['unidades'][0]['ativa'] is False
+    assert documento['consumos']['101'] == {'Janeiro': 300, 'Fevereiro': 310, 'Março': 295}
+    # kWh inteiros continuam inteiros
+    assert isinstance(documento['consumos']['101']['Fevereiro'], int)
+
+    repositorio.salvar_documento(documento)
+    assert not os.path.exists(repositorio.arquivo_journal)
+    with open(arquivo, encoding='utf-8') as f:
+        assert json.load(f) == documento
@@ -0,0 +1,107 @@
+"""
+Testes do RepositorioSQLite
+"""
+
+import random
+
+import pytest
+
+from nucleo.modelos import (
+    SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao, TipoUnidade, HistoricoCreditos
+)
+from nucleo.excecoes import ErroCarregamentoDados
+from dados.repositorio_sqlite import RepositorioSQLite, LIMITE_PARAMETROS
+from dados.carregamento_paginado import RepositorioPaginado
+
+
+def criar_sistema(quantidade: int = 6) -> SistemaEnergia:
+    aleatorio = random.Random(16)
+    unidades = [UnidadeConsumidora(id=f"U{i:04d}", nome=f"Unidade {i}", ativa=i % 4 != 3,
+                                   tipo_ligacao=aleatorio.choice(list(TipoLigacao)),
+                                   tipo_unidade=aleatorio.choice(list(TipoUnidade)),
+                                   endereco=f"Rua {i}", percentual_energia_alocada=aleatorio.uniform(0, 10),
+                                   consumo_mensal_kwh=[round(aleatorio.uniform(0, 900), 2) for _ in range(12)])
+                for i in range(quantidade)]
+    historico = [HistoricoCreditos(mes_geracao=3, ano_geracao=2024, creditos_kwh=500.0, creditos_utilizados_kwh=120.0,
+                                   creditos_restantes_kwh=380.0, mes_vencimento=3, ano_vencimento=2029, ativo=True)]
+    return SistemaEnergia(configuracao=ConfiguracaoSistema(tarifa_energia_kwh=0.91), unidades=unidades,
+                          historico_creditos=historico, dados_importacao={'origem': 'teste'})
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    with RepositorioSQLite(str(tmp_path / 'dados.db')) as repositorio:
+        yield repositorio
+
+
+def test_ida_e_volta_preserva_o_sistema(repositorio):
+    assert not repositorio.existe()
+    with pytest.raises(ErroCarregamentoDados):
+        repositorio.carregar_sistema()
+
+    sistema = criar_sistema()
+    repositorio.salvar_sistema(sistema)
+    carregado = repositorio.carregar_sistema()
+
+    assert carregado.unidades == sistema.unidades
+    assert carregado.configuracao == sistema.configuracao
+    assert carregado.historico_creditos == sistema.historico_creditos
+    assert carregado.dados_importacao == sistema.dados_importacao
+    assert carregado.data_criacao == sistema.data_criacao
+
+    # Novo salvamento substitui todo o conteúdo
+    repositorio.salvar_sistema(criar_sistema(2))
+    assert [u.id for u in repositorio.carregar_sistema().unidades] == ['U0000', 'U0001']
+
+
+def test_salvar_consumo_atualiza_ou_inclui_uma_linha(repositorio):
+    repositorio.salvar_sistema(criar_sistema())
+    repositorio.salvar_consumo('U0001', 5, 1234.5)
+    assert repositorio.carregar_unidade('U0001').consumo_mensal_kwh[4] == 1234.5
+    assert repositorio.conexao.execute("SELECT COUNT(*) FROM consumo_mensal").fetchone()[0] == 6 * 12
+
+    # Mês sem linha gravada é incluído
+    repositorio.conexao.execute("DELETE FROM consumo_mensal WHERE id_unidade = 'U0002' AND mes = 7")
+    assert repositorio.carregar_unidade('U0002').consumo_mensal_kwh[6] == 0.0
+    repositorio.salvar_consumo('U0002', 7, 77.0)
+    assert repositorio.carregar_unidade('U0002').consumo_mensal_kwh[6] == 77.0
+
+
+def test_carregar_unidades_com_mais_ids_que_o_limite_de_parametros(repositorio):
+    sistema = criar_sistema(LIMITE_PARAMETROS * 2 + 50)
+    repositorio.salvar_sistema(sistema)
+    ids = [u.id for u in sistema.unidades][::-1] + ['inexistente']
+
+    carregadas = repositorio.carregar_unidades(ids)
+    assert sorted(u.id for u in carregadas) == sorted(ids[:-1])
+    assert {u.id: u for u in carregadas} == {u.id: u for u in sistema.unidades}
+
+    ativas = repositorio.carregar_unidades(ids, apenas_ativas=True)
+    assert {u.id for u in ativas} == {u.id for u in sistema.unidades if u.ativa}
+
+
+def test_remover_unidade_remove_os_consumos(repositorio):
+    repositorio.salvar_sistema(criar_sistema())
+    repositorio.remover_unidade('U0001')
+
+    assert repositorio.carregar_unidade('U0001') is None
+    assert repositorio.conexao.execute(
+        "SELECT COUNT(*) FROM consumo_mensal WHERE id_unidade = 'U0001'").fetchone()[0] == 0
+
+    # Renomear o id leva os consumos junto
+    repositorio.conexao.execute("UPDATE unidades SET id = 'NOVO' WHERE id = 'U0002'")
+    assert repositorio.carregar_unidade('NOVO').consumo_mensal_kwh == criar_sistema().unidades[2].consumo_mensal_kwh
+
+
+def test_resumo_igual_aos_indices_do_sistema(repositorio, tmp_path):
+    sistema = criar_sistema(40)
+    repositorio.salvar_sistema(sistema)
+    paginado = RepositorioPaginado(str(tmp_path / 'dados.json'))
+    paginado.salvar_paginado(sistema)
+
+    for resumo in (repositorio.carregar_resumo_sistema(), paginado.abrir_paginado().resumo):
+        assert resumo.contagem_por_ligacao == sistema.get_contagem_por_ligacao()
+        assert resumo.taxa_disponibilidade_total == pytest.approx(sistema.get_taxa_disponibilidade_total())
+        assert resumo.quantidade_ativas == len(sistema.get_unidades_ativas())
+        assert resumo.consumo_mensal_kwh == pytest.approx(
+            [sum(u.consumo_mensal_kwh[m] for u in sistema.get_unidades_ativas()) for m in range(12)])
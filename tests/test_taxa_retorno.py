@@ -0,0 +1,91 @@
+"""
+Testes do VPL/TIR vetorizados contra a iteração de Newton original
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from nucleo.excecoes import ErroCalculoFinanceiro
+from negocio.taxa_retorno import StatusTIR, calcular_tir_lote, calcular_tir, calcular_vpl_lote
+
+
+def vpl_referencia(fluxo, taxa: float) -> float:
+    return sum(f / (1 + taxa) ** i for i, f in enumerate(fluxo))
+
+
+def tir_referencia(fluxo):
+    """Newton original (_calcular_tir_iterativo): chute 10%, passo limitado a [-50%, 100%]"""
+    taxa = 0.1
+    for _ in range(100):
+        vpl = vpl_referencia(fluxo, taxa)
+        if abs(vpl) < 1e-4:
+            return taxa
+        derivada = sum(-i * f / (1 + taxa) ** (i + 1) for i, f in enumerate(fluxo) if i > 0)
+        if abs(derivada) < 1e-4:
+            break
+        taxa = max(-0.5, min(1.0, taxa - vpl / derivada))
+    return None
+
+
+def fluxos_investimento(quantidade: int, semente: int):
+    """Investimento inicial seguido de 25 anos de economia com reajuste"""
+    aleatorio = random.Random(semente)
+    fluxos = []
+    for _ in range(quantidade):
+        investimento = aleatorio.uniform(5e4, 4e5)
+        economia = aleatorio.uniform(8e3, 9e4)
+        reajuste = aleatorio.uniform(0.0, 0.08)
+        fluxos.append([-investimento] + [economia * (1 + reajuste) ** ano for ano in range(25)])
+    return fluxos
+
+
+def test_tir_igual_ao_newton_original():
+    fluxos = fluxos_investimento(200, 8)
+    resultado = calcular_tir_lote(fluxos)
+
+    comparados = 0
+    for posicao, fluxo in enumerate(fluxos):
+        esperado = tir_referencia(fluxo)
+        if esperado is None:
+            continue
+        comparados += 1
+        assert resultado.status[posicao] == StatusTIR.CONVERGIU
+        # O original para com |VPL| < 1e-4; a diferença de taxa correspondente é desprezível
+        assert resultado.taxas[posicao] == pytest.approx(esperado, abs=1e-8)
+        assert abs(vpl_referencia(fluxo, resultado.taxas[posicao])) <= 1e-8 * max(map(abs, fluxo))
+    assert comparados > 150
+
+
+def test_vpl_lote_igual_a_soma_descontada():
+    fluxos = fluxos_investimento(20, 9)
+    taxas = np.linspace(-0.3, 0.6, 20)
+
+    vpl = calcular_vpl_lote(fluxos, taxas)
+    assert vpl.tolist() == pytest.approx([vpl_referencia(f, t) for f, t in zip(fluxos, taxas)], rel=1e-12)
+    assert calcular_vpl_lote(fluxos[0], 0.1)[0] == pytest.approx(vpl_referencia(fluxos[0], 0.1), rel=1e-12)
+
+    with pytest.raises(ErroCalculoFinanceiro):
+        calcular_vpl_lote(fluxos, -1.0)
+
+
+def test_taxa_fora_do_limite_do_original():
+    # TIR acima de 100%: o passo limitado do original não alcança; o lote resolve
+    fluxo = [-1000.0] + [2500.0] * 10
+    assert tir_referencia(fluxo) is None
+    tir, status = calcular_tir(fluxo)
+    assert status == StatusTIR.CONVERGIU
+    assert vpl_referencia(fluxo, tir) == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize('fluxo, status', [
+    ([1000.0] * 5, StatusTIR.SEM_MUDANCA_SINAL),
+    ([0.0] * 5, StatusTIR.SEM_MUDANCA_SINAL),
+    ([-1000.0, math.inf, 100.0], StatusTIR.FLUXO_INVALIDO),
+    ([-1000.0, math.nan, 100.0], StatusTIR.FLUXO_INVALIDO),
+])
+def test_series_sem_tir_retornam_nan_e_status(fluxo, status):
+    tir, obtido = calcular_tir(fluxo)
+    assert math.isnan(tir) and obtido == status
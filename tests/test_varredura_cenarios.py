@@ -0,0 +1,68 @@
+"""
+Testes da varredura de cenários: avaliação vetorizada x pipeline completo
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from nucleo.modelos import SistemaEnergia, ConfiguracaoSistema, UnidadeConsumidora, TipoLigacao, BandeiraTarifaria
+from negocio.varredura_cenarios import VarreduraCenarios, gerar_grade, _avaliar_cenario_completo
+
+ANO = 2024
+KPIS = ('geracao_anual_kwh', 'consumo_anual_kwh', 'autossuficiencia_percentual', 'economia_anual',
+        'payback_anos', 'roi_percentual', 'tir_percentual')
+
+
+@pytest.fixture
+def sistema():
+    aleatorio = random.Random(7)
+    unidades = [UnidadeConsumidora(id=str(i), nome=f"Unidade {i}", tipo_ligacao=aleatorio.choice(list(TipoLigacao)),
+                                   ativa=i != 3, consumo_mensal_kwh=[aleatorio.uniform(0, 1500) for _ in range(12)])
+                for i in range(8)]
+    return SistemaEnergia(configuracao=ConfiguracaoSistema(custo_investimento=150000.0), unidades=unidades)
+
+
+def assert_kpis_iguais(resultado, posicao, esperado):
+    for kpi in KPIS:
+        assert getattr(resultado, kpi)[posicao] == pytest.approx(esperado[kpi], rel=1e-9, nan_ok=True), kpi
+    assert resultado.status_tir[posicao] == esperado['status_tir']
+
+
+def test_vetorizado_igual_ao_pipeline_completo(sistema):
+    cenarios = gerar_grade(potencia_instalada_kw=[50.0, 120.0], eficiencia_sistema=[0.8, 0.9],
+                           tarifa_energia_kwh=[0.6, 0.9], custo_investimento=[8e4, 2e5],
+                           bandeira_atual=[b.value for b in BandeiraTarifaria])
+    resultado = VarreduraCenarios(sistema, ANO).avaliar(cenarios)
+
+    assert len(resultado) == 80 and resultado.vetorizado.all()
+    for posicao, cenario in enumerate(cenarios):
+        assert_kpis_iguais(resultado, posicao, _avaliar_cenario_completo(cenario, sistema, ANO, 25))
+
+
+def test_cenarios_nao_vetorizaveis_usam_pipeline_completo(sistema):
+    base = sistema.configuracao
+    escala = 80.0 / base.potencia_instalada_kw
+    cenarios = [
+        {'potencia_instalada_kw': 80.0},
+        # Mesma geração informada explicitamente: não vetorizável, mas mesmo resultado
+        {'potencia_instalada_kw': 80.0, 'geracao_mensal_kwh': [g * escala for g in base.geracao_mensal_kwh]},
+    ]
+    resultado = VarreduraCenarios(sistema, ANO).avaliar(cenarios, processos=1)
+
+    assert resultado.vetorizado.tolist() == [True, False]
+    for kpi in KPIS:
+        valores = getattr(resultado, kpi)
+        assert valores[1] == pytest.approx(valores[0], rel=1e-9, nan_ok=True), kpi
+
+
+def test_pool_de_processos_e_sistema_inalterado(sistema):
+    geracao = list(sistema.configuracao.geracao_mensal_kwh)
+    cenarios = [{'geracao_mensal_kwh': [g * fator for g in geracao]} for fator in np.linspace(0.5, 1.2, 8)]
+    resultado = VarreduraCenarios(sistema, ANO).avaliar(cenarios, processos=2)
+
+    for posicao, cenario in enumerate(cenarios):
+        assert_kpis_iguais(resultado, posicao, _avaliar_cenario_completo(cenario, sistema, ANO, 25))
+    assert list(sistema.configuracao.geracao_mensal_kwh) == geracao
+    assert sistema.configuracao.potencia_instalada_kw == ConfiguracaoSistema().potencia_instalada_kw
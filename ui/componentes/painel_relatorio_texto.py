@@ -5,6 +5,7 @@ from tkinter import ttk, scrolledtext, messagebox
 from nucleo.modelos import SistemaEnergia
 from negocio.calculadora_energia import CalculadoraEnergia
 from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+from negocio.contexto_calculo import obter_contexto
 from nucleo.excecoes import ErroCalculoEnergia, ErroCalculoFinanceiro
 
 
@@ -16,8 +17,9 @@ class PainelRelatorioTextoUI(ttk.Frame):
     def __init__(self, parent, sistema_energia):
         super().__init__(parent)
         self.sistema_energia = sistema_energia
-        self.calculadora_energia = CalculadoraEnergia(sistema_energia)
-        self.gerenciador_distribuicao = GerenciadorDistribuicao(sistema_energia)
+        contexto = obter_contexto(sistema_energia)
+        self.calculadora_energia = CalculadoraEnergia(sistema_energia, contexto)
+        self.gerenciador_distribuicao = GerenciadorDistribuicao(sistema_energia, contexto)
 
         self.criar_widgets()
         self.gerar_relatorio()  # Gera o relatório inicial
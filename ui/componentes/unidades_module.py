@@ -5,29 +5,40 @@ Módulo Gestão de Unidades - CRUD e controle completo com dados reais - VERSÃO
 import tkinter as tk
 from tkinter import ttk, messagebox
 from .base_module import BaseModule
+from negocio.agregador_consumo import AgregadorConsumo
+from dados.repositorio import RepositorioDados
+from utilitarios.constantes import MESES_APENAS
 
 
 class UnidadesModule(BaseModule):
     """Módulo responsável pela gestão completa de unidades"""
 
+    # Tarifa da cooperativa (R$/kWh) e consumo mínimo por tipo de ligação (kWh)
+    TARIFA_COOPERATIVA = 0.39
+    LIMITE_BIFASICO = 50
+    LIMITE_TRIFASICO = 100
+
+    ARQUIVO_UNIDADES = "dados/unidades_sistema.json"
+
     def __init__(self, parent_frame, sistema, cores=None):
         super().__init__(parent_frame, sistema, cores)
         self.unidade_selecionada = None
+        self.repositorio = RepositorioDados(self.ARQUIVO_UNIDADES)
         self.dados_unidades = self._carregar_dados_reais()
 
+        # Totais do dashboard mantidos incrementalmente a cada edição
+        self.agregador = AgregadorConsumo()
+        for unidade in self.dados_unidades["unidades"]:
+            self._atualizar_agregador(unidade)
+
     def _carregar_dados_reais(self):
         """Carrega dados reais das unidades e consumos com persistência"""
         try:
-            import json
-            import os
-
-            # ✅ TENTAR: Carregar dados salvos do arquivo
-            if os.path.exists("dados/unidades_sistema.json"):
-                print("📂 Carregando dados salvos do arquivo...")
-                with open("dados/unidades_sistema.json", "r", encoding="utf-8") as arquivo:
-                    dados_salvos = json.load(arquivo)
-                    print(f"✅ Dados carregados: {len(dados_salvos.get('unidades', []))} unidades")
-                    return dados_salvos
+            # ✅ TENTAR: Carregar dados salvos (snapshot + journal de edições; cópia editada no lugar)
+            dados_salvos = self.repositorio.carregar_documento()
+            if dados_salvos is not None:
+                print(f"✅ Dados carregados: {len(dados_salvos.get('unidades', []))} unidades")
+                return dados_salvos
             else:
                 print("📝 Arquivo não encontrado, usando dados padrão...")
 
@@ -155,49 +166,12 @@ class UnidadesModule(BaseModule):
     def _calcular_dados_unidades(self):
         """✅ CORRIGIDO: Cálculo correto da receita com formatação brasileira"""
         try:
-            # ✅ CONFIGURAÇÕES: Tarifas e limites mínimos
-            tarifa_cooperativa = 0.39  # R\$/kWh
-            limite_bifasico = 50  # kWh mínimo
-            limite_trifasico = 100  # kWh mínimo
-
-            # ✅ FILTRAR: Apenas unidades ativas
-            unidades_ativas = [u for u in self.dados_unidades["unidades"] if u["ativa"]]
-            qtd_unidades_ativas = len(unidades_ativas)
-
-            # ✅ CALCULAR: Consumos e receita
-            consumo_total_anual = 0
-            receita_total_anual = 0
-
-            print("💰 Calculando receita da cooperativa:")
-
-            for unidade in unidades_ativas:
-                codigo = unidade["codigo"]
-                nome = unidade["nome"]
-                tipo = unidade["tipo"]  # "tri" ou "bi"
-
-                if codigo in self.dados_unidades["consumos"]:
-                    consumos_mensais = self.dados_unidades["consumos"][codigo]
-                    consumo_anual_unidade = sum(consumos_mensais.values())
-                    consumo_total_anual += consumo_anual_unidade
-
-                    # ✅ CALCULAR: Receita anual da unidade
-                    receita_anual_unidade = 0
-
-                    for mes, consumo_mes in consumos_mensais.items():
-                        # ✅ CORRIGIDO: Definir limite mínimo baseado no tipo
-                        limite_minimo = limite_trifasico if tipo == "tri" else limite_bifasico
-
-                        # ✅ CORRIGIDO: Calcular consumo faturável (acima do mínimo)
-                        consumo_faturavel = max(0, consumo_mes - limite_minimo)
-
-                        # ✅ CORRIGIDO: Receita da cooperativa para este mês
-                        receita_mes_unidade = consumo_faturavel * tarifa_cooperativa
-                        receita_anual_unidade += receita_mes_unidade
-
-                    receita_total_anual += receita_anual_unidade
+            # ✅ LER: Totais do agregador incremental (sem percorrer as unidades)
+            qtd_unidades_ativas = self.agregador.quantidade_unidades_ativas
+            consumo_total_anual = self.agregador.consumo_total_anual
 
-                    print(
-                        f"   • {nome} ({tipo}): {consumo_anual_unidade:,.0f} kWh → R\$ {receita_anual_unidade:,.2f}/ano")
+            # ✅ RECEITA: Consumo faturável (acima do mínimo) × tarifa da cooperativa
+            receita_total_anual = self.agregador.consumo_liquido_anual * self.TARIFA_COOPERATIVA
 
             # ✅ CALCULAR: Médias
             consumo_medio_mensal = consumo_total_anual / 12 if consumo_total_anual > 0 else 0
@@ -697,6 +671,8 @@ HISTÓRICO DE CONSUMO (kWh):
                         del self.dados_unidades["consumos"][codigo_unidade]
                         print(f"✅ Consumos da unidade removidos")
 
+                    self.agregador.remover_unidade(codigo_unidade)
+
                     # ✅ SALVAR: Dados atualizados no arquivo
                     self._salvar_dados_em_arquivo()
 
@@ -759,10 +735,11 @@ HISTÓRICO DE CONSUMO (kWh):
 
                 # ✅ ATIVAR: Unidade no sistema
                 self.dados_unidades["unidades"][indice_unidade]["ativa"] = True
+                self.agregador.definir_ativa(str(unidade_encontrada["codigo"]), True)
                 print(f"✅ Status da unidade alterado para ATIVA")
 
-                # ✅ SALVAR: Dados atualizados
-                self._salvar_dados_em_arquivo()
+                # ✅ SALVAR: Só o campo alterado vai para o journal
+                self._registrar_campos(unidade_encontrada["codigo"], {"ativa": True})
 
                 # ✅ ATUALIZAR: Interface
                 self._atualizar_lista()
@@ -836,10 +813,11 @@ HISTÓRICO DE CONSUMO (kWh):
                 if resposta:
                     # ✅ DESATIVAR: Unidade no sistema
                     self.dados_unidades["unidades"][indice_unidade]["ativa"] = False
+                    self.agregador.definir_ativa(str(unidade_encontrada["codigo"]), False)
                     print(f"✅ Status da unidade alterado para INATIVA")
 
-                    # ✅ SALVAR: Dados atualizados
-                    self._salvar_dados_em_arquivo()
+                    # ✅ SALVAR: Só o campo alterado vai para o journal
+                    self._registrar_campos(unidade_encontrada["codigo"], {"ativa": False})
 
                     # ✅ ATUALIZAR: Interface
                     self._atualizar_lista()
@@ -1325,8 +1303,11 @@ HISTÓRICO DE CONSUMO (kWh):
                 "ativa": ativa
             }
 
+            anterior = None
+            consumos_anteriores = self.dados_unidades["consumos"].get(codigo, {})
             if unidade_existente is not None:
                 # ✅ EDITAR: Unidade existente
+                anterior = self.dados_unidades["unidades"][unidade_existente]
                 self.dados_unidades["unidades"][unidade_existente] = dados_unidade
                 print(f"✅ Unidade editada: {nome}")
             else:
@@ -1338,8 +1319,13 @@ HISTÓRICO DE CONSUMO (kWh):
             self.dados_unidades["consumos"][codigo] = consumos.copy()
             print(f"✅ Consumos salvos: {len(consumos)} meses")
 
-            # ✅ OPCIONAL: Salvar em arquivo (se você quiser persistência)
-            self._salvar_dados_em_arquivo()
+            # ✅ AGREGADOR: Aplica apenas os meses alterados
+            self._atualizar_agregador(dados_unidade)
+
+            # ✅ SALVAR: Edição vai para o journal; unidade nova regrava o arquivo
+            if anterior is None or not self._registrar_edicao(anterior, dados_unidade,
+                                                               consumos_anteriores, consumos):
+                self._salvar_dados_em_arquivo()
 
             return True
 
@@ -1349,20 +1335,56 @@ HISTÓRICO DE CONSUMO (kWh):
             traceback.print_exc()
             return False
 
-    def _salvar_dados_em_arquivo(self):
-        """✅ OPCIONAL: Salva dados em arquivo JSON para persistência"""
+    def _atualizar_agregador(self, unidade):
+        """Sincroniza uma unidade com o agregador a partir da diferença"""
+        codigo = str(unidade["codigo"])
+        consumos_mes = self.dados_unidades["consumos"].get(codigo, {})
+        consumos = [float(consumos_mes.get(mes, 0) or 0) for mes in MESES_APENAS]
+        limite = self.LIMITE_TRIFASICO if unidade["tipo"] == "tri" else self.LIMITE_BIFASICO
+
+        if codigo in self.agregador:
+            self.agregador.definir_tarifa_minima(codigo, limite)
+            self.agregador.atualizar_consumos(codigo, consumos)
+            self.agregador.definir_ativa(codigo, unidade["ativa"])
+        else:
+            self.agregador.definir_unidade(codigo, consumos, limite, unidade["ativa"])
+
+    def _registrar_edicao(self, anterior, atual, consumos_anteriores, consumos):
+        """
+        Anexa ao journal só os campos e meses alterados de uma unidade existente.
+        Retorna False quando a edição não cabe no journal e o arquivo deve ser regravado.
+        """
+        # Campos ou meses removidos (ou meses fora do padrão) só saem com o documento inteiro
+        if set(anterior) != set(atual) or set(consumos_anteriores) - set(consumos) \
+                or set(consumos) - set(MESES_APENAS):
+            return False
+
+        campos = {campo: valor for campo, valor in atual.items() if anterior[campo] != valor}
+        meses = {indice: consumos[mes] for indice, mes in enumerate(MESES_APENAS, start=1)
+                 if mes in consumos and consumos_anteriores.get(mes) != consumos[mes]}
+        self._registrar_campos(atual["codigo"], campos, meses)
+        return True
+
+    def _registrar_campos(self, codigo, campos, meses=None):
+        """Registra campos e consumos mensais no journal; em caso de erro regrava o arquivo"""
         try:
-            import json
-            import os
+            for campo, valor in campos.items():
+                self.repositorio.registrar_campo_unidade(codigo, campo, valor)
+            for mes, valor in (meses or {}).items():
+                self.repositorio.registrar_consumo(codigo, mes, valor)
+            print(f"✅ {len(campos) + len(meses or {})} alterações registradas no journal")
 
-            # Criar diretório se não existir
-            os.makedirs("dados", exist_ok=True)
+        except Exception as e:
+            print(f"⚠️ Erro ao registrar alterações, regravando arquivo: {e}")
+            self._salvar_dados_em_arquivo()
 
-            # Salvar dados em arquivo
-            with open("dados/unidades_sistema.json", "w", encoding="utf-8") as arquivo:
-                json.dump(self.dados_unidades, arquivo, indent=2, ensure_ascii=False)
+    def _salvar_dados_em_arquivo(self):
+        """✅ OPCIONAL: Salva dados em arquivo JSON para persistência"""
+        try:
+            # Snapshot atômico do documento inteiro; descarta o journal
+            self.repositorio.salvar_documento(self.dados_unidades)
 
-            print("✅ Dados salvos em arquivo: dados/unidades_sistema.json")
+            print(f"✅ Dados salvos em arquivo: {self.ARQUIVO_UNIDADES}")
 
         except Exception as e:
             print(f"⚠️ Erro ao salvar arquivo (não crítico): {e}")
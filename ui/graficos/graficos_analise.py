@@ -19,6 +19,7 @@ from nucleo.modelos import (
 from nucleo.excecoes import ErroGrafico
 from negocio.calculadora_energia import CalculadoraEnergia
 from negocio.gerenciador_distribuicao import GerenciadorDistribuicao
+from negocio.contexto_calculo import ContextoCalculo, obter_contexto
 
 # Configurar estilo dos gráficos
 plt.style.use('default')
@@ -28,10 +29,11 @@ sns.set_palette("husl")
 class GeradorGraficosAnalise:
     """Gerador de gráficos de análise do sistema"""
 
-    def __init__(self, sistema: SistemaEnergia):
+    def __init__(self, sistema: SistemaEnergia, contexto: ContextoCalculo = None):
         self.sistema = sistema
-        self.calculadora = CalculadoraEnergia(sistema)
-        self.gerenciador = GerenciadorDistribuicao(sistema)
+        self.contexto = contexto if contexto is not None else obter_contexto(sistema)
+        self.calculadora = CalculadoraEnergia(sistema, self.contexto)
+        self.gerenciador = GerenciadorDistribuicao(sistema, self.contexto)
 
         # Configurações visuais
         self.cores = {
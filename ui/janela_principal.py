@@ -4,7 +4,7 @@ Sistema de Energia Solar v2.0
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime
@@ -15,6 +15,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from main import SistemaEnergiaSolar
+from dados.exportador_excel import ExportadorExcel
 from utilitarios.formatadores import formatar_moeda, formatar_energia, formatar_percentual
 
 
@@ -673,7 +674,19 @@ class InterfacePrincipal:
 
     def exportar_faturamento(self):
         """Exporta dados de faturamento"""
-        messagebox.showinfo("Faturamento", "Exportação de faturamento em desenvolvimento...")
+        try:
+            arquivo = filedialog.asksaveasfilename(
+                title="Exportar Faturamento",
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")]
+            )
+
+            if arquivo:
+                ExportadorExcel(self.sistema.sistema, self.sistema.contexto).exportar(arquivo)
+                messagebox.showinfo("Sucesso", f"Faturamento exportado em:\n{arquivo}")
+
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar faturamento: {e}")
 
     def historico_creditos(self):
         """Mostra histórico de créditos"""
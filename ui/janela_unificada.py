@@ -4,7 +4,7 @@ Sistema de Energia Solar v2.0
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 import sys
 import os
@@ -12,6 +12,7 @@ import os
 # Adicionar path do projeto
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from dados.exportador_excel import ExportadorExcel
 from .componentes.analises_module import AnalisesModule
 from .componentes.sidebar import Sidebar
 from .componentes.dashboard_module import DashboardModule
@@ -618,7 +619,23 @@ class JanelaUnificada:
         messagebox.showinfo("Faturamento", "Relatório financeiro em desenvolvimento...")
 
     def exportar_faturamento(self):
-        messagebox.showinfo("Faturamento", "Exportação de faturamento em desenvolvimento...")
+        if not self.sistema:
+            self.mostrar_erro_sistema()
+            return
+
+        try:
+            arquivo = filedialog.asksaveasfilename(
+                title="Exportar Faturamento",
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")]
+            )
+
+            if arquivo:
+                ExportadorExcel(self.sistema, self.sistema_energia.contexto).exportar(arquivo)
+                messagebox.showinfo("Sucesso", f"Faturamento exportado em:\n{arquivo}")
+
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar faturamento: {e}")
 
     def historico_creditos(self):
         messagebox.showinfo("Créditos", "Histórico de créditos em desenvolvimento...")
@@ -6,12 +6,14 @@ Adaptação das funções originais para a nova estrutura
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import locale
+from collections.abc import Mapping
 from typing import Dict, List, Tuple, Any
 from datetime import datetime
 
 # Importações do sistema atual
 from nucleo.modelos import SistemaEnergia, TipoLigacao
 from dados.gerenciador_dados_legacy import GerenciadorDadosLegacy
+from dados.visao_legacy import VisaoDadosLegacy
 
 
 # ========== CONFIGURAÇÃO DE LOCALIZAÇÃO ==========
@@ -106,10 +108,10 @@ class FuncoesLegacy:
 
         return self.gerenciador.converter_de_sistema_energia(self.sistema)
 
-    def obter_dados_legacy(self) -> Dict:
-        """Obtém dados no formato legacy"""
+    def obter_dados_legacy(self) -> Mapping:
+        """Obtém dados no formato legacy (visão somente leitura quando há sistema)"""
         if self.sistema:
-            return self.converter_sistema_para_dados_legacy()
+            return VisaoDadosLegacy(self.sistema)
         else:
             return self.gerenciador.carregar_dados()
 
@@ -171,7 +173,7 @@ class FuncoesLegacy:
             return self.calcular_geracao_anual_total(dados_sistema)
 
         # Verificar se existe estrutura nova (mensal)
-        if "geracao_mensal" in sistema and isinstance(sistema["geracao_mensal"], dict):
+        if "geracao_mensal" in sistema and isinstance(sistema["geracao_mensal"], Mapping):
             return float(sistema["geracao_mensal"].get(mes, 0))
         else:
             return float(sistema.get("geracao_mensal", 0))
@@ -180,7 +182,7 @@ class FuncoesLegacy:
         """Calcula a geração total anual"""
         sistema = dados_sistema.get("sistema", {})
 
-        if "geracao_mensal" in sistema and isinstance(sistema["geracao_mensal"], dict):
+        if "geracao_mensal" in sistema and isinstance(sistema["geracao_mensal"], Mapping):
             total = 0
             for valor in sistema["geracao_mensal"].values():
                 total += float(valor)
@@ -467,6 +469,9 @@ class FuncoesLegacy:
             'balanco_energetico': {}
         }
 
+        # Total calculado uma vez (não por unidade)
+        total_anual = self.calcular_consumo_total_anual(dados_sistema)
+
         # Dados por unidade
         for unidade in dados_sistema.get('unidades', []):
             codigo = unidade['codigo']
@@ -479,7 +484,7 @@ class FuncoesLegacy:
                 'endereco': unidade.get('endereco', ''),
                 'consumo_anual': consumo_anual,
                 'media_mensal': round(consumo_anual / 12, 2),
-                'percentual': self.calcular_percentual_unidade(dados_sistema, codigo)
+                'percentual': round((consumo_anual / total_anual) * 100, 1) if total_anual else 0
             }
 
             relatorio['unidades'].append(dados_unidade)
@@ -488,7 +493,6 @@ class FuncoesLegacy:
         relatorio['unidades'].sort(key=lambda x: x['consumo_anual'], reverse=True)
 
         # Resumo geral
-        total_anual = self.calcular_consumo_total_anual(dados_sistema)
         relatorio['resumo_geral'] = {
             'total_anual': total_anual,
             'media_mensal_total': round(total_anual / 12, 2),